@@ -1,11 +1,15 @@
+import argparse
+import multiprocessing
 import sys
 import os
-from PySide6.QtWidgets import QApplication
-from PySide6.QtGui import QIcon
-from ui.main_window import MainWindow
 
 
 def main():
+    # 延迟导入界面模块，命令行模式下无需加载 PySide6
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtGui import QIcon
+    from ui.main_window import MainWindow
+
     app = QApplication(sys.argv)
 
     # 设置应用程序信息
@@ -21,9 +25,221 @@ def main():
     # 创建主窗口
     window = MainWindow()
     window.show()
+    # 退出前关闭任务队列的进程池
+    app.aboutToQuit.connect(window.job_queue.shutdown)
 
     sys.exit(app.exec())
 
 
+def run_daemon_command(args):
+    from modules.daemon import run_daemon
+    from modules.daemon_client import DaemonError
+
+    try:
+        run_daemon(args.socket, args.workers)
+    except (DaemonError, RuntimeError) as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    return 0
+
+
+def run_submit_command(args):
+    import json
+    from modules.daemon_client import DaemonClient, DaemonError
+
+    gradient_config = json.loads(args.gradient) if args.gradient else None
+    try:
+        result = DaemonClient(args.socket).process(
+            args.input, args.output, gradient_config, args.font_size, args.font_name,
+            on_event=lambda event: print(event.get('message', ''), flush=True))
+    except DaemonError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    if result.get('event') == 'done':
+        print(f"处理完成: {result['output']}")
+        return 0
+    print(f"处理失败: {result.get('error', '')}", file=sys.stderr)
+    return 1
+
+
+def run_stop_command(args):
+    from modules.daemon_client import DaemonClient, DaemonError
+
+    try:
+        DaemonClient(args.socket).shutdown()
+    except DaemonError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    return 0
+
+
+def run_watch_command(args):
+    from modules.folder_watcher import FolderWatcher
+
+    try:
+        watcher = FolderWatcher(args.input_dir, args.output_dir, args.workers, args.interval, args.settle)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    watcher.run(status_callback=lambda message: print(message, flush=True))
+    return 0
+
+
+def run_queue_submit_command(args):
+    import json
+    from modules.lease_queue import LeaseQueue
+
+    gradient_config = json.loads(args.gradient) if args.gradient else None
+    queue = LeaseQueue(args.queue_dir)
+    os.makedirs(args.output_dir, exist_ok=True)
+    for input_path in args.inputs:
+        stem = os.path.splitext(os.path.basename(input_path))[0]
+        output_path = os.path.join(args.output_dir, f"{stem}_RescueGamma.pptx")
+        job_id = queue.submit(input_path, output_path, gradient_config, args.font_size, args.font_name)
+        print(f"已提交 {job_id}: {input_path}")
+    return 0
+
+
+def run_queue_worker_command(args):
+    from concurrent.futures import ProcessPoolExecutor
+    from modules.lease_queue import run_worker
+
+    if args.processes <= 1:
+        processed = run_worker(args.queue_dir, args.lease, args.exit_when_empty)
+    else:
+        with ProcessPoolExecutor(max_workers=args.processes) as executor:
+            futures = [executor.submit(run_worker, args.queue_dir, args.lease, args.exit_when_empty)
+                       for _ in range(args.processes)]
+            processed = sum(future.result() for future in futures)
+    print(f"共处理 {processed} 个任务")
+    return 0
+
+
+def run_queue_status_command(args):
+    from modules.lease_queue import LeaseQueue
+
+    counts = LeaseQueue(args.queue_dir).status()
+    print(f"待处理 {counts['pending']}，处理中 {counts['leases']}，完成 {counts['done']}，失败 {counts['failed']}")
+    return 0
+
+
+def run_inspect_command(args):
+    from modules.ppt_processor import PPTProcessor
+    from modules.run_index import ROLE_LABELS
+
+    report = PPTProcessor().dry_run(args.input)
+    print(f"幻灯片 {report['parts']} 个，文本运行 {report['runs']} 个")
+    print("字号\tLatin\tEA\tCS\t运行数\t字符数")
+    for style in report['inventory']:
+        print(f"{style['size']}\t{style['latin']}\t{style['ea']}\t{style['cs']}\t{style['runs']}\t{style['chars']}")
+    print("形状角色: " + "，".join(f"{ROLE_LABELS[role]} {count}" for role, count in report['roles'].items() if count))
+
+    for config_name, count in report['font_rules'].items():
+        print(f"字体规则 {config_name}: 命中 {count} 个文本运行")
+    for font_size, count in report['gradients'].items():
+        print(f"渐变方案 {font_size}: 命中 {count} 个文本运行")
+    for stage_name, stats in report['stages'].items():
+        print(f"转换阶段 {stage_name}: 命中 {stats['hits']} 处，耗时 {stats['seconds'] * 1000:.1f} 毫秒")
+    print(f"将修改 {len(report['touched_parts'])} 个幻灯片")
+    return 0
+
+
+def run_variants_command(args):
+    import json
+    from pathlib import Path
+    from modules.ppt_processor import PPTProcessor
+
+    # 每个方案文件可以是 config.json 格式的渐变配置，也可以是 {"gradient_configs": ..., "font_configs": ...}
+    variants = []
+    for profile in args.profiles:
+        with open(profile, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data and set(data) <= {'gradient_configs', 'font_configs'}:
+            variants.append(data)
+        else:
+            variants.append({'gradient_configs': data})
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    processor = PPTProcessor(status_callback=print)
+    stem = Path(args.input).stem
+    for profile, pptx_bytes in zip(args.profiles, processor.process_variants(args.input, variants)):
+        output_path = os.path.join(args.output_dir, f"{stem}_{Path(profile).stem}.pptx")
+        with open(output_path, 'wb') as f:
+            f.write(pptx_bytes)
+        print(f"已保存: {output_path}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="RescueGamma")
+    parser.set_defaults(func=None)
+    subparsers = parser.add_subparsers(dest="command")
+
+    daemon_parser = subparsers.add_parser("daemon", help="启动常驻处理守护进程")
+    daemon_parser.add_argument("--socket", help="Unix域套接字路径")
+    daemon_parser.add_argument("--workers", type=int, help="预热的工作进程数量")
+    daemon_parser.set_defaults(func=run_daemon_command)
+
+    submit_parser = subparsers.add_parser("submit", help="提交任务到守护进程")
+    submit_parser.add_argument("input", help="Gamma PPT路径")
+    submit_parser.add_argument("output", help="PPT保存路径")
+    submit_parser.add_argument("--socket", help="Unix域套接字路径")
+    submit_parser.add_argument("--font-size", help="渐变字号（config.json为空时使用）")
+    submit_parser.add_argument("--font-name", help="渐变字体（config.json为空时使用）")
+    submit_parser.add_argument("--gradient", help="渐变配置JSON（config.json为空时使用）")
+    submit_parser.set_defaults(func=run_submit_command)
+
+    stop_parser = subparsers.add_parser("stop", help="停止守护进程")
+    stop_parser.add_argument("--socket", help="Unix域套接字路径")
+    stop_parser.set_defaults(func=run_stop_command)
+
+    watch_parser = subparsers.add_parser("watch", help="监视目录并自动处理新的PPT")
+    watch_parser.add_argument("input_dir", help="监视的目录")
+    watch_parser.add_argument("output_dir", help="处理结果的输出目录")
+    watch_parser.add_argument("--workers", type=int, help="并发工作进程数量")
+    watch_parser.add_argument("--interval", type=float, default=2.0, help="轮询间隔（秒）")
+    watch_parser.add_argument("--settle", type=float, default=3.0, help="文件停止增长多久后开始处理（秒）")
+    watch_parser.set_defaults(func=run_watch_command)
+
+    inspect_parser = subparsers.add_parser("inspect", help="统计PPT中的字体样式，并演练当前配置会修改哪些文本")
+    inspect_parser.add_argument("input", help="Gamma PPT路径")
+    inspect_parser.set_defaults(func=run_inspect_command)
+
+    variants_parser = subparsers.add_parser("variants", help="用多套配色方案一次生成多个版本")
+    variants_parser.add_argument("input", help="Gamma PPT路径")
+    variants_parser.add_argument("profiles", nargs="+", help="方案文件（config.json 格式的渐变配置）")
+    variants_parser.add_argument("--output-dir", required=True, help="输出目录")
+    variants_parser.set_defaults(func=run_variants_command)
+
+    queue_submit_parser = subparsers.add_parser("queue-submit", help="提交任务到共享目录队列")
+    queue_submit_parser.add_argument("queue_dir", help="共享队列目录")
+    queue_submit_parser.add_argument("inputs", nargs="+", help="Gamma PPT路径")
+    queue_submit_parser.add_argument("--output-dir", required=True, help="处理结果的输出目录")
+    queue_submit_parser.add_argument("--font-size", help="渐变字号（config.json为空时使用）")
+    queue_submit_parser.add_argument("--font-name", help="渐变字体（config.json为空时使用）")
+    queue_submit_parser.add_argument("--gradient", help="渐变配置JSON（config.json为空时使用）")
+    queue_submit_parser.set_defaults(func=run_queue_submit_command)
+
+    queue_worker_parser = subparsers.add_parser("queue-worker", help="从共享目录队列领取并处理任务")
+    queue_worker_parser.add_argument("queue_dir", help="共享队列目录")
+    queue_worker_parser.add_argument("--processes", type=int, default=1, help="本机启动的工作进程数量")
+    queue_worker_parser.add_argument("--lease", type=float, default=60.0, help="租约超时时间（秒）")
+    queue_worker_parser.add_argument("--exit-when-empty", action="store_true", help="队列为空时退出")
+    queue_worker_parser.set_defaults(func=run_queue_worker_command)
+
+    queue_status_parser = subparsers.add_parser("queue-status", help="查看共享目录队列状态")
+    queue_status_parser.add_argument("queue_dir", help="共享队列目录")
+    queue_status_parser.set_defaults(func=run_queue_status_command)
+
+    return parser
+
+
 if __name__ == "__main__":
+    # 打包后的程序启动进程池子进程时需要先处理子进程参数
+    multiprocessing.freeze_support()
+    if len(sys.argv) > 1:
+        cli_args = build_parser().parse_args()
+        if cli_args.func is not None:
+            sys.exit(cli_args.func(cli_args))
     main()
@@ -0,0 +1,243 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+from .ppt_processor import PPTProcessor, logger
+
+EVENT_STARTED = 'started'
+EVENT_PROGRESS = 'progress'
+EVENT_DONE = 'done'
+EVENT_FAILED = 'failed'
+
+# 所有入口默认使用进程池；子进程一律以 spawn 方式启动，不从已有事件循环和执行器线程的进程 fork
+DEFAULT_EXECUTOR = 'process'
+
+
+class JobEvent:
+    def __init__(self, job_id, kind: str, message: str = '', result: Optional[bytes] = None, output=None,
+                 error: Optional[BaseException] = None):
+        self.job_id = job_id
+        self.kind = kind
+        self.message = message
+        self.result = result
+        self.output = output
+        self.error = error
+
+    def __repr__(self):
+        return f"JobEvent(job_id={self.job_id!r}, kind={self.kind!r}, message={self.message!r})"
+
+
+def run_job(job_id, pptx_bytes: bytes, gradient_config: List[Dict] = None, font_size: str = None,
+            font_name: str = None, gradient_configs: Optional[Dict] = None, progress_queue=None,
+            font_configs: Optional[Dict] = None) -> bytes:
+    # 在执行器中运行的任务入口，必须是模块级函数才能被进程池序列化
+    def report(message):
+        if progress_queue is not None:
+            progress_queue.put((job_id, message))
+
+    processor = PPTProcessor(status_callback=report, font_configs=font_configs)
+    try:
+        return processor.process_bytes(pptx_bytes, gradient_config, font_size, font_name,
+                                       gradient_configs=gradient_configs)
+    finally:
+        # 结束标记，保证该任务的进度消息全部转发后才返回结果
+        report(None)
+
+
+def warm_worker() -> int:
+    # 预热工作进程：完成 python-pptx 等模块的导入
+    import pptx
+    PPTProcessor(font_configs={})
+    return os.getpid()
+
+
+class _LoopQueue:
+    # 线程执行器中把进度消息安全地投递回事件循环
+    def __init__(self, loop, dispatch):
+        self.loop = loop
+        self.dispatch = dispatch
+
+    def put(self, item):
+        self.loop.call_soon_threadsafe(self.dispatch, item)
+
+
+class AsyncProcessor:
+    def __init__(self, max_concurrency: Optional[int] = None, executor=DEFAULT_EXECUTOR):
+        self.max_concurrency = max(1, max_concurrency or os.cpu_count() or 1)
+        self.executor_kind = executor if isinstance(executor, str) else 'custom'
+        self.executor: Optional[Executor] = executor if isinstance(executor, Executor) else None
+        self.owns_executor = self.executor is None
+        self.semaphore = None
+        self.listeners = {}
+        self.next_job_id = 1
+        self.manager = None
+        self.progress_queue = None
+        self.pump_task = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        if self.executor is None:
+            if self.executor_kind == 'thread':
+                self.executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+            else:
+                self.executor = ProcessPoolExecutor(max_workers=self.max_concurrency,
+                                                    mp_context=multiprocessing.get_context('spawn'))
+
+        if self.progress_queue is None:
+            if isinstance(self.executor, ThreadPoolExecutor):
+                self.progress_queue = _LoopQueue(loop, self._dispatch)
+            else:
+                # 进程池中的进度消息通过 Manager 队列回传，由一个后台任务转发
+                self.manager = multiprocessing.get_context('spawn').Manager()
+                self.progress_queue = self.manager.Queue()
+                self.pump_task = loop.create_task(self._pump_progress())
+
+    async def warm_up(self):
+        # 预先启动全部工作进程，避免首批任务承担冷启动开销
+        self._ensure_started()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.executor, warm_worker)
+                               for _ in range(self.max_concurrency)))
+
+    async def _pump_progress(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await loop.run_in_executor(None, self.progress_queue.get)
+            if item is None:
+                break
+            self._dispatch(item)
+
+    def _dispatch(self, item):
+        job_id, message = item
+        listener = self.listeners.get(job_id)
+        if listener is None:
+            return
+        progress, drained = listener
+        if message is None:
+            drained.set()
+        else:
+            progress(JobEvent(job_id, EVENT_PROGRESS, message))
+
+    async def _read_source(self, source) -> bytes:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return bytes(source)
+        if hasattr(source, 'read'):
+            return await asyncio.to_thread(source.read)
+
+        def read_file():
+            with open(source, 'rb') as f:
+                return f.read()
+
+        return await asyncio.to_thread(read_file)
+
+    async def _write_output(self, output, data: bytes):
+        if hasattr(output, 'write'):
+            await asyncio.to_thread(output.write, data)
+            return
+
+        def write_file():
+            with open(output, 'wb') as f:
+                f.write(data)
+
+        await asyncio.to_thread(write_file)
+
+    async def process_async(self, source, gradient_config: List[Dict] = None, font_size: str = None,
+                            font_name: str = None, output=None, gradient_configs: Optional[Dict] = None,
+                            progress=None, job_id=None, font_configs: Optional[Dict] = None) -> bytes:
+        self._ensure_started()
+        if job_id is None:
+            job_id = self.next_job_id
+            self.next_job_id += 1
+
+        async with self.semaphore:
+            # 在并发限制内读取输入，process_many 不会一次把所有文件读进内存
+            pptx_bytes = await self._read_source(source)
+            drained = asyncio.Event()
+            if progress is not None:
+                self.listeners[job_id] = (progress, drained)
+                progress(JobEvent(job_id, EVENT_STARTED))
+            try:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    self.executor, run_job, job_id, pptx_bytes, gradient_config, font_size, font_name,
+                    gradient_configs, self.progress_queue if progress is not None else None, font_configs)
+                if progress is not None:
+                    await drained.wait()
+            finally:
+                self.listeners.pop(job_id, None)
+
+        if output is not None:
+            await self._write_output(output, result)
+
+        return result
+
+    async def process_many(self, jobs: Iterable[Dict]) -> AsyncIterator[JobEvent]:
+        # jobs 中每一项是 process_async 的关键字参数，可额外提供 job_id
+        events = asyncio.Queue()
+        tasks = []
+
+        async def run(job_id, params):
+            try:
+                result = await self.process_async(job_id=job_id, progress=events.put_nowait, **params)
+                events.put_nowait(JobEvent(job_id, EVENT_DONE, result=result, output=params.get('output')))
+            except Exception as e:
+                logger.error(f"异步处理任务 {job_id} 失败: {str(e)}")
+                events.put_nowait(JobEvent(job_id, EVENT_FAILED, message=str(e), error=e))
+
+        for params in jobs:
+            params = dict(params)
+            job_id = params.pop('job_id', None)
+            if job_id is None:
+                job_id = self.next_job_id
+                self.next_job_id += 1
+            tasks.append(asyncio.create_task(run(job_id, params)))
+
+        remaining = len(tasks)
+        try:
+            while remaining:
+                event = await events.get()
+                if event.kind in (EVENT_DONE, EVENT_FAILED):
+                    remaining -= 1
+                yield event
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def close(self):
+        if self.pump_task is not None:
+            self.progress_queue.put(None)
+            await self.pump_task
+            self.pump_task = None
+        if self.manager is not None:
+            self.manager.shutdown()
+            self.manager = None
+        self.progress_queue = None
+        if self.executor is not None and self.owns_executor:
+            await asyncio.to_thread(self.executor.shutdown)
+            self.executor = None
+
+
+async def process_async(source, gradient_config: List[Dict] = None, font_size: str = None, font_name: str = None,
+                        output=None, gradient_configs: Optional[Dict] = None, progress=None,
+                        executor=DEFAULT_EXECUTOR) -> bytes:
+    async with AsyncProcessor(max_concurrency=1, executor=executor) as processor:
+        return await processor.process_async(source, gradient_config, font_size, font_name, output=output,
+                                             gradient_configs=gradient_configs, progress=progress)
+
+
+async def process_many(jobs: Iterable[Dict], max_concurrency: Optional[int] = None,
+                       executor=DEFAULT_EXECUTOR) -> AsyncIterator[JobEvent]:
+    async with AsyncProcessor(max_concurrency=max_concurrency, executor=executor) as processor:
+        async for event in processor.process_many(jobs):
+            yield event
@@ -21,6 +21,8 @@ class ConfigManager:
         if not os.path.exists(self.ini_path):
             self.config['Theme'] = {'dark_mode': 'False', 'sort_order': '0'}
             self.config['RecentFiles'] = {'last_ppt_path': ''}
+            self.config['Queue'] = {'max_workers': '2'}
+            self.config['Gradient'] = {'simplify_delta_e': '1.0'}
             with open(self.ini_path, 'w', encoding='utf-8') as f:
                 self.config.write(f)
         else:
@@ -31,6 +33,14 @@ class ConfigManager:
                 self.config.set('Theme', 'sort_order', '0')
             if not self.config.has_option('Theme', 'dark_mode'):
                 self.config.set('Theme', 'dark_mode', 'False')
+            if not self.config.has_section('Queue'):
+                self.config.add_section('Queue')
+            if not self.config.has_option('Queue', 'max_workers'):
+                self.config.set('Queue', 'max_workers', '2')
+            if not self.config.has_section('Gradient'):
+                self.config.add_section('Gradient')
+            if not self.config.has_option('Gradient', 'simplify_delta_e'):
+                self.config.set('Gradient', 'simplify_delta_e', '1.0')
             with open(self.ini_path, 'w', encoding='utf-8') as f:
                 self.config.write(f)
 
@@ -67,6 +77,8 @@ class ConfigManager:
                 if file_path.endswith('.ini'):
                     self.config['Theme'] = {'dark_mode': 'False'}
                     self.config['RecentFiles'] = {'last_ppt_path': ''}
+                    self.config['Queue'] = {'max_workers': '2'}
+                    self.config['Gradient'] = {'simplify_delta_e': '1.0'}
                     with open(file_path, 'w', encoding='utf-8') as f:
                         self.config.write(f)
                 else:
@@ -84,3 +96,17 @@ class ConfigManager:
         self.config.set('Theme', 'sort_order', str(order))
         with open(self.ini_path, 'w', encoding='utf-8') as f:
             self.config.write(f)
+
+    def get_max_workers(self):
+        return self.config.getint('Queue', 'max_workers', fallback=2)
+
+    def set_max_workers(self, count):
+        if not self.config.has_section('Queue'):
+            self.config.add_section('Queue')
+        self.config.set('Queue', 'max_workers', str(count))
+        with open(self.ini_path, 'w', encoding='utf-8') as f:
+            self.config.write(f)
+
+    def get_simplify_delta_e(self):
+        # 保存渐变方案时合并相近色标允许的最大色差，0 表示不合并
+        return self.config.getfloat('Gradient', 'simplify_delta_e', fallback=1.0)
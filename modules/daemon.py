@@ -0,0 +1,155 @@
+import asyncio
+import json
+import os
+import socket
+from typing import Dict, Optional
+
+from .async_api import AsyncProcessor
+from .daemon_client import DaemonClient, DaemonError, default_socket_path
+from .ppt_processor import FONT_ALIAS_PATH, FONT_CONFIG_PATH, GRADIENT_CONFIG_PATH, file_signature, logger
+
+
+class ConfigWatcher:
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self.signatures = {}
+
+    def changed(self) -> bool:
+        current = {path: file_signature(path) for path in self.paths}
+        changed = current != self.signatures
+        self.signatures = current
+        return changed
+
+
+def load_json_config(path: str) -> Dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+            return config if isinstance(config, dict) else {}
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.error(f"加载配置文件 {path} 失败: {str(e)}")
+        return {}
+
+
+class ProcessingDaemon:
+    def __init__(self, socket_path: Optional[str] = None, workers: Optional[int] = None,
+                 watch_interval: float = 1.0):
+        self.socket_path = socket_path or default_socket_path()
+        self.processor = AsyncProcessor(max_concurrency=workers, executor='process')
+        self.watch_interval = watch_interval
+        # 别名表由工作进程按修改时间自行重新加载，这里监视它只为记录日志并及时刷新规则
+        self.watcher = ConfigWatcher([FONT_CONFIG_PATH, GRADIENT_CONFIG_PATH, FONT_ALIAS_PATH])
+        self.font_configs = {}
+        self.gradient_configs = {}
+        self.server = None
+        self.stopped = None
+
+    def reload_configs(self):
+        self.font_configs = load_json_config(FONT_CONFIG_PATH)
+        self.gradient_configs = load_json_config(GRADIENT_CONFIG_PATH)
+        logger.info(f"守护进程已加载 {len(self.font_configs)} 条字体规则、{len(self.gradient_configs)} 个渐变方案")
+
+    async def _watch_configs(self):
+        while True:
+            await asyncio.sleep(self.watch_interval)
+            if self.watcher.changed():
+                logger.info("检测到配置文件变化，重新加载")
+                self.reload_configs()
+
+    def _remove_stale_socket(self):
+        if not os.path.exists(self.socket_path):
+            return
+        try:
+            DaemonClient(self.socket_path, timeout=1).ping()
+        except DaemonError:
+            os.remove(self.socket_path)
+            return
+        raise RuntimeError(f"处理守护进程已在运行: {self.socket_path}")
+
+    async def serve(self):
+        if not hasattr(socket, 'AF_UNIX'):
+            raise RuntimeError("当前系统不支持Unix域套接字")
+
+        self._remove_stale_socket()
+        self.watcher.changed()
+        self.reload_configs()
+        self.stopped = asyncio.Event()
+
+        await self.processor.warm_up()
+        self.server = await asyncio.start_unix_server(self._handle_client, path=self.socket_path)
+        watch_task = asyncio.create_task(self._watch_configs())
+        logger.info(f"处理守护进程已启动: {self.socket_path}，工作进程 {self.processor.max_concurrency} 个")
+
+        try:
+            await self.stopped.wait()
+        finally:
+            watch_task.cancel()
+            self.server.close()
+            await self.server.wait_closed()
+            await self.processor.close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            logger.info("处理守护进程已退出")
+
+    async def _handle_client(self, reader, writer):
+        async def send(event):
+            writer.write(json.dumps(event, ensure_ascii=False).encode('utf-8') + b'\n')
+            await writer.drain()
+
+        try:
+            line = await reader.readline()
+            if not line:
+                return
+            request = json.loads(line.decode('utf-8'))
+            command = request.get('cmd')
+
+            if command == 'ping':
+                await send({'event': 'ok', 'pid': os.getpid(), 'workers': self.processor.max_concurrency})
+            elif command == 'reload':
+                self.reload_configs()
+                await send({'event': 'ok'})
+            elif command == 'shutdown':
+                await send({'event': 'ok'})
+                self.stopped.set()
+            elif command == 'process':
+                await self._handle_process(request, writer)
+            else:
+                await send({'event': 'error', 'error': f"未知命令: {command}"})
+        except Exception as e:
+            logger.error(f"处理客户端请求时出错: {str(e)}")
+            try:
+                await send({'event': 'error', 'error': str(e)})
+            except Exception:
+                pass
+        finally:
+            writer.close()
+
+    async def _handle_process(self, request, writer):
+        def send(event):
+            writer.write(json.dumps(event, ensure_ascii=False).encode('utf-8') + b'\n')
+
+        def on_progress(event):
+            send({'event': event.kind, 'message': event.message})
+
+        try:
+            await self.processor.process_async(
+                request['input'],
+                request.get('gradient_config'),
+                request.get('font_size'),
+                request.get('font_name'),
+                output=request['output'],
+                gradient_configs=self.gradient_configs,
+                font_configs=self.font_configs,
+                progress=on_progress
+            )
+            send({'event': 'done', 'output': request['output']})
+        except Exception as e:
+            logger.error(f"守护进程处理 {request.get('input')} 失败: {str(e)}")
+            send({'event': 'failed', 'error': str(e)})
+        await writer.drain()
+
+
+def run_daemon(socket_path: Optional[str] = None, workers: Optional[int] = None):
+    asyncio.run(ProcessingDaemon(socket_path, workers).serve())
@@ -0,0 +1,92 @@
+import json
+import os
+import socket
+import tempfile
+from typing import Dict, List, Optional
+
+# 客户端只依赖标准库，避免在每次调用时导入 PySide6 / python-pptx
+
+
+class DaemonError(Exception):
+    pass
+
+
+def _is_private_dir(path: str) -> bool:
+    # 必须是当前用户所有、其他用户无法访问的真实目录（不是符号链接）
+    try:
+        stat = os.lstat(path)
+    except FileNotFoundError:
+        return False
+    return (os.path.isdir(path) and not os.path.islink(path) and stat.st_uid == os.getuid()
+            and stat.st_mode & 0o077 == 0)
+
+
+def default_socket_path() -> str:
+    # 套接字放在只有当前用户能访问的目录中，其他本地用户无法抢先占用或冒充守护进程：
+    # 优先使用 $XDG_RUNTIME_DIR，否则在临时目录下创建 0700 的 rescuegamma-<uid> 目录
+    if not hasattr(os, 'getuid'):
+        return os.path.join(tempfile.gettempdir(), 'rescuegamma.sock')
+
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir and _is_private_dir(runtime_dir):
+        return os.path.join(runtime_dir, 'rescuegamma.sock')
+
+    socket_dir = os.path.join(tempfile.gettempdir(), f'rescuegamma-{os.getuid()}')
+    try:
+        os.mkdir(socket_dir, 0o700)
+    except FileExistsError:
+        pass
+    if not _is_private_dir(socket_dir):
+        raise DaemonError(f"套接字目录 {socket_dir} 不属于当前用户或权限不是 0700，请检查后删除或用 --socket 指定路径")
+    return os.path.join(socket_dir, 'rescuegamma.sock')
+
+
+class DaemonClient:
+    def __init__(self, socket_path: Optional[str] = None, timeout: Optional[float] = None):
+        if not hasattr(socket, 'AF_UNIX'):
+            raise DaemonError("当前系统不支持Unix域套接字")
+        self.socket_path = socket_path or default_socket_path()
+        self.timeout = timeout
+
+    def _request(self, request: Dict, on_event=None) -> Dict:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError as e:
+            sock.close()
+            raise DaemonError(f"无法连接到处理守护进程 {self.socket_path}: {str(e)}")
+
+        with sock, sock.makefile('rwb') as stream:
+            stream.write(json.dumps(request, ensure_ascii=False).encode('utf-8') + b'\n')
+            stream.flush()
+
+            for line in stream:
+                event = json.loads(line.decode('utf-8'))
+                if event.get('event') in ('done', 'failed', 'ok', 'error'):
+                    return event
+                if on_event is not None:
+                    on_event(event)
+
+        raise DaemonError("守护进程在返回结果前断开了连接")
+
+    def ping(self) -> Dict:
+        return self._request({'cmd': 'ping'})
+
+    def reload(self) -> Dict:
+        return self._request({'cmd': 'reload'})
+
+    def shutdown(self) -> Dict:
+        return self._request({'cmd': 'shutdown'})
+
+    def process(self, input_path: str, output_path: str, gradient_config: List[Dict] = None, font_size: str = None,
+                font_name: str = None, on_event=None) -> Dict:
+        request = {
+            'cmd': 'process',
+            'input': os.path.abspath(input_path),
+            'output': os.path.abspath(output_path),
+            'gradient_config': gradient_config,
+            'font_size': font_size,
+            'font_name': font_name
+        }
+        return self._request(request, on_event)
@@ -1,7 +1,60 @@
+import copy
+import functools
+import io
 import os
 import shutil
+import struct
+import sys
 import tempfile
 import zipfile
+import zlib
+from typing import Dict, Optional, Tuple
+
+LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+LOCAL_HEADER_SIZE = 30
+DATA_DESCRIPTOR_FLAG = 0x08
+# 直接写入已压缩数据依赖 ZipFile 的内部属性，只在验证过的 Python 版本上启用
+RAW_COPY_VERSIONS = ((3, 8), (3, 13))
+
+
+def _append_raw_member(zip_out: zipfile.ZipFile, info: zipfile.ZipInfo, raw: bytes):
+    # zipfile 没有公开写入已压缩数据的接口，这里按 writestr 的方式写本地文件头并登记到中央目录
+    info = copy.copy(info)
+    info.flag_bits &= ~DATA_DESCRIPTOR_FLAG
+    info.header_offset = zip_out.fp.tell()
+    zip_out.fp.write(info.FileHeader())
+    zip_out.fp.write(raw)
+    zip_out.filelist.append(info)
+    zip_out.NameToInfo[info.filename] = info
+    zip_out.start_dir = zip_out.fp.tell()
+    zip_out._didModify = True
+
+
+@functools.lru_cache(maxsize=None)
+def raw_copy_supported() -> bool:
+    # 版本不在验证范围内，或写出的测试压缩包无法重新打开校验时，退回解压后用 writestr 重新压缩
+    if not RAW_COPY_VERSIONS[0] <= sys.version_info[:2] <= RAW_COPY_VERSIONS[1]:
+        return False
+    try:
+        data = b'<raw copy probe/>' * 8
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+        info = zipfile.ZipInfo('probe.xml')
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.CRC = zlib.crc32(data)
+        info.file_size = len(data)
+        raw = compressor.compress(data) + compressor.flush()
+        info.compress_size = len(raw)
+
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as zip_out:
+            zip_out.writestr('first.xml', b'<first/>')
+            _append_raw_member(zip_out, info, raw)
+            zip_out.writestr('last.xml', b'<last/>')
+        with zipfile.ZipFile(io.BytesIO(buffer.getvalue())) as zip_in:
+            return (zip_in.testzip() is None and zip_in.namelist() == ['first.xml', 'probe.xml', 'last.xml']
+                    and zip_in.read('probe.xml') == data)
+    except Exception:
+        return False
 
 
 class FileManager:
@@ -45,3 +98,73 @@ class FileManager:
                 slide_files.append(os.path.join(slides_dir, file))
 
         return sorted(slide_files)
+
+    def read_pptx_bytes(self, source) -> bytes:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return bytes(source)
+        if hasattr(source, 'read'):
+            return source.read()
+        if not os.path.exists(source):
+            raise FileNotFoundError(f"PPT文件不存在: {source}")
+        with open(source, 'rb') as f:
+            return f.read()
+
+    def get_slide_names(self, names: list) -> list:
+        slide_names = []
+        for name in names:
+            dir_name, file_name = name.rsplit('/', 1) if '/' in name else ('', name)
+            if dir_name == 'ppt/slides' and file_name.startswith('slide') and file_name.endswith('.xml'):
+                slide_names.append(name)
+
+        return sorted(slide_names)
+
+    def read_raw_member(self, pptx_bytes: bytes, info: zipfile.ZipInfo) -> bytes:
+        # 直接从本地文件头之后取出压缩数据，不解压
+        offset = info.header_offset
+        if pptx_bytes[offset:offset + 4] != LOCAL_HEADER_SIGNATURE:
+            raise zipfile.BadZipFile(f"成员 {info.filename} 的文件头损坏")
+        name_length, extra_length = struct.unpack('<HH', pptx_bytes[offset + 26:offset + LOCAL_HEADER_SIZE])
+        start = offset + LOCAL_HEADER_SIZE + name_length + extra_length
+        return pptx_bytes[start:start + info.compress_size]
+
+    def deflate_member(self, info: zipfile.ZipInfo, data: bytes) -> Tuple[zipfile.ZipInfo, bytes]:
+        # 压缩一次即可在多个输出文件中复用
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+        raw = compressor.compress(data) + compressor.flush()
+
+        info = copy.copy(info)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.CRC = zlib.crc32(data)
+        info.file_size = len(data)
+        info.compress_size = len(raw)
+        return info, raw
+
+    def write_raw_member(self, zip_out: zipfile.ZipFile, info: zipfile.ZipInfo, raw: bytes, raw_copy: bool = False):
+        # raw 为 deflate_member 压缩好的数据，不直接写入时解压后用 writestr 重新压缩
+        if raw_copy and raw_copy_supported():
+            _append_raw_member(zip_out, info, raw)
+        else:
+            zip_out.writestr(info, zlib.decompress(raw, -15))
+
+    def rewrite_pptx(self, pptx_bytes: bytes, replacements: Dict[str, bytes],
+                     compressed: Optional[Dict[str, Tuple[zipfile.ZipInfo, bytes]]] = None,
+                     raw_copy: bool = False) -> bytes:
+        # 在内存中重建压缩包，保持原有的成员顺序，仅替换修改过的部件，compressed 中是已经压缩好的替换部件；
+        # 默认通过 writestr 写入全部成员，raw_copy 为 True 且当前版本支持时未修改的成员直接复制原始压缩数据
+        compressed = compressed or {}
+        raw_copy = raw_copy and raw_copy_supported()
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(io.BytesIO(pptx_bytes), 'r') as zip_in, \
+                zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zip_out:
+            for info in zip_in.infolist():
+                data = replacements.get(info.filename)
+                if data is not None:
+                    zip_out.writestr(info, data)
+                elif info.filename in compressed:
+                    self.write_raw_member(zip_out, *compressed[info.filename], raw_copy=raw_copy)
+                elif raw_copy:
+                    _append_raw_member(zip_out, info, self.read_raw_member(pptx_bytes, info))
+                else:
+                    zip_out.writestr(info, zip_in.read(info))
+
+        return buffer.getvalue()
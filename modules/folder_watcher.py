@@ -0,0 +1,179 @@
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from typing import Dict, List, Optional
+
+from .ppt_processor import PPTProcessor, logger
+
+# 与任务队列和 queue-submit 一致，输出文件名为 "原文件名_RescueGamma.pptx"
+OUTPUT_SUFFIX = '_RescueGamma'
+
+
+def process_file(input_path: str, output_path: str) -> str:
+    # 工作进程入口：每个任务重新读取当前的字体和渐变配置
+    processor = PPTProcessor()
+    pptx_bytes = processor.process_bytes(input_path)
+
+    temp_path = output_path + '.part'
+    with open(temp_path, 'wb') as f:
+        f.write(pptx_bytes)
+    os.replace(temp_path, output_path)
+    return output_path
+
+
+class FolderWatcher:
+    STATE_FILE = '.rescuegamma_watch.json'
+
+    def __init__(self, input_dir: str, output_dir: str, workers: Optional[int] = None, poll_interval: float = 2.0,
+                 settle_time: float = 3.0, executor: Optional[Executor] = None):
+        self.input_dir = os.path.abspath(input_dir)
+        self.output_dir = os.path.abspath(output_dir)
+        # 输出目录不能是输入目录或其子目录，否则输出文件会被当作新文件反复处理
+        real_input = os.path.realpath(self.input_dir)
+        real_output = os.path.realpath(self.output_dir)
+        if os.path.commonpath([real_input, real_output]) == real_input:
+            raise ValueError(f"输出目录不能是输入目录或其子目录: {self.output_dir}")
+        self.poll_interval = poll_interval
+        self.settle_time = settle_time
+        self.executor = executor or ProcessPoolExecutor(max_workers=max(1, workers or os.cpu_count() or 1))
+        self.owns_executor = executor is None
+        self.state_path = os.path.join(self.output_dir, self.STATE_FILE)
+        self.state = {'done': {}, 'failed': {}}
+        self.observed = {}
+        self.running = {}
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.load_state()
+
+    def load_state(self):
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            self.state['done'] = state.get('done', {})
+            self.state['failed'] = state.get('failed', {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"读取监视目录状态文件失败: {str(e)}")
+
+    def save_state(self):
+        temp_path = self.state_path + '.part'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.state_path)
+
+    def _signature(self, path: str):
+        try:
+            stat = os.stat(path)
+            return [stat.st_size, stat.st_mtime_ns]
+        except OSError:
+            return None
+
+    def _is_recorded(self, name: str, signature) -> bool:
+        for bucket in ('done', 'failed'):
+            record = self.state[bucket].get(name)
+            if record is not None and record.get('signature') == signature:
+                return True
+        return False
+
+    def scan(self) -> List[str]:
+        # 返回已停止增长、尚未处理过的文件名；文件大小或修改时间变化会重新计时
+        now = time.monotonic()
+        ready = []
+        seen = set()
+
+        for name in sorted(os.listdir(self.input_dir)):
+            if not name.lower().endswith('.pptx') or name.startswith('~$'):
+                continue
+            if os.path.splitext(name)[0].endswith(OUTPUT_SUFFIX):
+                continue
+            path = os.path.join(self.input_dir, name)
+            if not os.path.isfile(path):
+                continue
+
+            seen.add(name)
+            signature = self._signature(path)
+            if signature is None or signature[0] == 0 or name in self.running:
+                continue
+            if self._is_recorded(name, signature):
+                self.observed.pop(name, None)
+                continue
+
+            previous = self.observed.get(name)
+            if previous is None or previous[0] != signature:
+                self.observed[name] = (signature, now)
+            elif now - previous[1] >= self.settle_time:
+                ready.append(name)
+
+        for name in list(self.observed):
+            if name not in seen:
+                del self.observed[name]
+
+        return ready
+
+    def submit(self, name: str):
+        signature, _ = self.observed.pop(name)
+        input_path = os.path.join(self.input_dir, name)
+        stem, ext = os.path.splitext(name)
+        output_path = os.path.join(self.output_dir, f"{stem}{OUTPUT_SUFFIX}{ext}")
+        future = self.executor.submit(process_file, input_path, output_path)
+        self.running[name] = (future, signature)
+        logger.info(f"监视目录: 开始处理 {name}")
+
+    def collect(self, timeout: Optional[float] = 0) -> Dict[str, bool]:
+        results = {}
+        if not self.running:
+            return results
+
+        futures = {future: name for name, (future, _) in self.running.items()}
+        done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            name = futures[future]
+            _, signature = self.running.pop(name)
+            record = {'signature': signature, 'finished_at': time.strftime('%Y-%m-%d %H:%M:%S')}
+            try:
+                record['output'] = future.result()
+                self.state['done'][name] = record
+                self.state['failed'].pop(name, None)
+                results[name] = True
+                logger.info(f"监视目录: 处理完成 {name}")
+            except Exception as e:
+                record['error'] = str(e)
+                self.state['failed'][name] = record
+                self.state['done'].pop(name, None)
+                results[name] = False
+                logger.error(f"监视目录: 处理失败 {name}: {str(e)}")
+
+        if done:
+            self.save_state()
+        return results
+
+    def poll_once(self) -> Dict[str, bool]:
+        for name in self.scan():
+            self.submit(name)
+        return self.collect()
+
+    def drain(self) -> Dict[str, bool]:
+        results = {}
+        while self.running:
+            results.update(self.collect(timeout=None))
+        return results
+
+    def run(self, status_callback=None):
+        logger.info(f"开始监视目录 {self.input_dir}，输出到 {self.output_dir}")
+        try:
+            while True:
+                for name, success in self.poll_once().items():
+                    if status_callback is not None:
+                        status_callback(f"{'处理完成' if success else '处理失败'}: {name}")
+                time.sleep(self.poll_interval)
+        except KeyboardInterrupt:
+            logger.info("停止监视目录，等待进行中的任务完成")
+            self.drain()
+        finally:
+            self.close()
+
+    def close(self):
+        if self.owns_executor:
+            self.executor.shutdown()
@@ -0,0 +1,100 @@
+import fnmatch
+import json
+import re
+from typing import Dict, FrozenSet, Optional
+
+REGEX_PREFIX = 're:'
+GLOB_CHARS = frozenset('*?[')
+
+_SEPARATORS = re.compile(r'[\s_\-]+')
+
+
+def normalize_typeface(name: str) -> str:
+    # "Sora-Bold"、"sora  bold"、"Sora_Bold" 统一为 "sora bold"
+    return _SEPARATORS.sub(' ', name or '').strip().casefold()
+
+
+def is_font_pattern(pattern: Optional[str]) -> bool:
+    return bool(pattern) and (pattern.startswith(REGEX_PREFIX) or any(char in GLOB_CHARS for char in pattern))
+
+
+def load_font_aliases(path: str) -> Dict[str, str]:
+    # 别名表格式：{"Sora SemiBold": "Sora", "Source Han Sans SC": "思源黑体"}，文件不存在时不使用别名
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            aliases = json.load(f)
+            return aliases if isinstance(aliases, dict) else {}
+    except FileNotFoundError:
+        return {}
+
+
+class FontMatcher:
+    # 字体名先规范化并按别名表归一，再与规则中的字体模式比较：
+    #   普通字体名  规范化后完全相等
+    #   Sora*      通配符
+    #   re:...     正则表达式（在规范化后的名称上搜索，忽略大小写）
+    # 每个不同的字体名只计算一次，结果缓存为命中的模式编号集合
+    def __init__(self, aliases: Optional[Dict[str, str]] = None):
+        self.aliases = {normalize_typeface(alias): normalize_typeface(name) for alias, name in (aliases or {}).items()}
+        self.pattern_ids = {}
+        self.compiled = []
+        self.sources = []
+        self.combined = None
+        self.cache = {}
+
+    def canonical(self, typeface: str) -> str:
+        name = normalize_typeface(typeface)
+        return self.aliases.get(name, name)
+
+    def _source(self, pattern: str) -> str:
+        if pattern.startswith(REGEX_PREFIX):
+            return f'.*?(?:{pattern[len(REGEX_PREFIX):]})'
+        if is_font_pattern(pattern):
+            return fnmatch.translate(self.canonical(pattern))
+        return re.escape(self.canonical(pattern)) + r'\Z'
+
+    def add(self, pattern: str) -> int:
+        pattern_id = self.pattern_ids.get(pattern)
+        if pattern_id is not None:
+            return pattern_id
+
+        source = self._source(pattern)
+        try:
+            compiled = re.compile(source, re.IGNORECASE)
+        except re.error:
+            compiled = None
+            source = None
+
+        pattern_id = len(self.compiled)
+        self.pattern_ids[pattern] = pattern_id
+        self.compiled.append(compiled)
+        self.sources.append(source)
+        self.combined = None
+        self.cache.clear()
+        return pattern_id
+
+    def _combined(self):
+        # 所有模式合并成一个正则，大部分字体名一次匹配失败即可排除
+        if self.combined is None:
+            sources = [f'(?:{source})' for source in self.sources if source is not None]
+            try:
+                self.combined = re.compile('|'.join(sources), re.IGNORECASE) if sources else False
+            except re.error:
+                self.combined = False
+        return self.combined
+
+    def matches(self, typeface: str) -> FrozenSet[int]:
+        result = self.cache.get(typeface)
+        if result is None:
+            name = self.canonical(typeface)
+            combined = self._combined()
+            if combined and not combined.match(name):
+                result = frozenset()
+            else:
+                result = frozenset(pattern_id for pattern_id, compiled in enumerate(self.compiled)
+                                   if compiled is not None and compiled.match(name))
+            self.cache[typeface] = result
+        return result
+
+    def match(self, pattern: str, typeface: str) -> bool:
+        return self.add(pattern) in self.matches(typeface)
@@ -0,0 +1,202 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# 渐变位置使用 PPT 的 0-100000 刻度，按 1% 取整
+POSITION_SCALE = 100000
+POSITION_STEP = 1000
+
+# sRGB（D65）线性值到 XYZ 的转换矩阵和 D65 白点
+SRGB_TO_XYZ = np.array([[0.4124564, 0.3575761, 0.1804375],
+                        [0.2126729, 0.7151522, 0.0721750],
+                        [0.0193339, 0.1191920, 0.9503041]])
+D65_WHITE = np.array([0.95047, 1.0, 1.08883])
+
+
+def border_background(pixels: np.ndarray, bits: int = 5) -> Tuple[int, int, int]:
+    # 背景色取整圈边框像素颜色直方图的众数：每个通道量化到 bits 位后统计，返回众数格内像素的平均色，
+    # 文字或装饰碰到某个角时也不会影响结果
+    border = np.concatenate([pixels[0], pixels[-1], pixels[1:-1, 0], pixels[1:-1, -1]]).astype(np.int32)
+    shift = 8 - bits
+    bins = ((border[:, 0] >> shift) << (2 * bits)) | ((border[:, 1] >> shift) << bits) | (border[:, 2] >> shift)
+    mode = np.bincount(bins).argmax()
+    r, g, b = border[bins == mode].mean(axis=0).round().astype(int)
+    return int(r), int(g), int(b)
+
+
+def background_distance(pixels: np.ndarray, background) -> np.ndarray:
+    # pixels 为 (高, 宽, 3) 的 RGB 数组，返回每个像素与背景色 RGB 距离的平方（int32，避免对整张图开方）
+    distance = np.zeros(pixels.shape[:2], dtype=np.int32)
+    for channel in range(3):
+        diff = pixels[..., channel].astype(np.int32) - int(background[channel])
+        distance += diff * diff
+    return distance
+
+
+def text_mask(distance: np.ndarray, threshold: float = 60.0, core: float = 0.75) -> np.ndarray:
+    # 与背景色距离足够远的像素视为文字像素；文字边缘的抗锯齿像素混入了背景色，
+    # 只保留距离不低于附近各列（约 2% 宽度）最大距离 core 倍的像素，字形弧线边缘只有浅色像素的列会被整列剔除
+    mask = distance > threshold * threshold
+    column_max = np.where(mask, distance, 0).max(axis=0)
+    window = max(1, distance.shape[1] // 50) | 1
+    padded = np.pad(column_max, window // 2, mode='edge')
+    local_max = np.lib.stride_tricks.sliding_window_view(padded, window).max(axis=1)
+    return mask & (distance >= local_max * (core * core))
+
+
+def detect_text(pixels: np.ndarray, threshold: float = 60.0) -> Tuple[Tuple[int, int, int], np.ndarray]:
+    # 返回背景色和文字像素掩码
+    background = border_background(pixels)
+    return background, text_mask(background_distance(pixels, background), threshold)
+
+
+def column_profile(pixels: np.ndarray, mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # 每一列文字像素的平均颜色；返回 (宽, 3) 的颜色和该列是否有文字像素
+    counts = np.count_nonzero(mask, axis=0)
+    weights = mask.astype(np.float32)
+    sums = np.stack([np.einsum('hw,hw->w', pixels[..., channel].astype(np.float32), weights)
+                     for channel in range(3)], axis=1)
+    valid = counts > 0
+    profile = np.zeros((pixels.shape[1], 3))
+    profile[valid] = sums[valid] / counts[valid, None]
+    return profile, valid
+
+
+def fill_profile(profile: np.ndarray, valid: np.ndarray, smooth: int = 0) -> np.ndarray:
+    # 没有文字像素的列（字间空隙、左右留白）按相邻列线性插值，两端取最近的有效值，再做滑动平均去掉抗锯齿噪声
+    columns = np.arange(len(profile))
+    filled = np.stack([np.interp(columns, columns[valid], profile[valid, channel]) for channel in range(3)], axis=1)
+    if smooth > 1:
+        kernel = np.ones(smooth) / smooth
+        padded = np.pad(filled, ((smooth // 2, smooth - 1 - smooth // 2), (0, 0)), mode='edge')
+        filled = np.stack([np.convolve(padded[:, channel], kernel, mode='valid') for channel in range(3)], axis=1)
+    return filled
+
+
+def band_color(pixels: np.ndarray, mask: np.ndarray, x: int, half_width: int) -> Optional[Tuple[int, int, int]]:
+    # 以 x 为中心、左右各 half_width 列的竖条内文字像素的平均颜色；竖条内没有文字像素时返回 None
+    start, end = max(0, x - half_width), min(pixels.shape[1], x + half_width + 1)
+    band = mask[:, start:end]
+    if not band.any():
+        return None
+    r, g, b = pixels[:, start:end][band].mean(axis=0).round().astype(int)
+    return int(r), int(g), int(b)
+
+
+def kernel_color(pixels: np.ndarray, x: int, y: int, radius: int = 0, method: str = 'mean') -> Tuple[int, int, int]:
+    # 以 (x, y) 为中心 (2 * radius + 1) 见方窗口内像素的平均值或中位数，窗口超出图片的部分裁掉；
+    # 中位数对截图噪点和 JPEG 色块更稳定
+    window = pixels[max(0, y - radius):y + radius + 1, max(0, x - radius):x + radius + 1].reshape(-1, 3)
+    if method == 'median':
+        color = np.median(window, axis=0)
+    else:
+        color = window.mean(axis=0)
+    r, g, b = color.round().astype(int)
+    return int(r), int(g), int(b)
+
+
+def interpolate_stops(length: int, breaks: List[int], profile: np.ndarray) -> np.ndarray:
+    columns = np.arange(length)
+    return np.stack([np.interp(columns, breaks, profile[breaks, channel]) for channel in range(3)], axis=1)
+
+
+def fit_gradient_stops(profile: np.ndarray, max_stops: int = 4, tolerance: float = 8.0) -> List[int]:
+    # 分段线性拟合：从首尾两个色标开始，每次在误差最大的列增加一个色标，
+    # 直到所有列与拟合结果的 RGB 距离都不超过 tolerance，或色标数量达到 max_stops
+    length = len(profile)
+    breaks = [0, length - 1] if length > 1 else [0]
+    while len(breaks) < max_stops:
+        error = np.linalg.norm(profile - interpolate_stops(length, breaks, profile), axis=1)
+        worst = int(np.argmax(error))
+        if error[worst] <= tolerance:
+            break
+        breaks = sorted(breaks + [worst])
+    return breaks
+
+
+def extract_gradient(pixels: np.ndarray, mask: np.ndarray, max_stops: int = 4, tolerance: float = 8.0) -> List[Dict]:
+    # 从截图中提取水平渐变，mask 为 text_mask() 得到的文字像素，返回 config.json 中 gradient_config 格式的色标列表；
+    # 位置按文字的水平范围计算（第一列文字像素为 0，最后一列为 100000），截图左右留白不影响结果
+    profile, valid = column_profile(pixels, mask)
+    columns = np.flatnonzero(valid)
+    if not len(columns):
+        return []
+
+    first, last = columns[0], columns[-1] + 1
+    width = last - first
+    profile = fill_profile(profile[first:last], valid[first:last], smooth=max(1, width // 100))
+    breaks = fit_gradient_stops(profile, max(2, max_stops), tolerance)
+
+    gradient_config = []
+    for column in breaks:
+        position = round(column / max(width - 1, 1) * POSITION_SCALE / POSITION_STEP) * POSITION_STEP
+        r, g, b = (int(round(value)) for value in profile[column])
+        color = f"#{r:02X}{g:02X}{b:02X}"
+        if gradient_config and gradient_config[-1]['position'] == position:
+            continue
+        gradient_config.append({'position': position, 'color': color})
+    return gradient_config
+
+
+def parse_hex_color(color: str) -> Optional[Tuple[int, int, int]]:
+    # "#RRGGBB" 或 "RRGGBB"；主题色（如 accent1）等无法换算的颜色返回 None
+    text = color[1:] if color.startswith('#') else color
+    if len(text) != 6:
+        return None
+    try:
+        value = int(text, 16)
+    except ValueError:
+        return None
+    return value >> 16 & 255, value >> 8 & 255, value & 255
+
+
+def srgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    # rgb 为 (..., 3) 的 0-255 sRGB 值，返回 D65 白点下的 CIELAB
+    channels = np.asarray(rgb, dtype=np.float64) / 255
+    linear = np.where(channels <= 0.04045, channels / 12.92, ((channels + 0.055) / 1.055) ** 2.4)
+    xyz = linear @ SRGB_TO_XYZ.T / D65_WHITE
+    f = np.where(xyz > (6 / 29) ** 3, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+    return np.stack([116 * f[..., 1] - 16, 500 * (f[..., 0] - f[..., 1]), 200 * (f[..., 1] - f[..., 2])], axis=-1)
+
+
+def simplify_gradient(gradient_config: List[Dict], max_delta_e: float = 1.0) -> List[Dict]:
+    # Douglas–Peucker 精简色标：渐变在相邻色标之间按 sRGB 线性插值，去掉一个色标后，
+    # 只要原色标位置上插值颜色与原颜色的 CIELAB 色差 (ΔE76) 都不超过 max_delta_e 就删除它，显示效果几乎不变。
+    # 首尾色标、主题色色标以及与主题色相邻区间内的色标始终保留；返回新列表，保持原有顺序
+    # config.json 和界面中的位置可能是字符串，按数值排序
+    values = [float(stop['position']) for stop in gradient_config]
+    order = sorted(range(len(gradient_config)), key=lambda i: values[i])
+    if max_delta_e <= 0 or len(order) <= 2:
+        return [dict(stop) for stop in gradient_config]
+
+    stops = [gradient_config[i] for i in order]
+    rgbs = [parse_hex_color(str(stop['color'])) for stop in stops]
+    positions = np.array([values[i] for i in order], dtype=np.float64)
+    rgb = np.array([value or (0, 0, 0) for value in rgbs], dtype=np.float64)
+    lab = srgb_to_lab(rgb)
+
+    keep = [index in (0, len(stops) - 1) or value is None for index, value in enumerate(rgbs)]
+
+    def reduce(start, end):
+        if end - start < 2:
+            return
+        if rgbs[start] is None or rgbs[end] is None:
+            keep[start + 1:end] = [True] * (end - start - 1)
+            return
+        span = positions[end] - positions[start]
+        t = (positions[start + 1:end] - positions[start]) / span if span else np.zeros(end - start - 1)
+        interpolated = rgb[start] + t[:, None] * (rgb[end] - rgb[start])
+        error = np.linalg.norm(srgb_to_lab(interpolated) - lab[start + 1:end], axis=1)
+        worst = int(np.argmax(error))
+        if error[worst] > max_delta_e:
+            split = start + 1 + worst
+            keep[split] = True
+            reduce(start, split)
+            reduce(split, end)
+
+    anchors = [index for index, kept in enumerate(keep) if kept]
+    for start, end in zip(anchors, anchors[1:]):
+        reduce(start, end)
+
+    kept = {order[index] for index, value in enumerate(keep) if value}
+    return [dict(stop) for index, stop in enumerate(gradient_config) if index in kept]
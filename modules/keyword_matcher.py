@@ -0,0 +1,85 @@
+from collections import deque
+from typing import FrozenSet, Iterable, List, Optional
+
+
+def parse_keywords(value) -> List[str]:
+    # 配置中的关键词可以是列表，也可以是用逗号、顿号或换行分隔的字符串
+    if not value:
+        return []
+    if isinstance(value, str):
+        for separator in ('，', '、', '\n'):
+            value = value.replace(separator, ',')
+        value = value.split(',')
+    return [keyword.strip() for keyword in value if keyword and keyword.strip()]
+
+
+class KeywordMatcher:
+    # Aho–Corasick 多模式匹配：所有关键词构建成一个自动机，每段文本只扫描一遍即可得到命中的全部关键词，
+    # 忽略大小写；同一段文本的结果会被缓存
+    def __init__(self, keywords: Iterable[str] = ()):
+        self.keywords = []
+        self.keyword_ids = {}
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [frozenset()]
+        self.cache = {}
+
+        for keyword in keywords:
+            self._insert(keyword)
+        self._build()
+
+    def _insert(self, keyword: str):
+        key = keyword.casefold()
+        if not key or key in self.keyword_ids:
+            return
+
+        keyword_id = len(self.keywords)
+        self.keywords.append(keyword)
+        self.keyword_ids[key] = keyword_id
+
+        node = 0
+        for char in key:
+            next_node = self.goto[node].get(char)
+            if next_node is None:
+                next_node = len(self.goto)
+                self.goto[node][char] = next_node
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(frozenset())
+            node = next_node
+        self.output[node] = self.output[node] | {keyword_id}
+
+    def _build(self):
+        # 广度优先计算失配指针，第一层节点的失配指针指向根节点
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                state = self.fail[node]
+                while state and char not in self.goto[state]:
+                    state = self.fail[state]
+                self.fail[child] = self.goto[state].get(char, 0)
+                self.output[child] = self.output[child] | self.output[self.fail[child]]
+
+    def keyword_id(self, keyword: str) -> Optional[int]:
+        return self.keyword_ids.get(keyword.casefold())
+
+    def find(self, text: str) -> FrozenSet[int]:
+        result = self.cache.get(text)
+        if result is not None:
+            return result
+
+        found = set()
+        node = 0
+        goto, fail, output = self.goto, self.fail, self.output
+        for char in text.casefold():
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                found.update(output[node])
+
+        result = frozenset(found)
+        self.cache[text] = result
+        return result
@@ -0,0 +1,29 @@
+import re
+from functools import lru_cache
+
+# 汉字：基本区、扩展A、兼容汉字以及扩展B~H（辅助平面）
+HAN_PATTERN = re.compile(
+    r'[\u4e00-\u9fff\u3400-\u4dbf\uf900-\ufaff'
+    r'\U00020000-\U0002a6df\U0002a700-\U0002ebef\U0002f800-\U0002fa1f\U00030000-\U0003134f]'
+)
+# 平假名、片假名、片假名扩展、半角片假名
+KANA_PATTERN = re.compile(r'[\u3040-\u309f\u30a0-\u30ff\u31f0-\u31ff\uff66-\uff9f]')
+# 谚文音节、字母及兼容字母
+HANGUL_PATTERN = re.compile(r'[\uac00-\ud7af\u1100-\u11ff\u3130-\u318f\ua960-\ua97f\ud7b0-\ud7ff]')
+
+DEFAULT_LANG = 'en-US'
+
+
+@lru_cache(maxsize=4096)
+def detect_lang(text: str) -> str:
+    # 同一份PPT中页眉页脚等文本会大量重复出现，按文本缓存结果
+    if not text or text.isascii():
+        return DEFAULT_LANG
+    # 日文通常混用汉字和假名，出现假名即判为日文；韩文同理按谚文判断
+    if KANA_PATTERN.search(text):
+        return 'ja-JP'
+    if HANGUL_PATTERN.search(text):
+        return 'ko-KR'
+    if HAN_PATTERN.search(text):
+        return 'zh-CN'
+    return DEFAULT_LANG
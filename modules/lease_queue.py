@@ -0,0 +1,289 @@
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from .ppt_processor import PPTProcessor, logger
+
+
+def process_job(job: Dict) -> str:
+    # 默认的任务处理函数：与 GUI 使用同一个 PPTProcessor 引擎
+    processor = PPTProcessor()
+    pptx_bytes = processor.process_bytes(job['input'], job.get('gradient_config'), job.get('font_size'),
+                                         job.get('font_name'))
+
+    output_path = job['output']
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    temp_path = f"{output_path}.{uuid.uuid4().hex[:8]}.part"
+    with open(temp_path, 'wb') as f:
+        f.write(pptx_bytes)
+    os.replace(temp_path, output_path)
+    return output_path
+
+
+def _write_json_atomic(path: str, data: Dict):
+    temp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+def _read_json(path: str) -> Optional[Dict]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+class Lease:
+    def __init__(self, job_id: str, path: str, token: str, job: Dict):
+        self.job_id = job_id
+        self.path = path
+        self.token = token
+        self.job = job
+        self.lost = False
+
+
+class LeaseQueue:
+    # 基于共享目录的任务队列：
+    #   pending/<id>.json  待处理任务
+    #   leases/<id>.lease  独占创建的租约文件，修改时间即最近一次心跳
+    #   leases/.clock      探针文件，用来读取共享文件系统的当前时间
+    #   done/<id>.json、failed/<id>.json  处理结果
+    def __init__(self, root: str, lease_seconds: float = 60.0, max_attempts: int = 3):
+        self.root = os.path.abspath(root)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.dirs = {name: os.path.join(self.root, name) for name in ('pending', 'leases', 'done', 'failed')}
+        for path in self.dirs.values():
+            os.makedirs(path, exist_ok=True)
+
+    def _path(self, bucket: str, job_id: str, ext: str = '.json') -> str:
+        return os.path.join(self.dirs[bucket], job_id + ext)
+
+    def submit(self, input_path: str, output_path: str, gradient_config: List[Dict] = None, font_size: str = None,
+               font_name: str = None, job_id: Optional[str] = None) -> str:
+        job_id = job_id or f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"
+        job = {
+            'id': job_id,
+            'input': os.path.abspath(input_path),
+            'output': os.path.abspath(output_path),
+            'gradient_config': gradient_config,
+            'font_size': font_size,
+            'font_name': font_name,
+            'attempts': 0,
+            'submitted_at': time.time()
+        }
+        _write_json_atomic(self._path('pending', job_id), job)
+        return job_id
+
+    def pending_ids(self) -> List[str]:
+        return sorted(name[:-5] for name in os.listdir(self.dirs['pending']) if name.endswith('.json'))
+
+    def status(self) -> Dict[str, int]:
+        counts = {}
+        for bucket, path in self.dirs.items():
+            ext = '.lease' if bucket == 'leases' else '.json'
+            counts[bucket] = sum(1 for name in os.listdir(path) if name.endswith(ext))
+        return counts
+
+    def _fs_time(self) -> float:
+        # 租约的修改时间由文件服务器设置，过期判断也要用文件服务器的时钟：刷新探针文件的修改时间再读回来，
+        # 各机器本地时钟与文件服务器不一致时，租约也不会被提前回收或永不过期
+        clock_path = os.path.join(self.dirs['leases'], '.clock')
+        with open(clock_path, 'a', encoding='utf-8'):
+            pass
+        os.utime(clock_path)
+        return os.stat(clock_path).st_mtime
+
+    def _lease_age(self, lease_path: str, now: Optional[float] = None) -> Optional[float]:
+        try:
+            mtime = os.stat(lease_path).st_mtime
+        except FileNotFoundError:
+            return None
+        return (self._fs_time() if now is None else now) - mtime
+
+    def _create_lease(self, lease_path: str, token: str) -> bool:
+        try:
+            fd = os.open(lease_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(token)
+        return True
+
+    def _reclaim_expired(self, job_id: str) -> bool:
+        # 用独占的 reclaim 锁串行化回收，避免两个工作进程同时删除同一个过期租约
+        lease_path = self._path('leases', job_id, '.lease')
+        lock_path = self._path('leases', job_id, '.reclaim')
+        if not self._create_lease(lock_path, 'reclaim'):
+            lock_age = self._lease_age(lock_path)
+            if lock_age is not None and lock_age > self.lease_seconds:
+                try:
+                    os.remove(lock_path)
+                except FileNotFoundError:
+                    pass
+            return False
+
+        try:
+            age = self._lease_age(lease_path)
+            if age is None or age <= self.lease_seconds:
+                return False
+            try:
+                os.remove(lease_path)
+            except FileNotFoundError:
+                return False
+            logger.warning(f"任务 {job_id} 的租约已过期 {age:.0f} 秒，重新分配")
+            return True
+        finally:
+            # 其他工作进程可能已把这把锁当作过期锁删除
+            try:
+                os.remove(lock_path)
+            except FileNotFoundError:
+                pass
+
+    def claim(self, worker_id: str) -> Optional[Lease]:
+        now = None
+        for job_id in self.pending_ids():
+            lease_path = self._path('leases', job_id, '.lease')
+            token = f"{worker_id}:{uuid.uuid4().hex}"
+
+            if not self._create_lease(lease_path, token):
+                # 一次扫描只读取一次文件系统时间
+                now = now if now is not None else self._fs_time()
+                age = self._lease_age(lease_path, now)
+                if age is None or age <= self.lease_seconds or not self._reclaim_expired(job_id):
+                    continue
+                if not self._create_lease(lease_path, token):
+                    continue
+
+            lease = Lease(job_id, lease_path, token, {})
+            job = _read_json(self._path('pending', job_id))
+            if job is None or os.path.exists(self._path('done', job_id)):
+                # 任务已被其他工作进程完成，只剩残留文件
+                self._remove_quietly(self._path('pending', job_id))
+                self.release(lease)
+                continue
+
+            job['attempts'] = job.get('attempts', 0) + 1
+            if job['attempts'] > self.max_attempts:
+                lease.job = job
+                self.fail(lease, f"超过最大尝试次数 {self.max_attempts}")
+                continue
+
+            _write_json_atomic(self._path('pending', job_id), job)
+            job['worker'] = worker_id
+            lease.job = job
+            return lease
+
+        return None
+
+    def owns(self, lease: Lease) -> bool:
+        try:
+            with open(lease.path, 'r', encoding='utf-8') as f:
+                return f.read() == lease.token
+        except FileNotFoundError:
+            return False
+
+    def heartbeat(self, lease: Lease) -> bool:
+        if not self.owns(lease):
+            lease.lost = True
+            return False
+        try:
+            os.utime(lease.path)
+        except FileNotFoundError:
+            # 检查之后租约恰好被回收
+            lease.lost = True
+            return False
+        return True
+
+    def _finish(self, lease: Lease, bucket: str, record: Dict) -> bool:
+        if not self.owns(lease):
+            lease.lost = True
+            logger.warning(f"任务 {lease.job_id} 的租约已被回收，丢弃本次结果")
+            return False
+
+        record.update(lease.job)
+        record['finished_at'] = time.time()
+        _write_json_atomic(self._path(bucket, lease.job_id), record)
+        self._remove_quietly(self._path('pending', lease.job_id))
+        self.release(lease)
+        return True
+
+    def complete(self, lease: Lease, output_path: str) -> bool:
+        return self._finish(lease, 'done', {'result': output_path})
+
+    def fail(self, lease: Lease, error: str) -> bool:
+        return self._finish(lease, 'failed', {'error': error})
+
+    def release(self, lease: Lease):
+        if self.owns(lease):
+            self._remove_quietly(lease.path)
+
+    def _remove_quietly(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class QueueWorker:
+    def __init__(self, queue: LeaseQueue, worker_id: Optional[str] = None, process_fn=None,
+                 poll_interval: float = 1.0):
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.process_fn = process_fn or process_job
+        self.poll_interval = poll_interval
+        self.stop_event = threading.Event()
+
+    def _keep_alive(self, lease: Lease, finished: threading.Event):
+        interval = max(self.queue.lease_seconds / 3.0, 0.05)
+        while not finished.wait(interval):
+            if not self.queue.heartbeat(lease):
+                logger.warning(f"工作进程 {self.worker_id} 失去了任务 {lease.job_id} 的租约")
+                return
+
+    def run_one(self) -> Optional[bool]:
+        lease = self.queue.claim(self.worker_id)
+        if lease is None:
+            return None
+
+        logger.info(f"工作进程 {self.worker_id} 领取任务 {lease.job_id}: {lease.job['input']}")
+        finished = threading.Event()
+        heartbeat = threading.Thread(target=self._keep_alive, args=(lease, finished), daemon=True)
+        heartbeat.start()
+        try:
+            output_path = self.process_fn(lease.job)
+        except Exception as e:
+            finished.set()
+            heartbeat.join()
+            logger.error(f"任务 {lease.job_id} 处理失败: {str(e)}")
+            self.queue.fail(lease, str(e))
+            return False
+
+        finished.set()
+        heartbeat.join()
+        return self.queue.complete(lease, output_path)
+
+    def run(self, exit_when_empty: bool = False) -> int:
+        processed = 0
+        while not self.stop_event.is_set():
+            result = self.run_one()
+            if result is None:
+                if exit_when_empty:
+                    break
+                self.stop_event.wait(self.poll_interval)
+            elif result:
+                processed += 1
+        return processed
+
+    def stop(self):
+        self.stop_event.set()
+
+
+def run_worker(root: str, lease_seconds: float = 60.0, exit_when_empty: bool = False) -> int:
+    return QueueWorker(LeaseQueue(root, lease_seconds)).run(exit_when_empty)
@@ -1,19 +1,59 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
+import copy
+import io
 import os
 import json
-import shutil
-import tempfile
+import threading
+import zipfile
 from pptx import Presentation
-from pptx.util import Pt
+from pptx.enum.shapes import MSO_SHAPE_TYPE
 import xml.etree.ElementTree as ET
 
+import numpy as np
+
 from .file_manager import FileManager
+from .font_matcher import FontMatcher, is_font_pattern, load_font_aliases
+from .keyword_matcher import parse_keywords
+from .lang_detector import HAN_PATTERN
+from .run_index import RunIndex, parse_roles, part_runs
+from .size_index import SIZE_TOLERANCE, cached_size_index
+from .transform_stages import STAGES, run_stages, stage_tags
 from .xml_handler import XMLHandler
 
 import logging
-import re
 
-CHINESE_PATTERN = re.compile(r'[\u4e00-\u9fff\u3400-\u4dbf\u20000-\u2a6df]')
+FONT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'font_config.json')
+GRADIENT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config.json')
+FONT_ALIAS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'font_aliases.json')
+
+CHINESE_PATTERN = HAN_PATTERN
+
+LATIN_SUCCESSORS = ('ea', 'cs', 'sym', 'hlinkClick', 'hlinkMouseOver', 'rtl', 'extLst')
+
+
+# 工作进程（线程）内缓存的配置文件解析结果，按文件的修改时间和大小判断是否需要重新读取
+_worker_cache = threading.local()
+
+
+def file_signature(path: str):
+    try:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+
+def cached_file(path: str, loader):
+    # 长期运行的工作进程每个任务都会创建新的 PPTProcessor，配置文件没有变化时直接复用上次的结果；
+    # 缓存按线程隔离，FontMatcher 等对象不需要加锁
+    cache = getattr(_worker_cache, 'files', None)
+    if cache is None:
+        cache = _worker_cache.files = {}
+    signature = file_signature(path)
+    entry = cache.get(path)
+    if entry is None or entry[0] != signature:
+        entry = cache[path] = (signature, loader())
+    return entry[1]
 
 
 def has_chinese(s: str) -> bool:
@@ -23,12 +63,7 @@ def has_chinese(s: str) -> bool:
 def is_chinese_char(char):
     if len(char) != 1:
         return False
-    code_point = ord(char)
-    return (
-            0x4E00 <= code_point <= 0x9FFF or
-            0x3400 <= code_point <= 0x4DBF or
-            0x20000 <= code_point <= 0x2A6DF
-    )
+    return bool(CHINESE_PATTERN.match(char))
 
 
 def init_logger():
@@ -58,40 +93,63 @@ logger = init_logger()
 
 
 class PPTProcessor:
-    def __init__(self, status_callback=None):
+    def __init__(self, status_callback=None, font_configs: Optional[Dict] = None,
+                 font_aliases: Optional[Dict] = None):
         self.file_manager = FileManager()
         self.xml_handler = XMLHandler()
-        self.font_configs = self.load_font_config()
-        self.status_callback = status_callback
+        self.font_configs = font_configs if font_configs is not None else cached_file(FONT_CONFIG_PATH,
+                                                                                      self.load_font_config)
+        if font_aliases is not None:
+            self.font_aliases, self.font_matcher = font_aliases, None
+        else:
+            # 别名表和已编译的字体模式一起缓存，别名表改动后重新编译
+            self.font_aliases, self.font_matcher = cached_file(FONT_ALIAS_PATH, self.load_font_matcher)
+        self.status_callback = status_callback or (lambda message: None)
+        self.stages = [stage_class(self) for stage_class in STAGES]
 
     def load_font_config(self):
-        config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'font_config.json')
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
+            with open(FONT_CONFIG_PATH, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except Exception as e:
             logger.error(f"加载字体配置失败: {str(e)}")
             return {}
 
-    def process_ppt(self, input_path: str, output_path: str, gradient_config: List[Dict], font_size: str = None,
-                    font_name: str = None):
+    def load_font_aliases(self):
         try:
-            temp_dir = tempfile.mkdtemp()
-            temp_ppt = os.path.join(temp_dir, "temp_processed.pptx")
+            return load_font_aliases(FONT_ALIAS_PATH)
+        except Exception as e:
+            logger.error(f"加载字体别名表失败: {str(e)}")
+            return {}
+
+    def load_font_matcher(self):
+        aliases = self.load_font_aliases()
+        return aliases, FontMatcher(aliases)
 
-            try:
-                self.status_callback("开始字体和字号替换...")
-                self._process_font_replacement(input_path, temp_ppt, self.font_configs)
-                self.status_callback("开始应用渐变效果...")
-                self._process_gradient_effects(temp_ppt, gradient_config, font_size, font_name)
-                shutil.copy2(temp_ppt, output_path)
-                self.status_callback(f"处理完成: {output_path}")
+    def load_gradient_config(self):
+        try:
+            with open(GRADIENT_CONFIG_PATH, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+                if isinstance(config, dict) and len(config) > 0:
+                    logging.info(f"从config.json加载了 {len(config)} 个渐变方案")
+                    return config
+        except FileNotFoundError:
+            logger.warning("未找到config.json文件，将使用传入参数")
+        except json.JSONDecodeError:
+            logger.warning("config.json格式错误，将使用传入参数")
+        except Exception as e:
+            logger.error(f"加载config.json时出错: {str(e)}，将使用传入参数")
+        return {}
 
-                return True
+    def process_ppt(self, input_path: str, output_path: str, gradient_config: List[Dict], font_size: str = None,
+                    font_name: str = None):
+        try:
+            pptx_bytes = self.process_bytes(input_path, gradient_config, font_size, font_name)
+            with open(output_path, 'wb') as f:
+                f.write(pptx_bytes)
+            self.status_callback(f"处理完成: {output_path}")
 
-            finally:
-                if os.path.exists(temp_dir):
-                    shutil.rmtree(temp_dir)
+            return True
 
         except Exception as e:
             logger.error(f"处理PPT时出错: {str(e)}")
@@ -99,181 +157,284 @@ class PPTProcessor:
             traceback.print_exc()
             return False
 
-    def _process_font_replacement(self, input_path: str, output_path: str, font_configs: Dict):
-        prs = Presentation(input_path)
+    def process_bytes(self, source, gradient_config: List[Dict] = None, font_size: str = None,
+                      font_name: str = None, output=None, gradient_configs: Optional[Dict] = None) -> bytes:
+        # source 可以是 bytes 或二进制文件对象，全程在内存中处理，不创建临时目录
+        pptx_bytes = self.file_manager.read_pptx_bytes(source)
+        if not zipfile.is_zipfile(io.BytesIO(pptx_bytes)):
+            raise ValueError("输入内容不是有效的pptx文件")
 
+        if gradient_configs is None:
+            gradient_configs = self.load_gradient_config()
+
+        font_configs = self.font_configs
         if not font_configs:
             logger.warning("没有有效的字体配置，跳过字体替换")
-            prs.save(output_path)
-            return
-
-        for slide_idx, slide in enumerate(prs.slides):
-            logger.info(f"处理幻灯片 {slide_idx + 1}")
-
-            for shape in slide.shapes:
+        target_configs = self._resolve_gradient_targets(gradient_config, font_size, font_name, gradient_configs)
+
+        # 没有字体和渐变配置时，只要还有其他注册阶段需要执行，也要遍历幻灯片
+        stage_context = {'font_configs': font_configs, 'target_configs': target_configs}
+        if any(stage.enabled(stage_context) for stage in self.stages):
+            self.status_callback("开始字体替换和渐变处理...")
+            pptx_bytes = self._process_slides(pptx_bytes, font_configs, target_configs)
+
+        if output is not None:
+            output.write(pptx_bytes)
+
+        return pptx_bytes
+
+    def process_variants(self, source, variants: List[Dict]) -> List[bytes]:
+        # 同一份PPT生成多个配色版本：只读取和解析一次，公共的字体替换只做一次，
+        # 每个版本只重新序列化自己改动的幻灯片，其余成员共用同一份压缩数据
+        # variants 的每一项为 {'gradient_configs': {...}, 'font_configs': {...}}，字体配置在公共字体替换之后追加执行
+        pptx_bytes = self.file_manager.read_pptx_bytes(source)
+        if not zipfile.is_zipfile(io.BytesIO(pptx_bytes)):
+            raise ValueError("输入内容不是有效的pptx文件")
+
+        index = self.build_run_index(pptx_bytes)
+        _, shared_parts = self._transform(index, self.font_configs, {})
+
+        # 保留公共处理后的XML树副本（深拷贝比重新序列化、解析快得多），每个版本结束后用它还原改动过的幻灯片
+        pristine = [ET.ElementTree(copy.deepcopy(tree.getroot())) for tree in index.trees]
+        styles = index.snapshot_styles()
+        with zipfile.ZipFile(io.BytesIO(pptx_bytes), 'r') as zip_ref:
+            infos = {info.filename: info for info in zip_ref.infolist()}
+        # 公共字体替换改动过、但某个版本没有再改动的幻灯片，只序列化和压缩一次，供所有版本共用
+        shared_compressed = {}
+
+        templates = {}
+
+        results = []
+        for number, variant in enumerate(variants):
+            context = {}
+            report, touched_parts = self._transform(index, variant.get('font_configs') or {},
+                                                    variant.get('gradient_configs') or {}, context)
+            updated_parts = {}
+            for part_id in touched_parts:
+                data = None
+                if context['run_local'] and part_id not in context['touched_parts']:
+                    data = self._splice_part(index, part_id, pristine[part_id], context['touched_runs'], templates)
+                if data is None:
+                    data = self.xml_handler.dump_xml_bytes(index.trees[part_id])
+                updated_parts[index.part_names[part_id]] = data
+            for part_id in shared_parts:
+                part_name = index.part_names[part_id]
+                if part_name not in updated_parts and part_name not in shared_compressed:
+                    shared_compressed[part_name] = self.file_manager.deflate_member(
+                        infos[part_name], self.xml_handler.dump_xml_bytes(pristine[part_id]))
+            # 多个版本共用未修改成员的原始压缩数据，只在这里启用直接复制
+            results.append(self.file_manager.rewrite_pptx(pptx_bytes, updated_parts, shared_compressed,
+                                                          raw_copy=True))
+            self.status_callback(f"版本 {number + 1}/{len(variants)} 完成，更新了 {len(updated_parts)} 个幻灯片")
+
+            if number < len(variants) - 1:
+                for part_id in touched_parts:
+                    index.rebind_part(part_id, ET.ElementTree(copy.deepcopy(pristine[part_id].getroot())))
+                index.restore_styles(styles)
+
+        return results
+
+    def _splice_part(self, index: RunIndex, part_id: int, pristine_tree: ET.ElementTree, touched_runs: np.ndarray,
+                     templates: Dict) -> Optional[bytes]:
+        # 各版本的同一张幻灯片只在文本运行上有差别：其余内容切成模板只序列化一次，
+        # 每个版本只重新序列化自己改动过的文本运行再拼接；无法保证结果一致时返回 None，改为整篇序列化
+        template = templates.get(part_id)
+        if template is None:
+            pairs = list(part_runs(pristine_tree.getroot()))
+            start, end = index.part_ranges[part_id]
+            template = False
+            if len(pairs) == end - start:
+                template = self.xml_handler.split_around_elements(
+                    pristine_tree, [paragraph for paragraph, _ in pairs], [text_run for _, text_run in pairs])
+            templates[part_id] = template
+        if not template:
+            return None
+
+        start, _ = index.part_ranges[part_id]
+        pieces = list(template)
+        for row in np.flatnonzero(touched_runs[start:start + len(template) // 2]):
+            fragment = self.xml_handler.dump_fragment_bytes(index.runs[start + row])
+            if fragment is None:
+                return None
+            pieces[2 * row + 1] = fragment
+        return b''.join(pieces)
+
+    def _resolve_gradient_targets(self, gradient_config: List[Dict], font_size: str = None, font_name: str = None,
+                                  gradient_configs: Optional[Dict] = None) -> Dict:
+        if gradient_configs:
+            return gradient_configs
+        if gradient_config and font_size and font_name:
+            logger.info(f"使用传入参数: 字号 {font_size} 字体 {font_name} 的渐变方案")
+            return {font_size: {'gradient_config': gradient_config, 'font_name': font_name}}
+        logger.warning("未提供有效的渐变配置，跳过渐变处理")
+        return {}
+
+    def build_run_index(self, pptx_bytes: bytes) -> RunIndex:
+        index = RunIndex(self.font_matcher or FontMatcher(self.font_aliases), stage_tags(self.stages))
+        with zipfile.ZipFile(io.BytesIO(pptx_bytes), 'r') as zip_ref:
+            slide_names = self.file_manager.get_slide_names(zip_ref.namelist())
+            logging.info(f"找到 {len(slide_names)} 个幻灯片文件")
+
+            for slide_name in slide_names:
                 try:
-                    if hasattr(shape, "text_frame") and shape.text_frame:
-                        self._process_text_frame(shape.text_frame, font_configs)
-                    elif hasattr(shape, "table") and shape.table:
-                        self._process_table(shape.table, font_configs)
+                    index.add_part(slide_name, self.xml_handler.load_xml_bytes(zip_ref.read(slide_name)))
                 except Exception as e:
-                    logger.error(f"处理形状时出错: {str(e)}")
-                    continue
+                    logger.error(f"解析幻灯片 {slide_name} 时出错: {str(e)}")
 
-        try:
-            prs.save(output_path)
-            logging.info(f"字体替换完成，已保存到: {output_path}")
-        except Exception as e:
-            logger.error(f"保存文件时出错: {str(e)}")
-            shutil.copy2(input_path, output_path)
+        return index.freeze()
 
-    def _process_text_frame(self, text_frame, font_configs: Dict):
+    def _process_slides(self, pptx_bytes: bytes, font_configs: Dict, target_configs: Dict) -> bytes:
         try:
-            for paragraph in text_frame.paragraphs:
-                for run in paragraph.runs:
-                    if run.text.strip():
-                        self._apply_font_config_to_run(run, font_configs)
-        except Exception as e:
-            logger.error(f"处理文本框架时出错: {str(e)}")
+            index = self.build_run_index(pptx_bytes)
+            logging.info(f"共索引 {len(index)} 个文本运行")
+            report, touched_parts = self._transform(index, font_configs, target_configs)
 
-    def _process_table(self, table, font_configs: Dict):
-        try:
-            for row in table.rows:
-                for cell in row.cells:
-                    if hasattr(cell, 'text_frame') and cell.text_frame:
-                        self._process_text_frame(cell.text_frame, font_configs)
-        except Exception as e:
-            logger.error(f"处理表格时出错: {str(e)}")
-
-    def _apply_font_config_to_run(self, run, font_configs: Dict):
-        try:
-            current_font = run.font
-            current_latin_name = getattr(current_font, 'name', '') or ''
-            current_size_pt = current_font.size.pt if current_font.size else 0
-
-            current_ea_name = ""
-            current_cs_name = ""
-
-            try:
-                if hasattr(run, '_r') and run._r is not None:
-                    ns = {'a': 'http://schemas.openxmlformats.org/drawingml/2006/main'}
-                    rpr = run._r.find('.//a:rPr', ns)
-                    if rpr is not None:
-                        ea_elem = rpr.find('.//a:ea', ns)
-                        current_ea_name = ea_elem.get('typeface', '') if ea_elem is not None else ''
-                        cs_elem = rpr.find('.//a:cs', ns)
-                        current_cs_name = cs_elem.get('typeface', '') if cs_elem is not None else ''
-                        logger.debug(f"成功获取字体: EA='{current_ea_name}', CS='{current_cs_name}'")
-                else:
-                    logger.warning("Run对象没有_r属性，无法获取字体信息")
-            except Exception as e:
-                logger.error(f"获取XML字体信息失败: {str(e)}", exc_info=True)
-
-            for config_name, config in font_configs.items():
-                old_font = config.get('old_font')
-                old_size = config.get('old_size')
-                new_font = config.get('new_font')
-                new_size = config.get('new_size')
-
-                if new_font is None and new_size is None:
-                    logger.warning(f"配置 '{config_name}' 无效：new_font 和 new_size 不能同时为空。")
-                    continue
-
-                font_match = False
-                if old_font is not None:
-                    if (current_latin_name == old_font or
-                            current_ea_name == old_font or
-                            current_cs_name == old_font):
-                        font_match = True
-                else:
-                    font_match = True
-
-                size_match = False
-                if old_size is not None:
-                    try:
-                        if abs(float(old_size) - current_size_pt) < 0.1:
-                            size_match = True
-                    except (ValueError, TypeError):
-                        size_match = False
-                else:
-                    size_match = True
-
-                if not (font_match and size_match):
-                    continue
-
-                logger.info(f"文本 '{run.text[:20]}...' 匹配到配置 '{config_name}'。")
-
-                if new_size is not None:
-                    try:
-                        new_size_val = float(new_size)
-                        run.font.size = Pt(new_size_val)
-                        logger.info(f"  -> 字号替换: {current_size_pt}pt -> {new_size_val}pt")
-                    except (ValueError, TypeError) as e:
-                        logger.error(f"  -> 设置新字号失败: {str(e)}")
-
-                if new_font:
-                    process_latin = config.get('latin', False)
-                    process_ea = config.get('ea', False)
-                    process_cs = config.get('cs', False)
-                    logger.info(f"  -> 字体替换条件: latin={process_latin}, ea={process_ea}, cs={process_cs}")
-
-                    rpr = None
-                    if hasattr(run, '_r') and run._r is not None:
-                        ns = {'a': 'http://schemas.openxmlformats.org/drawingml/2006/main'}
-                        rpr = run._r.find('.//a:rPr', ns)
-                        if rpr is None:
-                            rpr = ET.Element(f'{{{ns["a"]}}}rPr')
-                            run._r.insert(0, rpr)
-                        logger.info(f"  -> 找到 rPr 元素: {rpr}")
-                    else:
-                        logger.warning("Run对象没有有效的_r属性，无法处理字体配置")
-
-                    if process_latin and (old_font is None or current_latin_name == old_font):
-                        run.font.name = new_font
-                        logger.info(f"  -> Latin 字体替换: '{current_latin_name}' -> '{new_font}'")
-
-                    if process_ea and (old_font is None or current_ea_name == old_font):
-                        if rpr is not None:
-                            self._update_font_element(rpr, 'ea', new_font)
-                            logger.info(f"  -> East-Asian 字体替换: '{current_ea_name}' -> '{new_font}'")
-                        else:
-                            logger.warning("rpr元素不存在，无法更新East-Asian字体")
-
-                    if process_cs and (old_font is None or current_cs_name == old_font):
-                        if rpr is not None:
-                            self._update_font_element(rpr, 'cs', new_font)
-                            logger.info(f"  -> Complex-Script 字体替换: '{current_cs_name}' -> '{new_font}'")
-                        else:
-                            logger.warning("rpr元素不存在，无法更新Complex-Script字体")
-
-                    if run.text and len(run.text) > 0:
-                        lang = 'zh-CN' if has_chinese(run.text) else 'en-US'
-                        logger.info(f"  -> 检测到文本'{run.text}'语言: {lang}")
-                        if hasattr(run, '_r') and run._r is not None:
-                            xml_ns = run._r.nsmap.get('xml', 'http://www.w3.org/XML/1998/namespace')
-                            lang_attr = '{' + xml_ns + '}lang'
-                            run._r.attrib[lang_attr] = lang
-
-                            ns = {'a': 'http://schemas.openxmlformats.org/drawingml/2006/main'}
-                            rpr = run._r.find('.//a:rPr', ns)
-                            if rpr is not None:
-                                rpr.set('lang', lang)
-                                logger.info(f"  -> 已更新rPr语言设置: {lang}")
-                            ns = {'a': 'http://schemas.openxmlformats.org/drawingml/2006/main'}
-                            p_element = run._r.getparent()
-                            if p_element is not None:
-                                endParaRPr = p_element.find('.//a:endParaRPr', ns)
-                                if endParaRPr is not None and 'lang' in endParaRPr.attrib:
-                                    endParaRPr.set('lang', lang)
-                                    logger.info(f"  -> 已更新endParaRPr语言设置: {lang}")
-
-                            logger.info(f"  -> '{run.text}'使用语言设置: {lang}")
-                        else:
-                            logger.warning("无法访问Run对象的XML元素，跳过语言设置")
+            # 只重新序列化有改动的幻灯片，其余部件保持原样
+            updated_parts = {}
+            for part_id in touched_parts:
+                updated_parts[index.part_names[part_id]] = self.xml_handler.dump_xml_bytes(index.trees[part_id])
 
+            pptx_bytes = self.file_manager.rewrite_pptx(pptx_bytes, updated_parts)
+            self.status_callback(f"本次应用渐变的文本运行数量: {sum(report['gradients'].values())}")
+            self.status_callback(f"字体和渐变处理完成，已更新 {len(updated_parts)} 个幻灯片")
 
         except Exception as e:
-            logger.error(f"应用字体配置到 run 时发生未知错误: {str(e)}")
+            # 处理失败时不能把原文件当作处理结果返回，交给调用方记录失败
+            logger.error(f"处理幻灯片时出错: {str(e)}")
+            raise
+
+        return pptx_bytes
+
+    def dry_run(self, source, gradient_config: List[Dict] = None, font_size: str = None, font_name: str = None,
+                gradient_configs: Optional[Dict] = None) -> Dict:
+        # 只在内存中的XML树上演练，统计每条规则会命中多少文本运行，不生成输出文件
+        pptx_bytes = self.file_manager.read_pptx_bytes(source)
+        if not zipfile.is_zipfile(io.BytesIO(pptx_bytes)):
+            raise ValueError("输入内容不是有效的pptx文件")
+
+        if gradient_configs is None:
+            gradient_configs = self.load_gradient_config()
+        target_configs = self._resolve_gradient_targets(gradient_config, font_size, font_name, gradient_configs)
+
+        index = self.build_run_index(pptx_bytes)
+        inventory = index.inventory()
+        roles = index.role_counts()
+        report, touched_parts = self._transform(index, self.font_configs, target_configs)
+        report['inventory'] = inventory
+        report['roles'] = roles
+        report['touched_parts'] = [index.part_names[part_id] for part_id in touched_parts]
+        return report
+
+    def _transform(self, index: RunIndex, font_configs: Dict, target_configs: Dict, context: Optional[Dict] = None):
+        report = {'runs': len(index), 'parts': len(index.part_names), 'font_rules': {}, 'gradients': {}}
+        context = context if context is not None else {}
+        context.update(font_configs=font_configs, target_configs=target_configs, report=report)
+        touched = run_stages(self.stages, index, context)
+        touched_parts = set(np.unique(index.part[touched]).tolist()) | context['touched_parts']
+        return report, sorted(touched_parts)
+
+    def _font_rule_masks(self, index: RunIndex, font_configs: Dict) -> List[tuple]:
+        # 所有规则都基于原始样式判断，必须在修改任何文本运行之前一次算完
+        eligible = index.font_scope & ~index.blank
+        valid_configs = []
+        for config_name, config in font_configs.items():
+            if config.get('new_font') is None and config.get('new_size') is None:
+                logger.warning(f"配置 '{config_name}' 无效：new_font 和 new_size 不能同时为空。")
+                continue
+            valid_configs.append((config_name, config))
+
+        # old_size 可以是单个字号或 "28-44" 这样的区间，所有规则的区间一次建好索引
+        size_index = cached_size_index([config.get('old_size') for _, config in valid_configs], SIZE_TOLERANCE)
+        size_masks = index.size_rule_masks(size_index)
+        keyword_masks = index.keyword_masks([parse_keywords(config.get('keywords')) for _, config in valid_configs])
+
+        plans = []
+        for rule_id, (config_name, config) in enumerate(valid_configs):
+            old_font = config.get('old_font')
+            new_font = config.get('new_font')
+            if config.get('old_size') is None:
+                size_mask = np.ones(len(index), dtype=bool)
+            else:
+                if size_index.intervals[rule_id] is None:
+                    logger.warning(f"配置 '{config_name}' 的原字号 {config.get('old_size')} 无法识别")
+                size_mask = size_masks[rule_id]
+
+            mask = eligible & index.typeface_mask(old_font) & size_mask
+            if keyword_masks[rule_id] is not None:
+                mask &= keyword_masks[rule_id]
+            role_mask = index.role_mask(parse_roles(config.get('roles')))
+            if role_mask is not None:
+                mask &= role_mask
+            font_masks = {}
+            if new_font:
+                for font_type in ('latin', 'ea', 'cs'):
+                    if config.get(font_type, False):
+                        font_masks[font_type] = mask & index.typeface_mask(old_font, (font_type,))
+            plans.append((config_name, config, mask, font_masks))
+        return plans
+
+    def _centipoints(self, size) -> Optional[str]:
+        try:
+            # 与 python-pptx 的 Pt() 换算保持一致
+            sz = int(float(size) * 12700) // 127
+            if not 100 <= sz <= 400000:
+                raise ValueError(f"字号 {size} 超出范围")
+            return str(sz)
+        except (ValueError, TypeError) as e:
+            logger.error(f"  -> 设置新字号失败: {str(e)}")
+            return None
+
+    def _apply_font_configs(self, index: RunIndex, font_configs: Dict, hits: Dict):
+        # 返回被修改的文本运行掩码，以及替换了字体、需要重新标注语言的文本运行掩码
+        touched = np.zeros(len(index), dtype=bool)
+        lang_rows = np.zeros(len(index), dtype=bool)
+
+        for config_name, config, mask, font_masks in self._font_rule_masks(index, font_configs):
+            rows = np.flatnonzero(mask)
+            hits[config_name] = len(rows)
+            if len(rows) == 0:
+                continue
+            logger.info(f"配置 '{config_name}' 匹配到 {len(rows)} 个文本运行")
+            touched |= mask
+            if config.get('new_font'):
+                lang_rows |= mask
+
+            new_font = config.get('new_font')
+            new_sz = self._centipoints(config['new_size']) if config.get('new_size') is not None else None
+            for row in rows:
+                text_run = index.runs[row]
+                rpr = text_run.find('a:rPr', self.xml_handler.namespaces)
+                if rpr is None:
+                    rpr = ET.Element(f"{{{self.xml_handler.namespaces['a']}}}rPr")
+                    text_run.insert(0, rpr)
+
+                if new_sz is not None:
+                    rpr.set('sz', new_sz)
+                for font_type, font_mask in font_masks.items():
+                    if not font_mask[row]:
+                        continue
+                    if font_type == 'latin':
+                        self._get_or_add_latin(rpr).set('typeface', new_font)
+                    else:
+                        self._update_font_element(rpr, font_type, new_font)
+
+        return touched, lang_rows
+
+    def _get_or_add_latin(self, rpr: ET.Element) -> ET.Element:
+        ns = self.xml_handler.namespaces
+        latin = rpr.find('a:latin', ns)
+        if latin is not None:
+            return latin
+
+        # a:latin 需要位于 a:ea、a:cs 等元素之前
+        latin = ET.Element(f"{{{ns['a']}}}latin")
+        successors = {f"{{{ns['a']}}}{tag}" for tag in LATIN_SUCCESSORS}
+        for index, child in enumerate(rpr):
+            if child.tag in successors:
+                rpr.insert(index, latin)
+                return latin
+        rpr.append(latin)
+        return latin
 
     def _update_font_element(self, rpr, font_type, new_font):
         if rpr is None:
@@ -292,122 +453,74 @@ class PPTProcessor:
         except Exception as e:
             logger.error(f"更新{font_type}字体元素时出错: {str(e)}")
 
-    def _process_gradient_effects(self, ppt_path: str, gradient_config: List[Dict], font_size: str = None,
-                                  font_name: str = None):
-        try:
-            logging.info(f"开始处理渐变效果")
-
-            temp_dir = self.file_manager.extract_pptx(ppt_path)
-            logger.info(f"已解压到临时目录: {temp_dir}")
-
-            slide_files = self.file_manager.get_slide_files(temp_dir)
-            logging.info(f"找到 {len(slide_files)} 个幻灯片文件")
-
-            for slide_file in slide_files:
-                logging.info(f"处理幻灯片文件: {slide_file}")
-                self._process_slide_gradient(slide_file, gradient_config, font_size, font_name)
-
-            self.file_manager.compress_to_pptx(temp_dir, ppt_path)
-            self.status_callback(f"渐变处理完成，已更新 {len(slide_files)} 个幻灯片")
-
-        except Exception as e:
-            logger.error(f"处理渐变效果时出错: {str(e)}")
-            import traceback
-            traceback.print_exc()
-        finally:
-            self.file_manager.cleanup()
-
-    def _process_slide_gradient(self, slide_file: str, gradient_config: List[Dict] = None, font_size: str = None,
-                                font_name: str = None):
-        try:
-            tree = self.xml_handler.load_xml(slide_file)
-            if tree is None:
-                logger.error(f"无法加载XML文件: {slide_file}")
-                return
-
-            target_configs = {}
-            config_loaded = False
-
-            config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.json')
-            try:
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    if isinstance(config, dict) and len(config) > 0:
-                        target_configs = config
-                        config_loaded = True
-                        logging.info(f"从config.json加载了 {len(target_configs)} 个渐变方案")
-            except FileNotFoundError:
-                logger.warning("未找到config.json文件，将使用传入参数")
-            except json.JSONDecodeError:
-                logger.warning("config.json格式错误，将使用传入参数")
-            except Exception as e:
-                logger.error(f"加载config.json时出错: {str(e)}，将使用传入参数")
-
-            if not config_loaded:
-                if gradient_config and font_size and font_name:
-                    target_configs = {font_size: {'gradient_config': gradient_config, 'font_name': font_name}}
-                    logger.info(f"使用传入参数: 字号 {font_size} 字体 {font_name} 的渐变方案")
-                else:
-                    logger.warning("未提供有效的渐变配置，跳过处理")
-                    return
-
-            text_runs = self.xml_handler.find_text_runs(tree)
-            logging.info(f"找到 {len(text_runs)} 个文本运行")
-
-            gradient_applied_count = 0
-            for text_run in text_runs:
+    def _apply_gradient_configs(self, index: RunIndex, target_configs: Dict, hits: Dict) -> np.ndarray:
+        # 渐变方案的键可以是单个字号或 "28-44" 这样的区间；同一文本运行命中多个方案时，
+        # 带关键词条件的方案优先，其次是限定形状角色的方案，再按区间从窄到宽、配置从前到后的顺序，
+        # 由第一个字体也匹配的方案生效
+        # 带条件的方案以 "40 标题 含Gamma" 之类的名称保存，字号写在条目的 font_size 中
+        size_keys = list(target_configs)
+        size_index = cached_size_index([target_configs[key].get('font_size') or key for key in size_keys])
+        size_masks = index.size_rule_masks(size_index)
+        keyword_masks = index.keyword_masks(
+            [parse_keywords(target_configs[size_key].get('keywords')) for size_key in size_keys])
+        role_masks = [index.role_mask(parse_roles(target_configs[size_key].get('roles'))) for size_key in size_keys]
+        precedence = sorted(size_index.precedence(),
+                            key=lambda rule_id: (keyword_masks[rule_id] is None, role_masks[rule_id] is None))
+
+        for size_key, interval in zip(size_keys, size_index.intervals):
+            if interval is None:
+                logging.warning(f"渐变方案的字号 {size_key} 无法识别")
+        unmatched = (index.sz != 0) & ~size_masks.any(axis=0)
+        for current_size in sorted({f"{sz / 100:g}" for sz in np.unique(index.sz[unmatched])}):
+            logging.warning(f"警告: 字号 {current_size} 不在渐变配置中")
+
+        touched = np.zeros(len(index), dtype=bool)
+        for rule_id in precedence:
+            current_size = size_keys[rule_id]
+            config_entry = target_configs[current_size]
+            size_mask = size_masks[rule_id] & ~touched
+            if keyword_masks[rule_id] is not None:
+                size_mask &= keyword_masks[rule_id]
+            if role_masks[rule_id] is not None:
+                size_mask &= role_masks[rule_id]
+            if not size_mask.any():
+                continue
+
+            target_font = config_entry.get('font_name')
+            mask = size_mask & index.typeface_mask(target_font) if target_font else np.zeros_like(size_mask)
+            rows = np.flatnonzero(mask)
+            hits[current_size] = len(rows)
+
+            mismatched = int(np.count_nonzero(size_mask & ~mask))
+            if mismatched:
+                logging.warning(f"字体不匹配: 字号 {current_size} 有 {mismatched} 个文本运行的字体不是 {target_font}")
+            if len(rows) == 0:
+                continue
+
+            logging.info(f"已应用渐变到字号 {current_size}、字体 {target_font} 的 {len(rows)} 个文本运行")
+            touched |= mask
+            gradient = config_entry['gradient_config']
+            grad_fill = self.xml_handler.create_gradient_fill(gradient)
+            # 字体写成通配符或正则时只用于匹配，保留文本原有字体
+            new_font = None if is_font_pattern(target_font) else target_font
+            for row in rows:
                 try:
-                    rpr = text_run.find("a:rPr", self.xml_handler.namespaces)
-                    if rpr is not None:
-                        size = rpr.get('sz', '0')
-                        if size != '0':
-                            current_size = f"{int(size) / 100:g}"
-                            logging.info(f"文本运行字号: {current_size}")
-
-                            latin_font_elem = rpr.find("a:latin", self.xml_handler.namespaces)
-                            ea_font_elem = rpr.find("a:ea", self.xml_handler.namespaces)
-                            cs_font_elem = rpr.find("a:cs", self.xml_handler.namespaces)
-
-                            current_fonts = []
-                            if latin_font_elem is not None and latin_font_elem.get('typeface'):
-                                current_fonts.append(latin_font_elem.get('typeface'))
-                            if ea_font_elem is not None and ea_font_elem.get('typeface'):
-                                current_fonts.append(ea_font_elem.get('typeface'))
-                            if cs_font_elem is not None and cs_font_elem.get('typeface'):
-                                current_fonts.append(cs_font_elem.get('typeface'))
-
-                            unique_current_fonts = list(set(current_fonts))
-                            logging.info(
-                                f"文本运行字体: {', '.join(unique_current_fonts) if unique_current_fonts else 'None'}")
-
-                            if current_size in target_configs:
-                                config_entry = target_configs[current_size]
-                                current_gradient = config_entry['gradient_config']
-                                target_font = config_entry.get('font_name')
-
-                                font_matched = any(font == target_font for font in unique_current_fonts)
-
-                                if font_matched:
-                                    self.xml_handler.apply_gradient_to_text_run(
-                                        text_run, current_gradient, current_size, target_font)
-
-                                    gradient_applied_count += 1
-                                    logging.info(f"已应用渐变到字号 {current_size}、字体 {target_font} 的文本")
-                                else:
-                                    logging.warning(
-                                        f"字体不匹配: 当前字体 {unique_current_fonts}, 目标字体 {target_font}")
-                            else:
-                                logging.warning(f"警告: 字号 {current_size} 不在渐变配置中")
+                    # 命中的文本运行字号已在方案范围内，不再改写 sz
+                    self.xml_handler.apply_gradient_to_text_run(
+                        index.runs[row], gradient, None, new_font, grad_fill=copy.deepcopy(grad_fill))
                 except Exception as e:
                     logger.error(f"处理文本运行时出错: {str(e)}")
-                    continue
 
-            self.status_callback(f"本幻灯片应用渐变的文本运行数量: {gradient_applied_count}")
-            self.xml_handler.save_xml(tree, slide_file)
-        except Exception as e:
-            logger.error(f"处理渐变效果时出错: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        return touched
+
+
+def iter_leaf_shapes(shapes):
+    # slide.shapes 只包含顶层形状，组合形状需要展开
+    for shape in shapes:
+        if shape.shape_type == MSO_SHAPE_TYPE.GROUP:
+            yield from iter_leaf_shapes(shape.shapes)
+        else:
+            yield shape
 
 
 def get_font_info_from_slide(self, slide_file: str) -> List[Dict]:
@@ -416,7 +529,7 @@ def get_font_info_from_slide(self, slide_file: str) -> List[Dict]:
         font_info = []
 
         for slide_idx, slide in enumerate(prs.slides):
-            for shape in slide.shapes:
+            for shape in iter_leaf_shapes(slide.shapes):
                 if hasattr(shape, "text_frame") and shape.text_frame:
                     for paragraph in shape.text_frame.paragraphs:
                         for run in paragraph.runs:
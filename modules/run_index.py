@@ -0,0 +1,328 @@
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .font_matcher import FontMatcher
+from .keyword_matcher import KeywordMatcher
+from .size_index import SizeIntervalIndex
+
+A_NS = 'http://schemas.openxmlformats.org/drawingml/2006/main'
+P_NS = 'http://schemas.openxmlformats.org/presentationml/2006/main'
+NAMESPACES = {'a': A_NS, 'p': P_NS}
+RPR_TAG = f'{{{A_NS}}}rPr'
+FONT_TAGS = {f'{{{A_NS}}}{font_type}': slot for slot, font_type in enumerate(('latin', 'ea', 'cs'))}
+
+
+# 文本所在形状的角色，按位组合：组合内的标题占位符同时带有 ROLE_GROUP 和 ROLE_TITLE
+ROLE_TITLE = 1
+ROLE_SUBTITLE = 2
+ROLE_BODY = 4
+ROLE_PLACEHOLDER = 8
+ROLE_TABLE = 16
+ROLE_GROUP = 32
+ROLE_SHAPE = 64
+
+ROLES = {
+    'title': ROLE_TITLE,
+    'subtitle': ROLE_SUBTITLE,
+    'body': ROLE_BODY,
+    'placeholder': ROLE_PLACEHOLDER,
+    'table': ROLE_TABLE,
+    'group': ROLE_GROUP,
+    'shape': ROLE_SHAPE
+}
+ROLE_LABELS = {
+    'title': '标题',
+    'subtitle': '副标题',
+    'body': '正文',
+    'placeholder': '其他占位符',
+    'table': '表格',
+    'group': '组合内',
+    'shape': '文本框'
+}
+
+# p:ph 未写 type 时默认为 obj，即内容占位符
+PLACEHOLDER_ROLES = {
+    'title': ROLE_TITLE,
+    'ctrTitle': ROLE_TITLE,
+    'subTitle': ROLE_SUBTITLE,
+    'body': ROLE_BODY,
+    'obj': ROLE_BODY
+}
+
+SP_TAG = f'{{{P_NS}}}sp'
+GRP_SP_TAG = f'{{{P_NS}}}grpSp'
+GRAPHIC_FRAME_TAG = f'{{{P_NS}}}graphicFrame'
+PARAGRAPH_TAG = f'{{{A_NS}}}p'
+
+
+def parse_roles(value) -> List[str]:
+    # 配置中的角色可以是列表，也可以是逗号分隔的字符串；英文名和中文名都可以
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.replace('，', ',').replace('、', ',').split(',')
+    names = {label: name for name, label in ROLE_LABELS.items()}
+    roles = []
+    for role in value:
+        role = names.get(role.strip(), role.strip())
+        if role in ROLES and role not in roles:
+            roles.append(role)
+    return roles
+
+
+def role_bits(roles: List[str]) -> int:
+    bits = 0
+    for role in roles:
+        bits |= ROLES.get(role, 0)
+    return bits
+
+
+def shape_role(shape: ET.Element) -> int:
+    ph = shape.find('p:nvSpPr/p:nvPr/p:ph', NAMESPACES)
+    if ph is None:
+        return ROLE_SHAPE
+    return PLACEHOLDER_ROLES.get(ph.get('type', 'obj'), ROLE_PLACEHOLDER)
+
+
+def walk_paragraphs(container: ET.Element, watched=frozenset(), found: Optional[Dict] = None, group: int = 0):
+    # 一次遍历形状树，产出 (段落, 角色, 是否参与字体替换)；组合形状递归展开，
+    # 字体替换覆盖任意层级的文本框和表格，其他元素中的段落只参与渐变；
+    # 转换阶段声明的其他元素（watched）在同一次遍历中收集到 found
+    for shape in container:
+        if shape.tag == GRP_SP_TAG:
+            yield from walk_paragraphs(shape, watched, found, group | ROLE_GROUP)
+            continue
+
+        if shape.tag == SP_TAG:
+            role, in_scope = shape_role(shape) | group, True
+        elif shape.tag == GRAPHIC_FRAME_TAG:
+            role, in_scope = ROLE_TABLE | group, True
+        else:
+            role, in_scope = group, False
+        for element in shape.iter():
+            if element.tag == PARAGRAPH_TAG:
+                yield element, role, in_scope
+            elif element.tag in watched:
+                found[element.tag].append(element)
+
+
+def slide_paragraphs(root: ET.Element, watched=frozenset(), found: Optional[Dict] = None):
+    sp_tree = root.find('p:cSld/p:spTree', NAMESPACES)
+    if sp_tree is None:
+        yield from walk_paragraphs([root], watched, found)
+        return
+
+    yield from walk_paragraphs(sp_tree, watched, found)
+    if watched:
+        # 背景、切换效果等形状树以外的部分只收集元素
+        c_sld = root.find('p:cSld', NAMESPACES)
+        for container, skip in ((root, c_sld), (c_sld, sp_tree)):
+            for child in container:
+                if child is skip:
+                    continue
+                for element in child.iter():
+                    if element.tag in watched:
+                        found[element.tag].append(element)
+
+
+def part_runs(root: ET.Element):
+    # 按建索引时的顺序产出 (段落, 文本运行)
+    for paragraph, _, _ in slide_paragraphs(root):
+        for text_run in paragraph.findall('a:r', NAMESPACES):
+            yield paragraph, text_run
+
+
+class RunIndex:
+    # 整份PPT的文本运行列式表：每行一个 a:r，字体名统一编号，规则判断在整列上做向量化运算
+    def __init__(self, matcher: Optional[FontMatcher] = None, tags: Iterable[str] = ()):
+        self.matcher = matcher or FontMatcher()
+        # tags 为转换阶段需要的其他元素，如 a:effectLst，按部件收集为 elements[标签] = [(部件编号, 元素)]
+        self.tags = frozenset(tags)
+        self.elements = {tag: [] for tag in self.tags}
+        self.part_names = []
+        self.part_ranges = []
+        self.trees = []
+        self.runs = []
+        self.paragraphs = []
+        self.typefaces = ['']
+        self.typeface_ids = {'': 0}
+        self.texts = []
+        self.text_values = []
+        self.text_value_ids = {}
+        self._columns = {name: [] for name in ('part', 'sz', 'latin', 'ea', 'cs', 'text', 'text_len', 'blank',
+                                                'font_scope', 'role')}
+
+    def intern(self, typeface: str) -> int:
+        typeface_id = self.typeface_ids.get(typeface)
+        if typeface_id is None:
+            typeface_id = len(self.typefaces)
+            self.typeface_ids[typeface] = typeface_id
+            self.typefaces.append(typeface)
+        return typeface_id
+
+    def _style(self, text_run: ET.Element):
+        rpr = text_run.find(RPR_TAG)
+        if rpr is None:
+            return 0, 0, 0, 0
+
+        fonts = [None, None, None]
+        for child in rpr:
+            slot = FONT_TAGS.get(child.tag)
+            if slot is not None and fonts[slot] is None:
+                fonts[slot] = self.intern(child.get('typeface', ''))
+        return (int(rpr.get('sz') or 0), *(font or 0 for font in fonts))
+
+    def add_part(self, name: str, tree: ET.ElementTree):
+        part_id = len(self.part_names)
+        self.part_names.append(name)
+        self.trees.append(tree)
+
+        start = len(self.runs)
+        columns = self._columns
+        found = {tag: [] for tag in self.tags}
+        for paragraph, role, in_scope in slide_paragraphs(tree.getroot(), self.tags, found):
+            for text_run in paragraph.findall('a:r', NAMESPACES):
+                text = text_run.findtext('a:t', '', NAMESPACES)
+                sz, latin, ea, cs = self._style(text_run)
+
+                self.runs.append(text_run)
+                self.paragraphs.append(paragraph)
+                self.texts.append(text)
+                text_id = self.text_value_ids.get(text)
+                if text_id is None:
+                    text_id = self.text_value_ids[text] = len(self.text_values)
+                    self.text_values.append(text)
+                columns['part'].append(part_id)
+                columns['sz'].append(sz)
+                columns['latin'].append(latin)
+                columns['ea'].append(ea)
+                columns['cs'].append(cs)
+                columns['text'].append(text_id)
+                columns['text_len'].append(len(text))
+                columns['blank'].append(not text.strip())
+                columns['font_scope'].append(in_scope)
+                columns['role'].append(role)
+
+        self.part_ranges.append((start, len(self.runs)))
+        for tag, elements in found.items():
+            self.elements[tag].extend((part_id, element) for element in elements)
+
+    def rebind_part(self, part_id: int, tree: ET.ElementTree):
+        # 用重新解析的同一内容替换部件的XML树，行号和列值保持不变，只更新指向的元素
+        start, end = self.part_ranges[part_id]
+        found = {tag: [] for tag in self.tags}
+        row = start
+        for paragraph, _, _ in slide_paragraphs(tree.getroot(), self.tags, found):
+            for text_run in paragraph.findall('a:r', NAMESPACES):
+                if row >= end:
+                    raise ValueError(f"部件 {self.part_names[part_id]} 的结构与索引不一致")
+                self.runs[row] = text_run
+                self.paragraphs[row] = paragraph
+                row += 1
+        if row != end:
+            raise ValueError(f"部件 {self.part_names[part_id]} 的结构与索引不一致")
+
+        self.trees[part_id] = tree
+        for tag, elements in found.items():
+            self.elements[tag] = [item for item in self.elements[tag] if item[0] != part_id]
+            self.elements[tag].extend((part_id, element) for element in elements)
+
+    def snapshot_styles(self):
+        return self.sz.copy(), self.latin.copy(), self.ea.copy(), self.cs.copy()
+
+    def restore_styles(self, styles):
+        self.sz, self.latin, self.ea, self.cs = (column.copy() for column in styles)
+
+    def freeze(self):
+        columns = self._columns
+        self.part = np.array(columns['part'], dtype=np.int32)
+        self.sz = np.array(columns['sz'], dtype=np.int32)
+        self.latin = np.array(columns['latin'], dtype=np.int32)
+        self.ea = np.array(columns['ea'], dtype=np.int32)
+        self.cs = np.array(columns['cs'], dtype=np.int32)
+        self.text = np.array(columns['text'], dtype=np.int32)
+        self.text_len = np.array(columns['text_len'], dtype=np.int32)
+        self.blank = np.array(columns['blank'], dtype=bool)
+        self.font_scope = np.array(columns['font_scope'], dtype=bool)
+        self.role = np.array(columns['role'], dtype=np.int32)
+        self._columns = None
+        return self
+
+    def __len__(self):
+        return len(self.runs)
+
+    def refresh(self, rows: np.ndarray):
+        # 修改 XML 后同步更新对应行的列值
+        for row in rows:
+            self.sz[row], self.latin[row], self.ea[row], self.cs[row] = self._style(self.runs[row])
+
+    def typeface_mask(self, pattern: Optional[str], columns=('latin', 'ea', 'cs')) -> np.ndarray:
+        if pattern is None:
+            return np.ones(len(self), dtype=bool)
+
+        # 模式只对每个不同的字体名计算一次，再按编号查表得到整列结果
+        pattern_id = self.matcher.add(pattern)
+        table = np.fromiter((pattern_id in self.matcher.matches(typeface) for typeface in self.typefaces),
+                            dtype=bool, count=len(self.typefaces))
+        mask = np.zeros(len(self), dtype=bool)
+        for column in columns:
+            mask |= table[getattr(self, column)]
+        return mask
+
+    def size_rule_masks(self, size_index: SizeIntervalIndex) -> np.ndarray:
+        # 每个不同的字号只在区间索引中查询一次，再按行展开为 (规则数, 行数) 的掩码
+        values, inverse = np.unique(self.sz, return_inverse=True)
+        table = np.zeros((len(size_index), len(values)), dtype=bool)
+        for column, sz in enumerate(values):
+            if sz != 0:
+                table[list(size_index.lookup(int(sz))), column] = True
+        return table[:, inverse.ravel()]
+
+    def keyword_masks(self, keyword_lists: List[List[str]]) -> List[Optional[np.ndarray]]:
+        # 所有规则的关键词合并成一个自动机，每个不同的文本只扫描一次；没有关键词条件的规则返回 None
+        matcher = KeywordMatcher(keyword for keywords in keyword_lists for keyword in keywords)
+        hits = [matcher.find(text) for text in self.text_values]
+
+        masks = []
+        for keywords in keyword_lists:
+            keyword_ids = frozenset(matcher.keyword_id(keyword) for keyword in keywords)
+            if not keyword_ids:
+                masks.append(None)
+                continue
+            table = np.fromiter((not keyword_ids.isdisjoint(found) for found in hits), dtype=bool, count=len(hits))
+            masks.append(table[self.text])
+        return masks
+
+    def role_mask(self, roles: List[str]) -> Optional[np.ndarray]:
+        # 角色在建索引时已记录在 role 列中，条件判断只需按位与；没有角色条件时返回 None
+        bits = role_bits(roles)
+        if not bits:
+            return None
+        return (self.role & bits) != 0
+
+    def role_counts(self) -> Dict[str, int]:
+        return {name: int(np.count_nonzero(self.role & bits)) for name, bits in ROLES.items()}
+
+    def inventory(self) -> List[Dict]:
+        if len(self) == 0:
+            return []
+
+        styles = np.stack([self.sz, self.latin, self.ea, self.cs], axis=1)
+        unique_styles, inverse, counts = np.unique(styles, axis=0, return_inverse=True, return_counts=True)
+        chars = np.bincount(inverse.ravel(), weights=self.text_len, minlength=len(unique_styles))
+
+        result = []
+        for style, count, char_count in zip(unique_styles, counts, chars):
+            sz, latin, ea, cs = (int(value) for value in style)
+            result.append({
+                'size': f"{sz / 100:g}" if sz else '',
+                'latin': self.typefaces[latin],
+                'ea': self.typefaces[ea],
+                'cs': self.typefaces[cs],
+                'runs': int(count),
+                'chars': int(char_count)
+            })
+        result.sort(key=lambda item: item['runs'], reverse=True)
+        return result
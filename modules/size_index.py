@@ -0,0 +1,82 @@
+import bisect
+import functools
+import math
+import re
+from typing import List, Optional, Tuple
+
+# 字号统一使用 a:rPr 的 sz 单位（百分之一磅）
+MAX_SZ = 400000
+SIZE_TOLERANCE = 0.1
+
+_RANGE_PATTERN = re.compile(r'^(\d+(?:\.\d+)?)?\s*[-~]\s*(\d+(?:\.\d+)?)?$')
+
+
+def parse_size_spec(spec, tolerance: float = 0.0) -> Optional[Tuple[int, int]]:
+    # "24" 表示单个字号（按 tolerance 放宽），"28-44"、"28~44" 为闭区间，"28-" 表示 28 及以上，"-12" 表示 12 及以下
+    text = str(spec).strip()
+    match = _RANGE_PATTERN.match(text)
+    if match:
+        low, high = match.groups()
+        if low is None and high is None:
+            return None
+        interval = (round(float(low) * 100) if low else 1, round(float(high) * 100) if high else MAX_SZ)
+        return interval if interval[0] <= interval[1] else None
+
+    try:
+        size = float(text)
+    except ValueError:
+        return None
+    if not tolerance:
+        return round(size * 100), round(size * 100)
+
+    # 先按区间估算边界，再用原先 abs(old_size - size) < tolerance 的浮点判断收紧，保证结果完全一致
+    def within(sz):
+        return abs(size - sz / 100) < tolerance
+
+    low = math.floor((size - tolerance) * 100)
+    high = math.ceil((size + tolerance) * 100)
+    while low <= high and not within(low):
+        low += 1
+    while high >= low and not within(high):
+        high -= 1
+    return (low, high) if low <= high else None
+
+
+class SizeIntervalIndex:
+    # 把所有规则的字号区间切分成互不重叠的小段，lookup() 二分定位所在小段，返回命中的全部规则（按配置顺序）
+    def __init__(self, specs: List, tolerance: float = 0.0):
+        self.intervals = [parse_size_spec(spec, tolerance) if spec is not None else None for spec in specs]
+
+        bounds = set()
+        for interval in self.intervals:
+            if interval is not None:
+                bounds.add(interval[0])
+                bounds.add(interval[1] + 1)
+        self.bounds = sorted(bounds)
+        self.segment_rules = [
+            tuple(rule_id for rule_id, interval in enumerate(self.intervals)
+                  if interval is not None and interval[0] <= start <= interval[1])
+            for start in self.bounds
+        ]
+
+    def __len__(self):
+        return len(self.intervals)
+
+    def lookup(self, sz: int) -> Tuple[int, ...]:
+        segment = bisect.bisect_right(self.bounds, sz) - 1
+        return self.segment_rules[segment] if segment >= 0 else ()
+
+    def precedence(self) -> List[int]:
+        # 区间重叠时的优先级：区间越窄越优先（单个字号最优先），宽度相同时配置靠前的优先
+        valid = [rule_id for rule_id, interval in enumerate(self.intervals) if interval is not None]
+        return sorted(valid, key=lambda rule_id: (self.intervals[rule_id][1] - self.intervals[rule_id][0], rule_id))
+
+
+@functools.lru_cache(maxsize=64)
+def _cached_size_index(specs: Tuple, tolerance: float) -> SizeIntervalIndex:
+    return SizeIntervalIndex(list(specs), tolerance)
+
+
+def cached_size_index(specs: List, tolerance: float = 0.0) -> SizeIntervalIndex:
+    # 索引建好后只读，规则不变时各任务、各线程共用同一个；字号统一转成字符串作为缓存键，与 parse_size_spec 的处理一致
+    return _cached_size_index(tuple(None if spec is None else str(spec) for spec in specs), tolerance)
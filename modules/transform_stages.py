@@ -0,0 +1,118 @@
+import logging
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from .lang_detector import detect_lang
+from .run_index import RunIndex
+
+XML_LANG = '{http://www.w3.org/XML/1998/namespace}lang'
+
+STAGES = []
+
+
+def register_stage(stage_class):
+    # 转换阶段按注册顺序执行；新增的修复只需注册一个阶段，建索引时的那一次遍历会一并收集它声明的元素
+    STAGES.append(stage_class)
+    return stage_class
+
+
+class TransformStage:
+    # name 用于日志和统计；tags 为除文本运行外还需要收集的元素标签（带命名空间），例如 a:effectLst
+    # run() 返回被修改的文本运行掩码；只修改其他元素的阶段把部件编号加入 context['touched_parts']，
+    # 并把修改的元素数量记在 context['element_hits'][name] 中
+    # run_local 表示阶段只修改 a:r 内部，多版本输出时可以只重新序列化改动过的文本运行
+    name = ''
+    tags = ()
+    run_local = False
+
+    def __init__(self, processor):
+        self.processor = processor
+
+    def enabled(self, context: Dict) -> bool:
+        return True
+
+    def run(self, index: RunIndex, context: Dict) -> np.ndarray:
+        raise NotImplementedError
+
+
+@register_stage
+class FontStage(TransformStage):
+    name = 'font'
+    run_local = True
+
+    def enabled(self, context: Dict) -> bool:
+        return bool(context['font_configs'])
+
+    def run(self, index: RunIndex, context: Dict) -> np.ndarray:
+        touched, lang_rows = self.processor._apply_font_configs(index, context['font_configs'],
+                                                                context['report']['font_rules'])
+        context['lang_rows'] = lang_rows
+        # 后续阶段基于替换后的字号和字体判断
+        index.refresh(np.flatnonzero(touched))
+        return touched
+
+
+@register_stage
+class LanguageStage(TransformStage):
+    # 替换了字体的文本运行按文本内容重新标注语言，解决语法检查的红色波浪线
+    name = 'lang'
+
+    def enabled(self, context: Dict) -> bool:
+        return context.get('lang_rows') is not None
+
+    def run(self, index: RunIndex, context: Dict) -> np.ndarray:
+        ns = self.processor.xml_handler.namespaces
+        rows = context['lang_rows']
+        for row in np.flatnonzero(rows):
+            text_run = index.runs[row]
+            lang = detect_lang(index.texts[row])
+            text_run.set(XML_LANG, lang)
+            text_run.find('a:rPr', ns).set('lang', lang)
+            end_para_rpr = index.paragraphs[row].find('.//a:endParaRPr', ns)
+            if end_para_rpr is not None and 'lang' in end_para_rpr.attrib:
+                end_para_rpr.set('lang', lang)
+        return rows
+
+
+@register_stage
+class GradientStage(TransformStage):
+    name = 'gradient'
+    run_local = True
+
+    def enabled(self, context: Dict) -> bool:
+        return bool(context['target_configs'])
+
+    def run(self, index: RunIndex, context: Dict) -> np.ndarray:
+        return self.processor._apply_gradient_configs(index, context['target_configs'],
+                                                      context['report']['gradients'])
+
+
+def stage_tags(stages: List[TransformStage]) -> frozenset:
+    return frozenset(tag for stage in stages for tag in stage.tags)
+
+
+def run_stages(stages: List[TransformStage], index: RunIndex, context: Dict) -> np.ndarray:
+    # 所有阶段共用同一份索引，依次执行并记录每个阶段的耗时和命中数量
+    touched = np.zeros(len(index), dtype=bool)
+    context.setdefault('touched_parts', set())
+    context.setdefault('element_hits', {})
+    context['run_local'] = True
+    stats = context['report'].setdefault('stages', {})
+
+    for stage in stages:
+        if not stage.enabled(context):
+            continue
+        start = time.perf_counter()
+        stage_touched = stage.run(index, context)
+        seconds = time.perf_counter() - start
+
+        hits = int(np.count_nonzero(stage_touched)) + context['element_hits'].get(stage.name, 0)
+        stats[stage.name] = {'hits': hits, 'seconds': seconds}
+        logging.info(f"转换阶段 {stage.name}: 命中 {hits} 处，耗时 {seconds * 1000:.1f} 毫秒")
+        touched |= stage_touched
+        context['run_local'] = context['run_local'] and stage.run_local
+
+    context['touched_runs'] = touched
+    return touched
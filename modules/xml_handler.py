@@ -1,7 +1,15 @@
+import io
+import re
+import uuid
 import xml.etree.ElementTree as ET
 from typing import Dict, List, Optional
 
 
+# tostring 会在片段最外层补上命名空间声明；未注册的命名空间会被编号为 ns0、ns1，与整篇文档中的编号未必一致
+_FRAGMENT_NAMESPACES = re.compile(r'\s+xmlns(?::[\w.-]+)?="[^"]*"')
+_AUTO_PREFIX = re.compile(r'<\s*/?ns\d+:|\sns\d+:')
+
+
 class XMLHandler:
     def __init__(self):
         self.namespaces = {
@@ -19,6 +27,41 @@ class XMLHandler:
     def save_xml(self, tree: ET.ElementTree, file_path: str):
         tree.write(file_path, encoding='utf-8', xml_declaration=True)
 
+    def load_xml_bytes(self, data: bytes) -> ET.ElementTree:
+        return ET.ElementTree(ET.fromstring(data))
+
+    def dump_xml_bytes(self, tree: ET.ElementTree) -> bytes:
+        buffer = io.BytesIO()
+        tree.write(buffer, encoding='utf-8', xml_declaration=True)
+        return buffer.getvalue()
+
+    def dump_fragment_bytes(self, element: ET.Element) -> Optional[bytes]:
+        # 单独序列化文档中的一个元素，结果与整篇序列化时该元素对应的部分一致；无法保证一致时返回 None
+        text = ET.tostring(element, encoding='unicode')
+        if _AUTO_PREFIX.search(text):
+            return None
+        end = text.index('>')
+        return (_FRAGMENT_NAMESPACES.sub('', text[:end]) + text[end:]).encode('utf-8')
+
+    def split_around_elements(self, tree: ET.ElementTree, parents: List[ET.Element],
+                              elements: List[ET.Element]) -> List[bytes]:
+        # 整篇序列化一次，在每个元素前后切开，返回 [前段, 元素0, 中间段, 元素1, ..., 后段]
+        token = uuid.uuid4().hex
+        markers = []
+        for number, (parent, element) in enumerate(zip(parents, elements)):
+            position = list(parent).index(element)
+            before, after = ET.Comment(f"{token}-{number}"), ET.Comment(f"{token}-{number}")
+            parent.insert(position + 1, after)
+            parent.insert(position, before)
+            markers.append((parent, before, after))
+        try:
+            data = self.dump_xml_bytes(tree)
+        finally:
+            for parent, before, after in markers:
+                parent.remove(before)
+                parent.remove(after)
+        return re.split(rb'<!--' + token.encode() + rb'-\d+-->', data)
+
     def find_text_runs(self, tree: ET.ElementTree) -> List[ET.Element]:
         root = tree.getroot()
         return root.findall('.//a:r', self.namespaces)
@@ -56,13 +99,14 @@ class XMLHandler:
 
         return grad_fill
 
-    def apply_gradient_to_text_run(self, text_run: ET.Element, gradient_config: List[Dict], font_size: str,
-                                   font_name: Optional[str] = None):
+    def apply_gradient_to_text_run(self, text_run: ET.Element, gradient_config: List[Dict], font_size: Optional[str],
+                                   font_name: Optional[str] = None, grad_fill: Optional[ET.Element] = None):
         rpr = text_run.find(f"a:rPr", self.namespaces)
         if rpr is None:
             rpr = ET.SubElement(text_run, f"{{{self.namespaces['a']}}}rPr")
 
-        rpr.set('sz', str(int(float(font_size) * 100)))
+        if font_size:
+            rpr.set('sz', str(int(float(font_size) * 100)))
 
         if font_name:
             for font_type in ['latin', 'ea', 'cs']:
@@ -77,7 +121,8 @@ class XMLHandler:
         for fill_elem in rpr.findall(f"a:gradFill", self.namespaces):
             rpr.remove(fill_elem)
 
-        grad_fill = self.create_gradient_fill(gradient_config)
+        if grad_fill is None:
+            grad_fill = self.create_gradient_fill(gradient_config)
         rpr.insert(0, grad_fill)
 
     def apply_gradient_to_end_para(self, paragraph: ET.Element, gradient_config: List[Dict], font_size: str = None):
@@ -0,0 +1,27 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from pptx import Presentation
+from pptx.util import Inches, Pt
+
+
+def build_deck(path, runs=(('Sora', 32, 'Hello'), ('Arial', 18, 'World'))):
+    # 生成一份小型演示文稿：每个 (字体, 字号, 文本) 各占一个文本框
+    presentation = Presentation()
+    slide = presentation.slides.add_slide(presentation.slide_layouts[6])
+    for index, (font_name, font_size, text) in enumerate(runs):
+        box = slide.shapes.add_textbox(Inches(1), Inches(1 + index), Inches(6), Inches(1))
+        run = box.text_frame.paragraphs[0].add_run()
+        run.text = text
+        run.font.name = font_name
+        run.font.size = Pt(font_size)
+    presentation.save(str(path))
+    return str(path)
+
+
+@pytest.fixture
+def sample_deck(tmp_path):
+    return build_deck(tmp_path / 'sample.pptx')
@@ -0,0 +1,66 @@
+import asyncio
+import inspect
+import io
+import threading
+import time
+import zipfile
+
+from modules import async_api
+from modules.async_api import EVENT_DONE, AsyncProcessor
+
+
+class CountingSource:
+    # 记录同时读入内存、尚未处理完的输入数量
+    lock = threading.Lock()
+    loaded = 0
+    peak = 0
+
+    def __init__(self, data):
+        self.data = data
+
+    def read(self):
+        with CountingSource.lock:
+            CountingSource.loaded += 1
+            CountingSource.peak = max(CountingSource.peak, CountingSource.loaded)
+        return self.data
+
+
+def fake_run_job(job_id, pptx_bytes, gradient_config, font_size, font_name, gradient_configs, progress_queue,
+                 font_configs):
+    time.sleep(0.02)
+    with CountingSource.lock:
+        CountingSource.loaded -= 1
+    if progress_queue is not None:
+        progress_queue.put((job_id, None))
+    return pptx_bytes.upper()
+
+
+def test_process_many_reads_inputs_within_the_concurrency_limit(monkeypatch):
+    monkeypatch.setattr(async_api, 'run_job', fake_run_job)
+    CountingSource.loaded = CountingSource.peak = 0
+
+    async def run():
+        jobs = [{'source': CountingSource(f'deck{i}'.encode())} for i in range(12)]
+        async with AsyncProcessor(max_concurrency=3, executor='thread') as processor:
+            return [event async for event in processor.process_many(jobs) if event.kind == EVENT_DONE]
+
+    done = asyncio.run(run())
+    assert sorted(event.result for event in done) == sorted(f'DECK{i}'.encode() for i in range(12))
+    assert CountingSource.peak <= 3
+
+
+def test_entry_points_share_the_spawned_process_default(sample_deck):
+    defaults = {inspect.signature(entry).parameters['executor'].default
+                for entry in (AsyncProcessor, async_api.process_async, async_api.process_many)}
+    assert defaults == {async_api.DEFAULT_EXECUTOR} == {'process'}
+
+    async def run():
+        events = []
+        async with AsyncProcessor(max_concurrency=1) as processor:
+            result = await processor.process_async(sample_deck, progress=events.append)
+            return result, events, processor.executor._mp_context.get_start_method()
+
+    result, events, start_method = asyncio.run(run())
+    assert start_method == 'spawn'
+    assert zipfile.ZipFile(io.BytesIO(result)).testzip() is None
+    assert events[0].kind == 'started'
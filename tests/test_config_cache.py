@@ -0,0 +1,35 @@
+import json
+import os
+
+from modules import ppt_processor
+from modules.ppt_processor import PPTProcessor
+from modules.size_index import cached_size_index
+
+
+def test_font_matcher_is_reused_until_aliases_change(tmp_path, monkeypatch):
+    alias_path = tmp_path / 'font_aliases.json'
+    alias_path.write_text(json.dumps({'Sora SemiBold': 'Sora'}), encoding='utf-8')
+    monkeypatch.setattr(ppt_processor, 'FONT_ALIAS_PATH', str(alias_path))
+
+    first = PPTProcessor(font_configs={})
+    second = PPTProcessor(font_configs={})
+    assert second.font_matcher is first.font_matcher
+    assert first.font_matcher.match('Sora', 'Sora-SemiBold')
+
+    alias_path.write_text(json.dumps({'Sora SemiBold': 'Inter'}), encoding='utf-8')
+    stat = os.stat(alias_path)
+    os.utime(alias_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    third = PPTProcessor(font_configs={})
+    assert third.font_matcher is not first.font_matcher
+    assert third.font_matcher.match('Inter', 'Sora SemiBold')
+
+
+def test_explicit_aliases_bypass_the_cache():
+    processor = PPTProcessor(font_configs={}, font_aliases={'A': 'B'})
+    assert processor.font_matcher is None
+    assert processor.font_aliases == {'A': 'B'}
+
+
+def test_size_index_is_shared_for_equal_specs():
+    assert cached_size_index(['24', 28, None]) is cached_size_index([24, '28', None])
+    assert cached_size_index(['24']).lookup(2400) == (0,)
@@ -0,0 +1,63 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+from modules import daemon, daemon_client
+from modules.daemon import ProcessingDaemon
+from modules.daemon_client import DaemonClient, DaemonError, default_socket_path
+
+
+def test_socket_lives_in_a_private_directory(tmp_path, monkeypatch):
+    runtime_dir = tmp_path / 'runtime'
+    runtime_dir.mkdir(mode=0o700)
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(runtime_dir))
+    assert default_socket_path() == str(runtime_dir / 'rescuegamma.sock')
+
+    # 运行时目录权限不对时不使用，改为在临时目录下创建 0700 目录
+    runtime_dir.chmod(0o755)
+    monkeypatch.setattr(daemon_client.tempfile, 'gettempdir', lambda: str(tmp_path))
+    socket_dir = tmp_path / f'rescuegamma-{os.getuid()}'
+    assert default_socket_path() == str(socket_dir / 'rescuegamma.sock')
+    assert socket_dir.stat().st_mode & 0o777 == 0o700
+
+    socket_dir.chmod(0o777)
+    with pytest.raises(DaemonError):
+        default_socket_path()
+
+
+def test_ping_process_shutdown_round_trip(tmp_path, sample_deck, monkeypatch):
+    for name in ('FONT_CONFIG_PATH', 'GRADIENT_CONFIG_PATH', 'FONT_ALIAS_PATH'):
+        monkeypatch.setattr(daemon, name, str(tmp_path / f'{name}.json'))
+    socket_path = str(tmp_path / 'daemon.sock')
+    server = ProcessingDaemon(socket_path, workers=1, watch_interval=0.1)
+    thread = threading.Thread(target=asyncio.run, args=(server.serve(),))
+    thread.start()
+    try:
+        client = DaemonClient(socket_path, timeout=30)
+        pong = None
+        for _ in range(300):
+            try:
+                pong = client.ping()
+                break
+            except DaemonError:
+                thread.join(0.1)
+        assert pong is not None and pong['event'] == 'ok' and pong['workers'] == 1
+
+        output_path = tmp_path / 'out.pptx'
+        events = []
+        gradient_config = [{'position': 0, 'color': '#FF0000'}, {'position': 100000, 'color': '#0000FF'}]
+        result = client.process(sample_deck, str(output_path), gradient_config, '32', 'Sora', on_event=events.append)
+        assert result == {'event': 'done', 'output': str(output_path)}
+        assert events[0]['event'] == 'started'
+        assert output_path.stat().st_size > 0
+
+        failed = client.process(str(tmp_path / 'missing.pptx'), str(tmp_path / 'missing_out.pptx'))
+        assert failed['event'] == 'failed'
+    finally:
+        assert DaemonClient(socket_path, timeout=30).shutdown() == {'event': 'ok'}
+        thread.join(30)
+
+    assert not thread.is_alive()
+    assert not os.path.exists(socket_path)
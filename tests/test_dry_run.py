@@ -0,0 +1,68 @@
+import json
+
+import main
+from conftest import build_deck
+from modules import ppt_processor
+from modules.ppt_processor import PPTProcessor
+
+GRADIENT_CONFIGS = {
+    '32': {'gradient_config': [{'position': 0, 'color': '#FF0000'}, {'position': 100000, 'color': '#0000FF'}],
+           'font_name': 'Sora'},
+    '28-44': {'gradient_config': [{'position': 0, 'color': '#00FF00'}, {'position': 100000, 'color': '#000000'}],
+              'font_name': 'Inter'},
+}
+
+
+def test_dry_run_reports_inventory_and_stage_stats(tmp_path):
+    path = build_deck(tmp_path / 'deck.pptx', (('Sora', 32, 'Hello'), ('Arial', 18, 'World'), ('Arial', 18, '中文'),
+                                                ('Sora', 32, 'Again'), ('Sora', 32, ' ')))
+    with open(path, 'rb') as f:
+        original = f.read()
+    font_configs = {
+        'arial': {'old_font': 'Arial', 'old_size': '18', 'new_font': 'Inter', 'new_size': '30', 'latin': True},
+        'unused': {'old_font': 'Comic Sans', 'new_size': '12'},
+    }
+    report = PPTProcessor(font_configs=font_configs, font_aliases={}).dry_run(path, gradient_configs=GRADIENT_CONFIGS)
+
+    assert report['runs'] == 5 and report['parts'] == 1
+    # 清单按处理前的样式统计，按文本运行数量从多到少排列
+    assert report['inventory'] == [
+        {'size': '32', 'latin': 'Sora', 'ea': '', 'cs': '', 'runs': 3, 'chars': 11},
+        {'size': '18', 'latin': 'Arial', 'ea': '', 'cs': '', 'runs': 2, 'chars': 7},
+    ]
+    assert report['roles'] == {'title': 0, 'subtitle': 0, 'body': 0, 'placeholder': 0, 'table': 0, 'group': 0,
+                               'shape': 5}
+    assert report['font_rules'] == {'arial': 2, 'unused': 0}
+    # 空白文本运行不参与字体替换，但字号和字体匹配时仍会套用渐变；替换后的 Arial 按新字号、新字体命中区间方案
+    assert report['gradients'] == {'32': 3, '28-44': 2}
+    assert {name: stats['hits'] for name, stats in report['stages'].items()} == {'font': 2, 'lang': 2, 'gradient': 5}
+    assert all(stats['seconds'] >= 0 for stats in report['stages'].values())
+    assert report['touched_parts'] == ['ppt/slides/slide1.xml']
+
+    # 只演练，不修改输入
+    with open(path, 'rb') as f:
+        assert f.read() == original
+
+
+def test_inspect_command_prints_the_report(tmp_path, sample_deck, monkeypatch, capsys):
+    for name, config in (('FONT_CONFIG_PATH', {'sora': {'old_font': 'Sora', 'new_size': '36'}}),
+                         ('GRADIENT_CONFIG_PATH', GRADIENT_CONFIGS), ('FONT_ALIAS_PATH', {})):
+        config_path = tmp_path / f'{name}.json'
+        config_path.write_text(json.dumps(config), encoding='utf-8')
+        monkeypatch.setattr(ppt_processor, name, str(config_path))
+
+    args = main.build_parser().parse_args(['inspect', sample_deck])
+    assert args.func(args) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[:4] == ["幻灯片 1 个，文本运行 2 个", "字号\tLatin\tEA\tCS\t运行数\t字符数",
+                         "18\tArial\t\t\t1\t5", "32\tSora\t\t\t1\t5"]
+    # 耗时每次不同，只比较命中数量
+    assert [line.split('，耗时')[0] for line in lines[4:]] == [
+        "形状角色: 文本框 2",
+        "字体规则 sora: 命中 1 个文本运行",
+        "渐变方案 28-44: 命中 0 个文本运行",
+        "转换阶段 font: 命中 1 处",
+        "转换阶段 lang: 命中 0 处",
+        "转换阶段 gradient: 命中 0 处",
+        "将修改 1 个幻灯片",
+    ]
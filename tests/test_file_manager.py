@@ -0,0 +1,55 @@
+import io
+import sys
+import zipfile
+
+import pytest
+
+from modules import file_manager
+from modules.file_manager import FileManager
+
+MEMBERS = {
+    '[Content_Types].xml': (b'<Types/>', zipfile.ZIP_DEFLATED),
+    'ppt/slides/slide1.xml': (b'<sld>one</sld>' * 50, zipfile.ZIP_DEFLATED),
+    'ppt/slides/slide2.xml': (b'<sld>two</sld>' * 50, zipfile.ZIP_DEFLATED),
+    'ppt/media/image1.png': (bytes(range(256)) * 4, zipfile.ZIP_STORED),
+}
+
+
+def build_archive() -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as zip_out:
+        for name, (data, compress_type) in MEMBERS.items():
+            zip_out.writestr(name, data, compress_type=compress_type)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize('raw_copy', [True, False])
+def test_rewrite_pptx_reopens_cleanly(raw_copy):
+    manager = FileManager()
+    source = build_archive()
+    with zipfile.ZipFile(io.BytesIO(source)) as zip_in:
+        compressed = {'ppt/slides/slide2.xml': manager.deflate_member(zip_in.getinfo('ppt/slides/slide2.xml'),
+                                                                      b'<sld>shared</sld>')}
+
+    output = manager.rewrite_pptx(source, {'ppt/slides/slide1.xml': b'<sld>new</sld>'}, compressed, raw_copy=raw_copy)
+
+    with zipfile.ZipFile(io.BytesIO(output)) as zip_out:
+        assert zip_out.testzip() is None
+        assert zip_out.namelist() == list(MEMBERS)
+        assert zip_out.read('ppt/slides/slide1.xml') == b'<sld>new</sld>'
+        assert zip_out.read('ppt/slides/slide2.xml') == b'<sld>shared</sld>'
+        assert zip_out.read('ppt/media/image1.png') == MEMBERS['ppt/media/image1.png'][0]
+        assert zip_out.getinfo('ppt/media/image1.png').compress_type == zipfile.ZIP_STORED
+
+
+def test_raw_copy_probe_matches_this_interpreter():
+    # 当前解释器在验证范围内时应启用直接复制
+    low, high = file_manager.RAW_COPY_VERSIONS
+    assert file_manager.raw_copy_supported() == (low <= sys.version_info[:2] <= high)
+
+
+def test_raw_copy_is_off_by_default(monkeypatch):
+    monkeypatch.setattr(file_manager, '_append_raw_member', lambda *args: pytest.fail("默认不应直接复制压缩数据"))
+    output = FileManager().rewrite_pptx(build_archive(), {'ppt/slides/slide1.xml': b'<sld>new</sld>'})
+    with zipfile.ZipFile(io.BytesIO(output)) as zip_out:
+        assert zip_out.testzip() is None
@@ -0,0 +1,54 @@
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from modules import ppt_processor
+from modules.folder_watcher import FolderWatcher
+
+
+def test_rejects_output_inside_input(tmp_path):
+    with pytest.raises(ValueError):
+        FolderWatcher(str(tmp_path), str(tmp_path))
+    with pytest.raises(ValueError):
+        FolderWatcher(str(tmp_path), str(tmp_path / 'out'))
+
+
+def test_skips_outputs_and_names_them_with_suffix(tmp_path):
+    input_dir, output_dir = tmp_path / 'in', tmp_path / 'out'
+    input_dir.mkdir()
+    (input_dir / 'a.pptx').write_bytes(b'pptx')
+    (input_dir / 'a_RescueGamma.pptx').write_bytes(b'pptx')
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        watcher = FolderWatcher(str(input_dir), str(output_dir), settle_time=0, executor=executor)
+        assert watcher.scan() == []
+        assert watcher.scan() == ['a.pptx']
+
+        submitted = []
+        executor.submit = lambda fn, *args: submitted.append(args)
+        watcher.submit('a.pptx')
+        assert submitted == [(str(input_dir / 'a.pptx'), os.path.join(str(output_dir), 'a_RescueGamma.pptx'))]
+
+
+def test_failed_deck_is_recorded_without_output(tmp_path, sample_deck, monkeypatch):
+    font_config_path = tmp_path / 'font_config.json'
+    font_config_path.write_text(json.dumps({'r': {'old_font': 'Sora', 'new_font': 'Inter', 'latin': True}}),
+                                encoding='utf-8')
+    monkeypatch.setattr(ppt_processor, 'FONT_CONFIG_PATH', str(font_config_path))
+    monkeypatch.setattr(ppt_processor.PPTProcessor, '_transform', lambda *args, **kwargs: 1 / 0)
+    input_dir, output_dir = tmp_path / 'in', tmp_path / 'out'
+    input_dir.mkdir()
+    shutil.copy(sample_deck, input_dir / 'a.pptx')
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        watcher = FolderWatcher(str(input_dir), str(output_dir), settle_time=0, executor=executor)
+        watcher.scan()
+        for name in watcher.scan():
+            watcher.submit(name)
+        assert watcher.drain() == {'a.pptx': False}
+
+    assert 'a.pptx' in watcher.state['failed']
+    assert not (output_dir / 'a_RescueGamma.pptx').exists()
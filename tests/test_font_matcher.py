@@ -0,0 +1,38 @@
+from modules.font_matcher import FontMatcher, is_font_pattern, normalize_typeface
+
+
+def test_normalize_typeface():
+    assert normalize_typeface('Sora-Bold') == 'sora bold'
+    assert normalize_typeface('  sora__BOLD ') == 'sora bold'
+    assert normalize_typeface(None) == ''
+
+
+def test_is_font_pattern():
+    assert is_font_pattern('Sora*')
+    assert is_font_pattern('re:^sora')
+    assert not is_font_pattern('Sora')
+    assert not is_font_pattern(None)
+
+
+def test_exact_glob_regex_and_aliases():
+    matcher = FontMatcher({'Sora SemiBold': 'Sora', 'Source Han Sans SC': '思源黑体'})
+    assert matcher.match('Sora', 'sora-semibold')
+    assert matcher.match('Sora', 'SORA')
+    assert not matcher.match('Sora', 'Sora Bold')
+    assert matcher.match('Sora*', 'Sora Bold')
+    assert not matcher.match('Sora*', 'Inter')
+    assert matcher.match('re:bold$', 'Sora-Bold')
+    assert matcher.match('思源黑体', 'Source_Han_Sans_SC')
+    assert not matcher.match('Sora', '')
+
+
+def test_matches_returns_all_pattern_ids():
+    matcher = FontMatcher()
+    ids = [matcher.add(pattern) for pattern in ('Sora', 'Sora*', 're:^in', 'Inter', 're:(')]
+    assert matcher.add('Sora*') == ids[1]
+    assert matcher.matches('Sora') == {ids[0], ids[1]}
+    assert matcher.matches('Inter') == {ids[2], ids[3]}
+    assert matcher.matches('Arial') == frozenset()
+    # 新增模式后缓存失效
+    new_id = matcher.add('Arial')
+    assert matcher.matches('Arial') == {new_id}
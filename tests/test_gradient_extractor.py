@@ -0,0 +1,58 @@
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import numpy as np
+import pytest
+from PySide6.QtGui import QImage
+from PySide6.QtWidgets import QApplication
+
+from ui.gradient_extractor import BatchExtractDialog, extract_image_file
+
+
+def write_image(path):
+    # 白底上一块从红到蓝的横向渐变，模拟文字截图
+    pixels = np.full((40, 120, 3), 255, dtype=np.uint8)
+    ramp = np.linspace(0, 255, 80).astype(np.uint8)
+    pixels[10:30, 20:100, 0] = 255 - ramp
+    pixels[10:30, 20:100, 1] = 0
+    pixels[10:30, 20:100, 2] = ramp
+    image = QImage(pixels.tobytes(), 120, 40, 360, QImage.Format_RGB888).copy()
+    assert image.save(str(path))
+
+
+def test_extract_image_file_in_spawned_worker(tmp_path):
+    good = tmp_path / 'good.png'
+    bad = tmp_path / 'bad.png'
+    write_image(good)
+    bad.write_bytes(b'not an image')
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        gradient_config = executor.submit(extract_image_file, str(good), 4, 8).result()
+        failed = executor.submit(extract_image_file, str(bad), 4, 8)
+        with pytest.raises(ValueError, match='无法加载图片'):
+            failed.result()
+
+    assert gradient_config == [{'position': 0, 'color': '#FF0000'}, {'position': 100000, 'color': '#0000FF'}]
+
+
+def test_batch_dialog_ignores_results_after_close(tmp_path, monkeypatch):
+    monkeypatch.setenv('QT_QPA_PLATFORM', os.environ.get('QT_QPA_PLATFORM', 'offscreen'))
+    app = QApplication.instance() or QApplication([])
+    write_image(tmp_path / '32_Sora.png')
+
+    dialog = BatchExtractDialog(str(tmp_path), 4, 8)
+    dialog.reject()
+    dialog.reject()
+
+    emitted = []
+    dialog.signals.extracted.connect(lambda *args: emitted.append(args))
+    finished = Future()
+    finished.set_result([{'position': 0, 'color': '#FF0000'}])
+    dialog.report(0, finished)
+    dialog.on_extracted(0, finished.result(), '')
+    app.processEvents()
+
+    assert emitted == []
+    assert dialog.done_count == 0
+    assert dialog.table.item(0, 4).text() == "排队中"
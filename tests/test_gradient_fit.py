@@ -0,0 +1,86 @@
+import numpy as np
+
+from modules.gradient_fit import (band_color, border_background, extract_gradient, fit_gradient_stops,
+                                  kernel_color, simplify_gradient, text_mask)
+
+
+def test_simplify_drops_collinear_stops():
+    stops = [{'position': 0, 'color': '#000000'}, {'position': 25000, 'color': '#404040'},
+             {'position': 50000, 'color': '#808080'}, {'position': 100000, 'color': '#FFFFFF'}]
+    assert simplify_gradient(stops) == [stops[0], stops[-1]]
+    assert simplify_gradient(stops, 0) == stops
+
+
+def test_simplify_keeps_distinct_and_scheme_stops():
+    stops = [{'position': 0, 'color': '#9A6FDC'}, {'position': 74000, 'color': 'accent1'},
+             {'position': 83000, 'color': 'accent1'}, {'position': 100000, 'color': '#73C6E1'}]
+    assert simplify_gradient(stops) == stops
+
+    stops = [{'position': 0, 'color': '#000000'}, {'position': 50000, 'color': '#FF0000'},
+             {'position': 100000, 'color': '#000000'}]
+    assert simplify_gradient(stops) == stops
+
+
+def test_simplify_keeps_hard_stops():
+    stops = [{'position': 0, 'color': '#000000'}, {'position': 50000, 'color': '#000000'},
+             {'position': 50000, 'color': '#FFFFFF'}, {'position': 100000, 'color': '#FFFFFF'}]
+    assert simplify_gradient(stops) == stops
+
+
+def test_simplify_sorts_string_positions_numerically():
+    stops = [{'position': '0', 'color': '#000000'}, {'position': '50000', 'color': '#808080'},
+             {'position': '100000', 'color': '#FFFFFF'}]
+    assert simplify_gradient(stops) == [stops[0], stops[2]]
+
+
+def test_fit_gradient_stops_finds_the_corner():
+    ramp = np.concatenate([np.linspace(0, 255, 60), np.linspace(255, 0, 41)[1:]])
+    profile = np.stack([ramp, ramp, ramp], axis=1)
+    assert fit_gradient_stops(profile, max_stops=4, tolerance=2.0) == [0, 59, 99]
+
+
+def test_extract_gradient_uses_text_extent():
+    pixels = np.full((10, 120, 3), 255, dtype=np.uint8)
+    pixels[2:8, 10:110] = np.linspace([255, 0, 0], [0, 0, 255], 100).round().astype(np.uint8)
+    mask = np.zeros((10, 120), dtype=bool)
+    mask[2:8, 10:110] = True
+    gradient = extract_gradient(pixels, mask, max_stops=4, tolerance=4.0)
+    assert gradient == [{'position': 0, 'color': '#FF0000'}, {'position': 100000, 'color': '#0000FF'}]
+
+
+def test_border_background_ignores_text_touching_a_corner():
+    pixels = np.full((20, 20, 3), 255, dtype=np.uint8)
+    pixels[:6, :6] = (20, 30, 40)
+    assert border_background(pixels) == (255, 255, 255)
+
+
+def test_text_mask_rejects_anti_aliased_edge_columns():
+    distance = np.zeros((4, 150), dtype=np.int32)
+    distance[:, 10:13] = 200 * 200
+    distance[:, 13] = 100 * 100
+    distance[:, 60] = 100 * 100
+    distance[:, 90] = 50 * 50
+    columns = np.flatnonzero(text_mask(distance).any(axis=0))
+    assert columns.tolist() == [10, 11, 12, 60]
+
+
+def test_band_color_averages_text_pixels_inside_the_clipped_band():
+    pixels = np.zeros((4, 10, 3), dtype=np.uint8)
+    pixels[0, 0] = (200, 0, 0)
+    pixels[1, 2] = (100, 50, 0)
+    pixels[0, 5] = (0, 0, 255)
+    mask = np.zeros((4, 10), dtype=bool)
+    assert band_color(pixels, mask, 1, 2) is None
+    mask[0, 0] = mask[1, 2] = mask[0, 5] = True
+    assert band_color(pixels, mask, 1, 2) == (150, 25, 0)
+    assert band_color(pixels, mask, 9, 3) is None
+
+
+def test_kernel_color_mean_and_median_clip_the_window_at_image_edges():
+    pixels = np.full((5, 5, 3), 100, dtype=np.uint8)
+    pixels[0, 0] = (255, 255, 255)
+    assert kernel_color(pixels, 0, 0) == (255, 255, 255)
+    assert kernel_color(pixels, 0, 0, radius=1) == (139, 139, 139)
+    assert kernel_color(pixels, 0, 0, radius=1, method='median') == (100, 100, 100)
+    assert kernel_color(pixels, 1, 1, radius=1) == (117, 117, 117)
+    assert kernel_color(pixels, 4, 4, radius=2, method='median') == (100, 100, 100)
@@ -0,0 +1,60 @@
+import os
+
+import pytest
+from PySide6.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from ui import job_queue
+from ui.job_queue import JOB_DONE, JobQueue
+
+GRADIENT_CONFIG = [{'position': 0, 'color': '#FF0000'}, {'position': 100000, 'color': '#0000FF'}]
+
+
+def run_jobs(sample_deck, tmp_path, count):
+    app = QCoreApplication.instance() or QCoreApplication([])
+    queue = JobQueue(max_workers=2)
+    outputs = [str(tmp_path / f'out{i}.pptx') for i in range(count)]
+
+    finished = {}
+    messages = {}
+    loop = QEventLoop()
+    queue.job_progress.connect(lambda job_id, message: messages.setdefault(job_id, []).append(message))
+
+    def on_finished(job_id, success):
+        finished[job_id] = success
+        if len(finished) == len(outputs):
+            loop.quit()
+
+    queue.job_finished.connect(on_finished)
+    try:
+        job_ids = [queue.submit(sample_deck, output, GRADIENT_CONFIG, '32') for output in outputs]
+        QTimer.singleShot(60000, loop.quit)
+        loop.exec()
+    finally:
+        queue.shutdown()
+
+    assert app is QCoreApplication.instance()
+    assert finished == {job_id: True for job_id in job_ids}
+    assert all(queue.jobs[job_id]['status'] == JOB_DONE for job_id in job_ids)
+    assert all(os.path.getsize(output) > 0 for output in outputs)
+    return job_ids, outputs, messages
+
+
+def test_jobs_run_in_worker_processes(sample_deck, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    job_ids, outputs, messages = run_jobs(sample_deck, tmp_path, 3)
+    # 最后一条进度消息在完成信号之前送达
+    assert all(messages[job_id][-1] == f"处理完成: {output}" for job_id, output in zip(job_ids, outputs))
+
+
+def swallow_progress(queue):
+    # 转发线程仍在运行，但结束标记丢失
+    while queue.progress_queue.get() is not None:
+        pass
+
+
+@pytest.mark.parametrize('pump', [lambda queue: None, swallow_progress], ids=['pump-exited', 'marker-lost'])
+def test_jobs_finish_when_progress_is_not_drained(sample_deck, tmp_path, monkeypatch, pump):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(job_queue, 'DRAIN_TIMEOUT', 0.5)
+    monkeypatch.setattr(JobQueue, 'pump_progress', pump)
+    run_jobs(sample_deck, tmp_path, 2)
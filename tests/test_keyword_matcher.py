@@ -0,0 +1,31 @@
+import random
+
+from modules.keyword_matcher import KeywordMatcher, parse_keywords
+
+
+def test_parse_keywords():
+    assert parse_keywords(None) == []
+    assert parse_keywords('') == []
+    assert parse_keywords('Gamma, 标题，演示、结尾\n附录,,') == ['Gamma', '标题', '演示', '结尾', '附录']
+    assert parse_keywords([' Gamma ', '', '标题']) == ['Gamma', '标题']
+
+
+def test_find_overlapping_and_case_insensitive():
+    matcher = KeywordMatcher(['he', 'she', 'his', 'hers', 'HE', 'Gamma'])
+    assert matcher.keywords == ['he', 'she', 'his', 'hers', 'Gamma']
+    assert matcher.keyword_id('SHE') == 1
+    assert matcher.keyword_id('missing') is None
+    assert matcher.find('USHERS') == {0, 1, 3}
+    assert matcher.find('gAMMA 演示') == {4}
+    assert matcher.find('') == frozenset()
+    assert KeywordMatcher().find('anything') == frozenset()
+
+
+def test_find_matches_substring_search():
+    rng = random.Random(11)
+    keywords = [''.join(rng.choice('abc') for _ in range(rng.randint(1, 4))) for _ in range(12)] + ['标题', '演示']
+    matcher = KeywordMatcher(keywords)
+    for _ in range(300):
+        text = ''.join(rng.choice('abcABC标题演示 ') for _ in range(rng.randint(0, 20)))
+        expected = {matcher.keyword_id(keyword) for keyword in keywords if keyword.casefold() in text.casefold()}
+        assert matcher.find(text) == expected
@@ -0,0 +1,19 @@
+import pytest
+
+from modules.lang_detector import DEFAULT_LANG, detect_lang
+
+
+@pytest.mark.parametrize('text, lang', [
+    ('', DEFAULT_LANG),
+    ('Hello world', 'en-US'),
+    ('Café', DEFAULT_LANG),
+    ('中文标题', 'zh-CN'),
+    ('Gamma 演示', 'zh-CN'),
+    ('𠀀', 'zh-CN'),
+    ('日本語のテキスト', 'ja-JP'),
+    ('ｶﾀｶﾅ', 'ja-JP'),
+    ('한국어', 'ko-KR'),
+    ('漢字와 한글', 'ko-KR'),
+])
+def test_detect_lang(text, lang):
+    assert detect_lang(text) == lang
@@ -0,0 +1,92 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from modules import ppt_processor
+from modules.lease_queue import LeaseQueue, QueueWorker
+
+
+def write_output(job):
+    # 代替真正的 PPT 处理：记录处理它的进程，稍作停顿让多个工作进程交错领取
+    time.sleep(0.01)
+    with open(job['output'], 'w', encoding='utf-8') as f:
+        f.write(str(os.getpid()))
+    with open(os.path.join(os.path.dirname(job['output']), 'log.txt'), 'a', encoding='utf-8') as f:
+        f.write(job['id'] + '\n')
+    return job['output']
+
+
+def run_test_worker(root):
+    return QueueWorker(LeaseQueue(root, lease_seconds=5), process_fn=write_output).run(exit_when_empty=True)
+
+
+def test_several_worker_processes_drain_the_queue(tmp_path):
+    root, output_dir = tmp_path / 'queue', tmp_path / 'out'
+    output_dir.mkdir()
+    queue = LeaseQueue(str(root), lease_seconds=5)
+    job_ids = [queue.submit(str(tmp_path / f'{i}.pptx'), str(output_dir / f'{i}.pptx')) for i in range(13)]
+
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        processed = sum(executor.map(run_test_worker, [str(root)] * 4))
+
+    assert processed == 13
+    assert queue.status() == {'pending': 0, 'leases': 0, 'done': 13, 'failed': 0}
+    assert sorted((output_dir / 'log.txt').read_text(encoding='utf-8').split()) == sorted(job_ids)
+    assert all((output_dir / f'{i}.pptx').exists() for i in range(13))
+
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    queue = LeaseQueue(str(tmp_path), lease_seconds=5)
+    job_id = queue.submit('in.pptx', 'out.pptx')
+    first = queue.claim('a')
+    assert queue.claim('b') is None
+
+    stale = os.stat(first.path).st_mtime - 60
+    os.utime(first.path, (stale, stale))
+    second = queue.claim('b')
+    assert second is not None and second.job_id == job_id and second.job['attempts'] == 2
+    assert not queue.heartbeat(first) and first.lost
+    assert not queue.complete(first, 'out.pptx')
+    assert queue.complete(second, 'out.pptx')
+
+
+def test_heartbeat_after_lease_removed(tmp_path, monkeypatch):
+    queue = LeaseQueue(str(tmp_path), lease_seconds=5)
+    queue.submit('in.pptx', 'out.pptx')
+    lease = queue.claim('a')
+    # owns() 检查通过后租约文件被回收
+    monkeypatch.setattr(queue, 'owns', lambda lease: os.remove(lease.path) or True)
+    assert not queue.heartbeat(lease)
+    assert lease.lost
+
+
+def test_processing_error_marks_job_failed(tmp_path, sample_deck, monkeypatch):
+    monkeypatch.setattr(ppt_processor.PPTProcessor, '_transform', lambda *args, **kwargs: 1 / 0)
+    queue = LeaseQueue(str(tmp_path / 'queue'), lease_seconds=5)
+    output_path = tmp_path / 'out' / 'sample.pptx'
+    queue.submit(sample_deck, str(output_path), [{'position': 0, 'color': '#FF0000'}], '32', 'Sora')
+
+    assert QueueWorker(queue).run_one() is False
+    assert queue.status() == {'pending': 0, 'leases': 0, 'done': 0, 'failed': 1}
+    assert not output_path.exists()
+
+
+def test_reclaim_survives_lock_removed_by_another_worker(tmp_path, monkeypatch):
+    queue = LeaseQueue(str(tmp_path), lease_seconds=5)
+    job_id = queue.submit('in.pptx', 'out.pptx')
+    first = queue.claim('a')
+    stale = os.stat(first.path).st_mtime - 60
+    os.utime(first.path, (stale, stale))
+
+    # 回收期间另一个工作进程把 reclaim 锁当作过期锁删除
+    lease_age = queue._lease_age
+
+    def remove_lock(path, now=None):
+        lock_path = queue._path('leases', job_id, '.reclaim')
+        if path == first.path and os.path.exists(lock_path):
+            os.remove(lock_path)
+        return lease_age(path, now)
+
+    monkeypatch.setattr(queue, '_lease_age', remove_lock)
+    second = queue.claim('b')
+    assert second is not None and second.job_id == job_id
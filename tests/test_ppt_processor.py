@@ -0,0 +1,149 @@
+import io
+import zipfile
+
+import pytest
+from pptx import Presentation
+from pptx.util import Pt
+
+from conftest import build_deck
+from modules import file_manager
+from modules.ppt_processor import PPTProcessor
+from modules.xml_handler import XMLHandler
+
+NS = {'a': 'http://schemas.openxmlformats.org/drawingml/2006/main'}
+XML_LANG = '{http://www.w3.org/XML/1998/namespace}lang'
+
+RUNS = (('Sora', 32, 'Hello'), ('Arial', 18, 'World'), ('Arial', 18, '中文标题'), ('Sora', 18, 'Other'),
+        ('Sora', 32, '渐变'), ('Inter', 28, 'Plain'))
+FONT_CONFIGS = {
+    'arial': {'old_font': 'Arial', 'old_size': '18', 'new_font': 'Inter', 'new_size': '20', 'latin': True},
+    'sora': {'old_font': 'Sora', 'old_size': '18', 'new_size': '24'},
+}
+GRADIENT_CONFIGS = {
+    '32': {'gradient_config': [{'position': 0, 'color': '#FF0000'}, {'position': 100000, 'color': '#0000FF'}],
+           'font_name': 'Sora'},
+    '20': {'gradient_config': [{'position': 0, 'color': '#00FF00'}, {'position': 50000, 'color': '#FFFFFF'},
+                               {'position': 100000, 'color': '#000000'}], 'font_name': 'Inter'},
+}
+
+
+def baseline_process(path):
+    # 按逐个文本运行遍历的原始实现处理：先用 python-pptx 替换字体，再逐个文本运行套用渐变
+    presentation = Presentation(path)
+    for slide in presentation.slides:
+        for shape in slide.shapes:
+            for run in (run for paragraph in shape.text_frame.paragraphs for run in paragraph.runs):
+                rpr = run._r.find('a:rPr', NS)
+                latin = run.font.name or ''
+                size = run.font.size.pt if run.font.size else 0
+                for config in FONT_CONFIGS.values():
+                    if latin != config['old_font'] or abs(float(config['old_size']) - size) >= 0.1:
+                        continue
+                    run.font.size = Pt(float(config['new_size']))
+                    if config.get('new_font'):
+                        if config.get('latin'):
+                            run.font.name = config['new_font']
+                        lang = 'zh-CN' if any('一' <= char <= '鿿' for char in run.text) else 'en-US'
+                        run._r.set(XML_LANG, lang)
+                        rpr.set('lang', lang)
+    buffer = io.BytesIO()
+    presentation.save(buffer)
+
+    handler = XMLHandler()
+    with zipfile.ZipFile(buffer) as zip_ref:
+        tree = handler.load_xml_bytes(zip_ref.read('ppt/slides/slide1.xml'))
+    for text_run in tree.iter(f"{{{NS['a']}}}r"):
+        rpr = text_run.find('a:rPr', NS)
+        current_size = f"{int(rpr.get('sz')) / 100:g}"
+        fonts = {elem.get('typeface') for elem in rpr if elem.get('typeface')}
+        entry = GRADIENT_CONFIGS.get(current_size)
+        if entry and entry['font_name'] in fonts:
+            handler.apply_gradient_to_text_run(text_run, entry['gradient_config'], current_size, entry['font_name'])
+    return tree
+
+
+def typeface(rpr, tag):
+    elem = rpr.find(f'a:{tag}', NS)
+    return elem.get('typeface') if elem is not None else None
+
+
+def summarize(tree):
+    # 每个文本运行的文本、字号、字体、语言和渐变色标，与属性顺序、序列化细节无关
+    rows = []
+    for text_run in tree.iter(f"{{{NS['a']}}}r"):
+        rpr = text_run.find('a:rPr', NS)
+        fonts = tuple(typeface(rpr, tag) for tag in ('latin', 'ea', 'cs'))
+        stops = tuple((gs.get('pos'), gs.find('a:srgbClr', NS).get('val'))
+                      for gs in rpr.iterfind('a:gradFill/a:gsLst/a:gs', NS))
+        rows.append((text_run.findtext('a:t', namespaces=NS), rpr.get('sz'), fonts, rpr.get('lang'),
+                     text_run.get(XML_LANG), stops))
+    return rows
+
+
+def slide_tree(pptx_bytes):
+    with zipfile.ZipFile(io.BytesIO(pptx_bytes)) as zip_ref:
+        return XMLHandler().load_xml_bytes(zip_ref.read('ppt/slides/slide1.xml'))
+
+
+def test_process_bytes_matches_baseline(tmp_path):
+    path = build_deck(tmp_path / 'deck.pptx', RUNS)
+    processor = PPTProcessor(font_configs=FONT_CONFIGS, font_aliases={})
+    result = processor.process_bytes(path, gradient_configs=GRADIENT_CONFIGS)
+
+    expected = summarize(baseline_process(path))
+    assert summarize(slide_tree(result)) == expected
+    # 字体替换后的 Arial 文本按新字号、新字体套用渐变；没有命中规则的文本保持原样
+    assert [len(row[5]) for row in expected] == [2, 3, 3, 0, 2, 0]
+    assert expected[2][3] == 'zh-CN'
+
+
+def test_process_bytes_is_deterministic_and_leaves_other_parts(tmp_path):
+    path = build_deck(tmp_path / 'deck.pptx', RUNS)
+    processor = PPTProcessor(font_configs=FONT_CONFIGS, font_aliases={})
+    first = processor.process_bytes(path, gradient_configs=GRADIENT_CONFIGS)
+    assert processor.process_bytes(path, gradient_configs=GRADIENT_CONFIGS) == first
+
+    with open(path, 'rb') as f, zipfile.ZipFile(f) as original, zipfile.ZipFile(io.BytesIO(first)) as processed:
+        assert processed.namelist() == original.namelist()
+        for name in original.namelist():
+            if name != 'ppt/slides/slide1.xml':
+                assert processed.read(name) == original.read(name)
+
+
+def test_process_bytes_raises_when_slides_fail(tmp_path, monkeypatch):
+    path = build_deck(tmp_path / 'deck.pptx', RUNS)
+    monkeypatch.setattr(PPTProcessor, '_transform', lambda *args, **kwargs: 1 / 0)
+    processor = PPTProcessor(font_configs=FONT_CONFIGS, font_aliases={})
+    with pytest.raises(ZeroDivisionError):
+        processor.process_bytes(path, gradient_configs=GRADIENT_CONFIGS)
+    output_path = tmp_path / 'out.pptx'
+    assert not processor.process_ppt(path, str(output_path), GRADIENT_CONFIGS['32']['gradient_config'], '32', 'Sora')
+    assert not output_path.exists()
+
+
+def read_members(pptx_bytes):
+    with zipfile.ZipFile(io.BytesIO(pptx_bytes)) as zip_ref:
+        assert zip_ref.testzip() is None
+        return [(info.filename, zip_ref.read(info)) for info in zip_ref.infolist()]
+
+
+@pytest.mark.parametrize('raw_copy', [True, False])
+def test_process_variants_matches_separate_runs(tmp_path, monkeypatch, raw_copy):
+    if not raw_copy:
+        monkeypatch.setattr(file_manager, 'raw_copy_supported', lambda: False)
+    path = build_deck(tmp_path / 'deck.pptx', RUNS)
+    recoloured = {key: dict(entry, gradient_config=[{'position': 0, 'color': '#123456'},
+                                                    {'position': 100000, 'color': '#ABCDEF'}])
+                  for key, entry in GRADIENT_CONFIGS.items()}
+    variants = [{'gradient_configs': GRADIENT_CONFIGS}, {'gradient_configs': recoloured}, {'gradient_configs': {}}]
+
+    processor = PPTProcessor(font_configs=FONT_CONFIGS, font_aliases={})
+    outputs = processor.process_variants(path, variants)
+    assert len(outputs) == len(variants)
+    for output, variant in zip(outputs, variants):
+        expected = PPTProcessor(font_configs=FONT_CONFIGS, font_aliases={}).process_bytes(
+            path, gradient_configs=variant['gradient_configs'])
+        assert read_members(output) == read_members(expected)
+        if not raw_copy:
+            # 都通过 writestr 写入时输出逐字节一致
+            assert output == expected
@@ -0,0 +1,106 @@
+import io
+import zipfile
+
+from pptx import Presentation
+from pptx.util import Inches, Pt
+
+from modules.ppt_processor import PPTProcessor
+from modules.run_index import (ROLE_BODY, ROLE_GROUP, ROLE_SHAPE, ROLE_SUBTITLE, ROLE_TABLE, ROLE_TITLE,
+                               parse_roles)
+from modules.xml_handler import XMLHandler
+
+NS = {'a': 'http://schemas.openxmlformats.org/drawingml/2006/main'}
+RED = [{'position': 0, 'color': '#FF0000'}, {'position': 100000, 'color': '#0000FF'}]
+GREEN = [{'position': 0, 'color': '#00FF00'}, {'position': 100000, 'color': '#000000'}]
+
+
+def add_run(text_frame, text, size=24):
+    run = text_frame.paragraphs[0].add_run()
+    run.text = text
+    run.font.name = 'Sora'
+    run.font.size = Pt(size)
+
+
+def build_role_deck():
+    # 标题页的标题、副标题占位符；内容页的标题、正文占位符，以及表格、组合内的文本框和普通文本框
+    presentation = Presentation()
+    title_slide = presentation.slides.add_slide(presentation.slide_layouts[0])
+    add_run(title_slide.shapes.title.text_frame, 'Deck Title', 40)
+    add_run(title_slide.placeholders[1].text_frame, 'Subtitle')
+
+    slide = presentation.slides.add_slide(presentation.slide_layouts[1])
+    add_run(slide.shapes.title.text_frame, 'Agenda', 40)
+    add_run(slide.placeholders[1].text_frame, 'Point')
+    table = slide.shapes.add_table(1, 1, Inches(1), Inches(4), Inches(4), Inches(1)).table
+    add_run(table.cell(0, 0).text_frame, 'Cell')
+    group = slide.shapes.add_group_shape()
+    add_run(group.shapes.add_textbox(Inches(1), Inches(5), Inches(3), Inches(1)).text_frame, 'Grouped')
+    add_run(slide.shapes.add_textbox(Inches(5), Inches(5), Inches(3), Inches(1)).text_frame, 'Loose')
+
+    buffer = io.BytesIO()
+    presentation.save(buffer)
+    return buffer.getvalue()
+
+
+def run_styles(pptx_bytes):
+    # 文本 -> (拉丁字体, 渐变首个色标)
+    handler = XMLHandler()
+    styles = {}
+    with zipfile.ZipFile(io.BytesIO(pptx_bytes)) as zip_ref:
+        for name in ('ppt/slides/slide1.xml', 'ppt/slides/slide2.xml'):
+            for text_run in handler.load_xml_bytes(zip_ref.read(name)).iter(f"{{{NS['a']}}}r"):
+                rpr = text_run.find('a:rPr', NS)
+                stop = rpr.find('a:gradFill/a:gsLst/a:gs/a:srgbClr', NS)
+                styles[text_run.findtext('a:t', namespaces=NS)] = (rpr.find('a:latin', NS).get('typeface'),
+                                                                   None if stop is None else stop.get('val'))
+    return styles
+
+
+def test_parse_roles():
+    assert parse_roles('标题, body，表格、unknown, title') == ['title', 'body', 'table']
+    assert parse_roles(['group', ' shape ']) == ['group', 'shape']
+    assert parse_roles(None) == []
+
+
+def test_roles_are_classified_per_shape():
+    deck = build_role_deck()
+    index = PPTProcessor(font_configs={}, font_aliases={}).build_run_index(deck)
+    roles = dict(zip(index.texts, index.role.tolist()))
+    assert roles == {
+        'Deck Title': ROLE_TITLE,
+        'Subtitle': ROLE_SUBTITLE,
+        'Agenda': ROLE_TITLE,
+        'Point': ROLE_BODY,
+        'Cell': ROLE_TABLE,
+        'Grouped': ROLE_GROUP | ROLE_SHAPE,
+        'Loose': ROLE_SHAPE,
+    }
+    assert index.role_counts() == {'title': 2, 'subtitle': 1, 'body': 1, 'placeholder': 0, 'table': 1, 'group': 1,
+                                   'shape': 2}
+    assert index.role_mask([]) is None
+    assert [text for text, hit in zip(index.texts, index.role_mask(['title', 'table'])) if hit] == \
+        ['Deck Title', 'Agenda', 'Cell']
+
+
+def test_role_conditions_on_font_rules_and_gradient_schemes():
+    deck = build_role_deck()
+    font_configs = {'tables': {'old_font': 'Sora', 'old_size': '24', 'new_font': 'Inter', 'latin': True,
+                               'roles': '表格, group'}}
+    gradient_configs = {
+        '24': {'gradient_config': RED, 'font_name': 'Sora'},
+        # 限定角色的方案优先于同字号的普通方案
+        '24 正文': {'gradient_config': GREEN, 'font_name': 'Sora', 'font_size': '24', 'roles': ['body', 'subtitle']},
+        '40': {'gradient_config': GREEN, 'font_name': 'Sora', 'roles': 'shape'},
+    }
+    processor = PPTProcessor(font_configs=font_configs, font_aliases={})
+    styles = run_styles(processor.process_bytes(deck, gradient_configs=gradient_configs))
+
+    assert styles == {
+        'Deck Title': ('Sora', None),
+        'Subtitle': ('Sora', '00FF00'),
+        'Agenda': ('Sora', None),
+        'Point': ('Sora', '00FF00'),
+        'Cell': ('Inter', None),
+        'Grouped': ('Inter', None),
+        'Loose': ('Sora', 'FF0000'),
+    }
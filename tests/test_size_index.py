@@ -0,0 +1,48 @@
+import random
+
+import pytest
+
+from modules.size_index import MAX_SZ, SIZE_TOLERANCE, SizeIntervalIndex, parse_size_spec
+
+
+@pytest.mark.parametrize('spec, interval', [
+    ('24', (2400, 2400)),
+    (24, (2400, 2400)),
+    ('10.5', (1050, 1050)),
+    ('28-44', (2800, 4400)),
+    ('28~44', (2800, 4400)),
+    (' 28 - 44 ', (2800, 4400)),
+    ('28-', (2800, MAX_SZ)),
+    ('-12', (1, 1200)),
+    ('44-28', None),
+    ('-', None),
+    ('abc', None),
+])
+def test_parse_size_spec(spec, interval):
+    assert parse_size_spec(spec) == interval
+
+
+def test_tolerance_matches_float_comparison():
+    # 放宽后的区间与原先 abs(old_size - size) < tolerance 的判断逐个一致
+    for spec in ('18', '10.5', '24.05', '0.1'):
+        low, high = parse_size_spec(spec, SIZE_TOLERANCE) or (1, 0)
+        for sz in range(1, 3000):
+            assert (low <= sz <= high) == (abs(float(spec) - sz / 100) < SIZE_TOLERANCE)
+
+
+def test_lookup_matches_linear_scan():
+    specs = ['24', '28-44', '-20', '40-', '30~32', None, 'bad', '24']
+    index = SizeIntervalIndex(specs)
+    assert len(index) == len(specs)
+
+    intervals = [parse_size_spec(spec) if spec is not None else None for spec in specs]
+    rng = random.Random(7)
+    for sz in [0, 1, 2000, 2001, 2400, 2800, 3000, 4400, 4401, MAX_SZ] + [rng.randint(0, MAX_SZ) for _ in range(500)]:
+        expected = tuple(rule_id for rule_id, interval in enumerate(intervals)
+                         if interval is not None and interval[0] <= sz <= interval[1])
+        assert index.lookup(sz) == expected
+
+
+def test_precedence_prefers_narrow_intervals_then_order():
+    index = SizeIntervalIndex(['28-44', '32', '30-34', 'bad', '24', '-'])
+    assert index.precedence() == [1, 4, 2, 0]
@@ -0,0 +1,44 @@
+import io
+import zipfile
+
+import numpy as np
+
+from conftest import build_deck
+from modules.ppt_processor import PPTProcessor
+from modules.transform_stages import STAGES, TransformStage, stage_tags
+
+A = '{http://schemas.openxmlformats.org/drawingml/2006/main}'
+
+
+class ShapeStage(TransformStage):
+    # 测试用阶段：声明形状树内外各一种元素，把矩形改成椭圆
+    name = 'shape'
+    tags = (A + 'prstGeom', A + 'masterClrMapping')
+
+    def run(self, index, context):
+        self.received = {tag: [(part_id, element.tag) for part_id, element in index.elements[tag]]
+                         for tag in self.tags}
+        for part_id, element in index.elements[A + 'prstGeom']:
+            element.set('prst', 'ellipse')
+            context['touched_parts'].add(part_id)
+        context['element_hits'][self.name] = len(index.elements[A + 'prstGeom'])
+        return np.zeros(len(index), dtype=bool)
+
+
+def test_declared_tags_are_collected_for_the_stage(tmp_path):
+    path = build_deck(tmp_path / 'deck.pptx', (('Sora', 32, 'Hello'), ('Arial', 18, 'World')))
+    processor = PPTProcessor(font_configs={}, font_aliases={})
+    stage = ShapeStage(processor)
+    processor.stages = [stage_class(processor) for stage_class in STAGES] + [stage]
+    assert stage_tags(processor.stages) == frozenset(ShapeStage.tags)
+
+    report = processor.dry_run(path, gradient_configs={})
+    # 形状树中的两个文本框和形状树以外的 clrMapOvr 都在建索引的那次遍历中收集
+    assert stage.received == {A + 'prstGeom': [(0, A + 'prstGeom')] * 2,
+                              A + 'masterClrMapping': [(0, A + 'masterClrMapping')]}
+    assert report['stages']['shape']['hits'] == 2
+    assert report['touched_parts'] == ['ppt/slides/slide1.xml']
+
+    result = processor.process_bytes(path, gradient_configs={})
+    with zipfile.ZipFile(io.BytesIO(result)) as zip_ref:
+        assert zip_ref.read('ppt/slides/slide1.xml').count(b'prst="ellipse"') == 2
@@ -2,3 +2,4 @@ from ui import main_window
 from ui import color_picker
 from ui import font_config
 from ui import gradient_extractor
+from ui import job_queue
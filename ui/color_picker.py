@@ -1,7 +1,8 @@
-import colorsys
+from functools import lru_cache
 
-from PySide6.QtCore import Qt, Signal
-from PySide6.QtGui import QPixmap, QPainter, QColor
+import numpy as np
+from PySide6.QtCore import Qt, Signal, QEvent
+from PySide6.QtGui import QPixmap, QImage
 from PySide6.QtWidgets import QApplication
 from PySide6.QtWidgets import QDialog, QVBoxLayout, QLabel
 
@@ -63,51 +64,84 @@ class ColorPicker(QDialog):
         QTimer.singleShot(1500, lambda: self.status_label.setText(f"已选择: {self.selected_color}"))
 
 
+PALETTE_WIDTH = 380
+PALETTE_HEIGHT = 300
+
+
+@lru_cache(maxsize=None)
+def palette_pixels(width: int, height: int) -> np.ndarray:
+    # 整张色板一次算完，浮点运算与 colorsys.hsv_to_rgb 逐项相同；width、height 为物理像素，
+    # 高分屏下按比例换算回逻辑坐标，结果在进程内缓存
+    x = np.arange(width) * (PALETTE_WIDTH / width)
+    y = np.arange(height) * (PALETTE_HEIGHT / height)
+    h = np.broadcast_to(x / float(PALETTE_WIDTH), (height, width))
+    s = np.broadcast_to(np.where(y < 150, y / 150.0, 1.0)[:, None], (height, width))
+    v = np.broadcast_to(np.where(y < 150, 1.0, 1.0 - ((y - 150) / 150.0))[:, None], (height, width))
+
+    i = (h * 6.0).astype(np.int64)
+    f = (h * 6.0) - i
+    p = v * (1.0 - s)
+    q = v * (1.0 - s * f)
+    t = v * (1.0 - s * (1.0 - f))
+    i = i % 6
+
+    r = np.choose(i, [v, q, p, p, t, v])
+    g = np.choose(i, [t, v, v, q, p, p])
+    b = np.choose(i, [p, p, t, v, v, q])
+
+    rgb = [(channel * 255).astype(np.uint32) for channel in (r, g, b)]
+    pixels = np.uint32(0xFF000000) | (rgb[0] << 16) | (rgb[1] << 8) | rgb[2]
+    pixels.setflags(write=False)
+    return pixels
+
+
+@lru_cache(maxsize=None)
+def palette_image(width: int, height: int) -> QImage:
+    pixels = palette_pixels(width, height)
+    return QImage(pixels.tobytes(), width, height, width * 4, QImage.Format_RGB32).copy()
+
+
 class ColorPalette(QLabel):
     color_changed = Signal(str)
     color_clicked = Signal(str)
 
     def __init__(self):
         super().__init__()
-        self.setFixedSize(380, 300)
+        self.setFixedSize(PALETTE_WIDTH, PALETTE_HEIGHT)
         self.setMouseTracking(True)
+        self.pixels = None
+        self.scale = 1.0
         self.create_palette()
 
     def create_palette(self):
-        pixmap = QPixmap(380, 300)
-        painter = QPainter(pixmap)
-
-        for x in range(380):
-            for y in range(300):
-                h = x / 380.0
-                s = y / 150.0 if y < 150 else 1.0
-                v = 1.0 if y < 150 else 1.0 - ((y - 150) / 150.0)
+        # 按屏幕缩放比例生成物理像素大小的色板，悬停取色读取同一份像素
+        self.scale = self.devicePixelRatioF()
+        width, height = round(PALETTE_WIDTH * self.scale), round(PALETTE_HEIGHT * self.scale)
+        self.pixels = palette_pixels(width, height)
 
-                r, g, b = colorsys.hsv_to_rgb(h, s, v)
-                color = QColor(int(r * 255), int(g * 255), int(b * 255))
-                painter.setPen(color)
-                painter.drawPoint(x, y)
-
-        painter.end()
+        pixmap = QPixmap.fromImage(palette_image(width, height))
+        pixmap.setDevicePixelRatio(self.scale)
         self.setPixmap(pixmap)
 
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.DevicePixelRatioChange and self.devicePixelRatioF() != self.scale:
+            self.create_palette()
+
     def mouseMoveEvent(self, event):
         x, y = event.position().x(), event.position().y()
-        if 0 <= x < 380 and 0 <= y < 300:
+        if 0 <= x < PALETTE_WIDTH and 0 <= y < PALETTE_HEIGHT:
             color = self.get_color_at_position(int(x), int(y))
             self.color_changed.emit(color)
 
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
             x, y = event.position().x(), event.position().y()
-            if 0 <= x < 380 and 0 <= y < 300:
+            if 0 <= x < PALETTE_WIDTH and 0 <= y < PALETTE_HEIGHT:
                 color = self.get_color_at_position(int(x), int(y))
                 self.color_clicked.emit(color)
 
     def get_color_at_position(self, x, y):
-        h = x / 380.0
-        s = y / 150.0 if y < 150 else 1.0
-        v = 1.0 if y < 150 else 1.0 - ((y - 150) / 150.0)
-
-        r, g, b = colorsys.hsv_to_rgb(h, s, v)
-        return f"#{int(r * 255):02X}{int(g * 255):02X}{int(b * 255):02X}"
+        height, width = self.pixels.shape
+        pixel = int(self.pixels[min(int(y * self.scale), height - 1), min(int(x * self.scale), width - 1)])
+        return f"#{pixel & 0xFFFFFF:06X}"
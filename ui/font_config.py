@@ -4,7 +4,11 @@ import os
 from PySide6.QtCore import Signal, Qt
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                                QLineEdit, QPushButton, QMessageBox,
-                               QFrame, QScrollArea, QWidget, QCheckBox)
+                               QFrame, QScrollArea, QWidget, QCheckBox, QComboBox)
+
+from modules.keyword_matcher import parse_keywords
+from modules.run_index import ROLE_LABELS, parse_roles
+from modules.size_index import parse_size_spec
 
 
 class FontConfigListDialog(QDialog):
@@ -77,6 +81,21 @@ class FontConfigListDialog(QDialog):
                         "border: none; margin-left: 10px; margin-top: 1px; margin-bottom: 1px;")
                     scheme_layout.addWidget(old_size_label)
 
+                keywords = parse_keywords(config_data.get('keywords'))
+                if keywords:
+                    keywords_label = QLabel(f"关键词：{'、'.join(keywords)}")
+                    keywords_label.setWordWrap(True)
+                    keywords_label.setStyleSheet(
+                        "border: none; margin-left: 10px; margin-top: 1px; margin-bottom: 1px;")
+                    scheme_layout.addWidget(keywords_label)
+
+                roles = parse_roles(config_data.get('roles'))
+                if roles:
+                    roles_label = QLabel(f"形状：{'、'.join(ROLE_LABELS[role] for role in roles)}")
+                    roles_label.setStyleSheet(
+                        "border: none; margin-left: 10px; margin-top: 1px; margin-bottom: 1px;")
+                    scheme_layout.addWidget(roles_label)
+
                 if config_data.get('new_font'):
                     new_font_label = QLabel(f"新字体：{config_data['new_font']}")
                     new_font_label.setStyleSheet(
@@ -126,8 +145,8 @@ class FontConfigListDialog(QDialog):
 
         for config_key, config_data in self.configs.items():
             content_height += 60
-            config_items = sum(1 for key in ['old_font', 'old_size', 'new_font', 'new_size', 'latin', 'ea', 'cs'] if
-                               config_data.get(key))
+            config_items = sum(1 for key in ['old_font', 'old_size', 'keywords', 'roles', 'new_font', 'new_size', 'latin',
+                                             'ea', 'cs'] if config_data.get(key))
             content_height += config_items * 12
 
         max_height = min(600, max(300, content_height))
@@ -212,7 +231,7 @@ class FontConfig(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("字体配置")
-        self.setFixedSize(400, 250)
+        self.setFixedSize(400, 290)
         self.setup_ui()
 
     def setup_ui(self):
@@ -230,7 +249,8 @@ class FontConfig(QDialog):
         old_layout.addWidget(old_font_label)
 
         self.old_font = QLineEdit()
-        self.old_font.setPlaceholderText("Arial（可空）")
+        self.old_font.setPlaceholderText("Arial、Sora*（可空）")
+        self.old_font.setToolTip("忽略大小写、空格和连字符差异；支持通配符 Sora*，以 re: 开头时按正则匹配")
         old_layout.addWidget(self.old_font)
 
         old_size_label = QLabel("字号:")
@@ -238,12 +258,37 @@ class FontConfig(QDialog):
         old_layout.addWidget(old_size_label)
 
         self.old_size = QLineEdit()
-        self.old_size.setPlaceholderText("12（可空）")
+        self.old_size.setPlaceholderText("12或28-44")
+        self.old_size.setToolTip("可填写单个字号，或用 28-44 表示 28 到 44 磅之间的所有字号（可空）")
         self.old_size.setFixedWidth(85)
         old_layout.addWidget(self.old_size)
 
         layout.addLayout(old_layout)
 
+        keywords_layout = QHBoxLayout()
+
+        keywords_label = QLabel("关键词:")
+        keywords_label.setStyleSheet("border: none;")
+        keywords_layout.addWidget(keywords_label)
+
+        self.keywords = QLineEdit()
+        self.keywords.setPlaceholderText("文本包含任一关键词时才替换，用逗号分隔（可空）")
+        keywords_layout.addWidget(self.keywords)
+
+        role_label = QLabel("形状:")
+        role_label.setStyleSheet("border: none;")
+        keywords_layout.addWidget(role_label)
+
+        self.role = QComboBox()
+        self.role.addItem("全部", None)
+        for role, label in ROLE_LABELS.items():
+            self.role.addItem(label, role)
+        self.role.setToolTip("只替换标题、正文等指定占位符，或表格、组合内的文本")
+        self.role.setFixedWidth(85)
+        keywords_layout.addWidget(self.role)
+
+        layout.addLayout(keywords_layout)
+
         new_group_label = QLabel("新字体配置:")
         new_group_label.setStyleSheet("font-weight: bold; border: none;")
         layout.addWidget(new_group_label)
@@ -302,6 +347,8 @@ class FontConfig(QDialog):
         old_size = self.old_size.text().strip()
         new_font = self.new_font.text().strip()
         new_size = self.new_size.text().strip()
+        keywords = parse_keywords(self.keywords.text())
+        roles = [self.role.currentData()] if self.role.currentData() else []
 
         if not any([old_font, old_size, new_font, new_size]):
             msg = QMessageBox(self)
@@ -333,11 +380,13 @@ class FontConfig(QDialog):
         for size_text, size_name in [(old_size, "原字号"), (new_size, "新字号")]:
             if size_text:
                 try:
+                    if size_name == "原字号" and parse_size_spec(size_text) is not None:
+                        continue
                     float(size_text)
                 except ValueError:
                     msg = QMessageBox(self)
                     msg.setWindowTitle("警告")
-                    msg.setText(f"{size_name}必须是数字")
+                    msg.setText(f"{size_name}必须是数字或字号区间" if size_name == "原字号" else f"{size_name}必须是数字")
                     msg.setStyleSheet("""
                         QMessageBox {
                             background-color: white;
@@ -358,6 +407,8 @@ class FontConfig(QDialog):
             'old_size': old_size if old_size else None,
             'new_font': new_font if new_font else None,
             'new_size': new_size if new_size else None,
+            'keywords': keywords,
+            'roles': roles,
             'latin': self.latin_check.isChecked(),
             'ea': self.ea_check.isChecked(),
             'cs': self.cs_check.isChecked()
@@ -368,6 +419,10 @@ class FontConfig(QDialog):
             config_parts.append(f"字体{old_font}")
         if old_size:
             config_parts.append(f"字号{old_size}")
+        if keywords:
+            config_parts.append(f"含{'、'.join(keywords[:3])}{'等' if len(keywords) > 3 else ''}")
+        if roles:
+            config_parts.append(ROLE_LABELS[roles[0]])
         if new_font:
             config_parts.append(f"改为{new_font}")
         if new_size:
@@ -407,6 +462,8 @@ class FontConfig(QDialog):
 
             self.old_font.clear()
             self.old_size.clear()
+            self.keywords.clear()
+            self.role.setCurrentIndex(0)
             self.new_font.clear()
             self.new_size.clear()
 
@@ -1,10 +1,120 @@
 import json
-
-from PySide6.QtCore import Qt, Signal, QPoint, QRect
-from PySide6.QtGui import QPixmap, QGuiApplication, QFontMetrics, QPainter, QPen, QCursor, QColor, QPainterPath
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PySide6.QtCore import (Qt, Signal, QPoint, QPointF, QRect, QRectF, QSize, QTimer, QObject, QRunnable,
+                            QThreadPool)
+from PySide6.QtGui import (QPixmap, QGuiApplication, QFontMetrics, QPainter, QPen, QCursor, QColor, QPainterPath,
+                           QImage, QImageReader, QIcon, QLinearGradient)
 from PySide6.QtWidgets import (QApplication, QAbstractSpinBox)
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, QLabel, QPushButton, QTextEdit, QSpinBox,
-                               QFileDialog, QMessageBox, QCheckBox)
+                               QFileDialog, QMessageBox, QCheckBox, QComboBox, QDialog, QLineEdit, QTableWidget,
+                               QTableWidgetItem, QHeaderView, QDoubleSpinBox)
+
+from modules.gradient_fit import band_color, detect_text, extract_gradient, kernel_color, simplify_gradient
+from modules.size_index import parse_size_spec
+
+# 缩略图逐级减半，直到长边不超过 MIP_MIN_SIZE；滚轮每格缩放 ZOOM_STEP 倍，最大放大到 MAX_ZOOM 倍
+MIP_MIN_SIZE = 256
+ZOOM_STEP = 1.25
+MAX_ZOOM = 32
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+def image_pixels(image):
+    # 把 32 位 QImage（RGB32 / ARGB32_Premultiplied）的像素缓冲区直接映射为 (高, 宽, 3) 的 RGB 数组视图，不复制像素；
+    # 数组引用 image 的内存，调用方需持有 image 直到数组用完。小端序下每个像素在内存中依次为 B、G、R、A
+    buffer = np.frombuffer(image.constBits(), dtype=np.uint8).reshape(image.height(), image.bytesPerLine() // 4, 4)
+    return buffer[:, :image.width(), 2::-1]
+
+
+def prepare_image(image):
+    # 绘制和取色都使用 32 位格式，其他格式先转换一次
+    if image.format() not in (QImage.Format_RGB32, QImage.Format_ARGB32_Premultiplied):
+        image = image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+    return image
+
+
+def extract_image_file(path, max_stops, tolerance, max_delta_e=0.0):
+    # 在批量提取的进程池中执行：解码一张截图并拟合渐变色标，max_delta_e 大于 0 时再合并相近色标。
+    # 子进程中没有 QGuiApplication，只用 QImageReader 解码，失败时带上读取器的错误信息
+    reader = QImageReader(path)
+    image = reader.read()
+    if image.isNull():
+        raise ValueError(f"无法加载图片: {reader.errorString()}")
+    image = prepare_image(image)
+    pixels = image_pixels(image)
+    background, foreground = detect_text(pixels)
+    return simplify_gradient(extract_gradient(pixels, foreground, max_stops, tolerance), max_delta_e)
+
+
+def parse_image_name(path, default_size='', default_font=''):
+    # 文件名以字号开头时按 "字号_字体" 或 "字号 字体" 读取，例如 32_Sora.png、28-44 思源黑体.jpg、24.png；
+    # 读不到的部分使用默认值
+    stem = os.path.splitext(os.path.basename(path))[0].strip()
+    parts = stem.replace('_', ' ', 1).split(None, 1)
+    if parts and parse_size_spec(parts[0]) is not None:
+        font = parts[1].strip() if len(parts) > 1 else ''
+        return parts[0], font or default_font
+    return default_size, default_font
+
+
+def merge_gradient_configs(entries, path='config.json'):
+    # 把方案合并到 config.json，同名方案被覆盖；返回 (新增数量, 更新数量)
+    configs = {}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            configs = json.load(f)
+
+    added = sum(1 for key in entries if key not in configs)
+    configs.update(entries)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(configs, f, ensure_ascii=False, indent=2)
+    return added, len(entries) - added
+
+
+class LoadedImage:
+    # 后台线程中准备好的图片：原图、逐级减半的缩略图、取色用的像素数组、背景色和文字像素掩码
+    def __init__(self, image):
+        image = prepare_image(image)
+        self.image = image
+        self.levels = [image]
+        while max(self.levels[-1].width(), self.levels[-1].height()) > MIP_MIN_SIZE:
+            level = self.levels[-1]
+            self.levels.append(level.scaled(max(1, level.width() // 2), max(1, level.height() // 2),
+                                            Qt.IgnoreAspectRatio, Qt.SmoothTransformation))
+        # 背景色取边框颜色直方图的众数，文字像素掩码供自动提取和文字像素取色共用
+        self.pixels = image_pixels(image)
+        self.background, self.foreground = detect_text(self.pixels)
+
+
+class ImageLoadSignals(QObject):
+    loaded = Signal(int, object)
+    failed = Signal(int, str)
+
+
+class ImageLoadJob(QRunnable):
+    # 解码和缩放都在线程池中完成，粘贴或打开大截图时界面不会卡住
+    def __init__(self, request_id, path=None, image=None):
+        super().__init__()
+        self.request_id = request_id
+        self.path = path
+        self.image = image
+        self.signals = ImageLoadSignals()
+        self.setAutoDelete(False)
+
+    def run(self):
+        try:
+            image = QImage(self.path) if self.path else self.image
+            if image is None or image.isNull():
+                self.signals.failed.emit(self.request_id, "无法加载图片")
+                return
+            self.signals.loaded.emit(self.request_id, LoadedImage(image))
+        except Exception as e:
+            self.signals.failed.emit(self.request_id, f"加载图片失败: {str(e)}")
 
 
 class ClickableImageLabel(QLabel):
@@ -16,142 +126,242 @@ class ClickableImageLabel(QLabel):
         self.picking_mode = False
         self.mouse_pos = None
         self.background_color = QColor(255, 255, 255)
+        self.source = None
+        self.image = None
+        self.pixels = None
+        self.sample_radius = 2
+        self.sample_method = 'mean'
+        # 视图变换：原图像素 (x, y) 显示在 origin + (x, y) * zoom；fitted 为 True 时随窗口大小自动适应
+        self.zoom = 1.0
+        self.origin = QPointF(0, 0)
+        self.fitted = True
+        self.pan_start = None
+        self.pan_origin = None
+        self.overlay = None
+        self.pending_mouse_pos = None
         self.setMouseTracking(True)
 
-    def set_picking_mode(self, enabled):
-        self.picking_mode = enabled
-        if enabled:
-            self.setCursor(QCursor(Qt.CrossCursor))
+        # 鼠标移动事件合并到每帧最多重绘一次
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setSingleShot(True)
+        self.frame_timer.setInterval(16)
+        self.frame_timer.timeout.connect(self.flush_mouse_move)
+
+    def set_source(self, source):
+        # 显示和取色都使用原图，不再预先缩放
+        self.source = source
+        self.image = source.image if source is not None else None
+        self.pixels = source.pixels if source is not None else None
+        self.mouse_pos = None
+        self.fit_to_view()
+
+    def fit_zoom(self):
+        rect = self.contentsRect()
+        return min(rect.width() / self.image.width(), rect.height() / self.image.height(), 1.0)
+
+    def fit_to_view(self):
+        # 整张图居中显示，最多显示原始大小
+        self.fitted = True
+        if self.image is not None:
+            rect = self.contentsRect()
+            self.zoom = self.fit_zoom()
+            self.origin = QPointF(rect.x() + (rect.width() - self.image.width() * self.zoom) / 2,
+                                  rect.y() + (rect.height() - self.image.height() * self.zoom) / 2)
+        self.invalidate_overlay()
+
+    def set_view(self, zoom, origin):
+        self.zoom = zoom
+        self.origin = origin
+        self.fitted = False
+        self.invalidate_overlay()
+
+    def view_to_source(self, pos):
+        return (pos.x() - self.origin.x()) / self.zoom, (pos.y() - self.origin.y()) / self.zoom
+
+    def source_pixel(self, pos):
+        # 视图坐标对应的原图像素，不在图片上时返回 None
+        x, y = self.view_to_source(pos)
+        if 0 <= x < self.image.width() and 0 <= y < self.image.height():
+            return int(x), int(y)
+        return None
+
+    def image_rect(self):
+        return QRectF(self.origin.x(), self.origin.y(), self.image.width() * self.zoom,
+                      self.image.height() * self.zoom)
+
+    def invalidate_overlay(self):
+        # 预览线位置、缩放平移或主题变化后重建虚线图层
+        self.overlay = None
+        self.update()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.fitted:
+            self.fit_to_view()
         else:
-            self.setCursor(QCursor(Qt.ArrowCursor))
+            self.overlay = None
 
-    def calculate_background_color(self, pixmap):
-        if not pixmap or pixmap.isNull():
-            return QColor(255, 255, 255)
+    def magnifier_region(self, pos):
+        # 放大镜圆圈（含描边）和下方颜色指示块所占的区域
+        magnifier_radius = 40
+        return QRect(pos.x() - magnifier_radius - 2, pos.y() - magnifier_radius - 2,
+                     magnifier_radius * 2 + 4, magnifier_radius * 2 + 30)
 
-        image = pixmap.toImage()
-        width = image.width()
-        height = image.height()
+    def build_overlay(self):
+        dpr = self.devicePixelRatioF()
+        overlay = QPixmap(self.size() * dpr)
+        overlay.setDevicePixelRatio(dpr)
+        overlay.fill(Qt.transparent)
 
-        colors = []
-        corners = [
-            (0, 0),
-            (width - 1, 0),
-            (0, height - 1),
-            (width - 1, height - 1)
-        ]
+        if self.image is not None:
+            painter = QPainter(overlay)
 
-        for x, y in corners:
-            color = image.pixelColor(x, y)
-            colors.append((color.red(), color.green(), color.blue()))
+            pen = QPen()
+            pen.setStyle(Qt.DashLine)
+            pen.setWidth(2)
 
-        avg_r = sum(c[0] for c in colors) // len(colors)
-        avg_g = sum(c[1] for c in colors) // len(colors)
-        avg_b = sum(c[2] for c in colors) // len(colors)
+            if self.parent_widget.is_dark_mode:
+                pen.setColor(QColor(255, 255, 0, 200))
+            else:
+                pen.setColor(QColor(255, 0, 0, 200))
+
+            painter.setPen(pen)
 
-        return QColor(avg_r, avg_g, avg_b)
+            image_rect = self.image_rect()
+            for line_pos in self.parent_widget.preview_lines:
+                relative_pos = line_pos / 100000.0
+                x = image_rect.x() + relative_pos * image_rect.width()
 
-    def get_color_at_position(self, img_x, img_y, pixmap):
-        if not pixmap or pixmap.isNull():
-            return self.background_color
+                painter.drawLine(QPointF(x, image_rect.top() - 15), QPointF(x, image_rect.bottom() + 15))
+
+            painter.end()
+
+        return overlay
+
+    def set_picking_mode(self, enabled):
+        self.picking_mode = enabled
+        if enabled:
+            self.setCursor(QCursor(Qt.CrossCursor))
+        else:
+            self.setCursor(QCursor(Qt.ArrowCursor))
 
-        image = pixmap.toImage()
-        width = image.width()
-        height = image.height()
+    def get_color_at_position(self, img_x, img_y):
+        if self.pixels is None:
+            return self.background_color
 
+        height, width = self.pixels.shape[:2]
         if 0 <= img_x < width and 0 <= img_y < height:
-            return image.pixelColor(img_x, img_y)
+            return QColor(*kernel_color(self.pixels, img_x, img_y, self.sample_radius, self.sample_method))
         else:
             return self.background_color
 
-    def mouseMoveEvent(self, event):
-        self.mouse_pos = event.pos()
-        self.update()
-        super().mouseMoveEvent(event)
+    def wheelEvent(self, event):
+        if self.image is None:
+            super().wheelEvent(event)
+            return
 
-    def mousePressEvent(self, event):
-        if self.picking_mode and event.button() == Qt.LeftButton:
-            click_pos = event.pos()
+        # 以鼠标所在的原图位置为中心缩放，最小为适应窗口的大小
+        pos = event.position()
+        steps = event.angleDelta().y() / 120
+        zoom = min(max(self.zoom * ZOOM_STEP ** steps, self.fit_zoom()), MAX_ZOOM)
+        x, y = self.view_to_source(pos)
+        self.set_view(zoom, QPointF(pos.x() - x * zoom, pos.y() - y * zoom))
+        event.accept()
 
-            if self.pixmap() and not self.pixmap().isNull():
-                pixmap = self.pixmap()
-                label_size = self.size()
+    def mouseMoveEvent(self, event):
+        if self.pan_start is not None:
+            self.set_view(self.zoom, self.pan_origin + event.position() - self.pan_start)
+        self.pending_mouse_pos = event.pos()
+        if not self.frame_timer.isActive():
+            self.frame_timer.start()
+        super().mouseMoveEvent(event)
 
-                pixmap_size = pixmap.size()
+    def flush_mouse_move(self):
+        # 只重绘放大镜原来和现在所在的区域
+        if self.pending_mouse_pos is None:
+            return
+        if self.mouse_pos is not None:
+            self.update(self.magnifier_region(self.mouse_pos))
+        self.mouse_pos = self.pending_mouse_pos
+        self.pending_mouse_pos = None
+        self.update(self.magnifier_region(self.mouse_pos))
 
-                x_offset = (label_size.width() - pixmap_size.width()) // 2
-                y_offset = (label_size.height() - pixmap_size.height()) // 2
+    def mousePressEvent(self, event):
+        if self.image is not None:
+            if self.picking_mode and event.button() == Qt.LeftButton:
+                pixel = self.source_pixel(event.position())
+                if pixel is not None:
+                    color = self.get_color_at_position(*pixel)
+                    self.color_picked.emit(color, QPoint(*pixel))
+            else:
+                # 取色时用中键或右键拖动平移，其他时候任意按键均可
+                self.pan_start = event.position()
+                self.pan_origin = QPointF(self.origin)
+                self.setCursor(QCursor(Qt.ClosedHandCursor))
 
-                if (x_offset <= click_pos.x() <= x_offset + pixmap_size.width() and
-                        y_offset <= click_pos.y() <= y_offset + pixmap_size.height()):
-                    img_x = int(click_pos.x() - x_offset)
-                    img_y = int(click_pos.y() - y_offset)
+        super().mousePressEvent(event)
 
-                    img_x = max(0, min(img_x, pixmap_size.width() - 1))
-                    img_y = max(0, min(img_y, pixmap_size.height() - 1))
+    def mouseReleaseEvent(self, event):
+        if self.pan_start is not None:
+            self.pan_start = None
+            self.set_picking_mode(self.picking_mode)
+        super().mouseReleaseEvent(event)
 
-                    image = pixmap.toImage()
-                    color = image.pixelColor(img_x, img_y)
+    def mouseDoubleClickEvent(self, event):
+        if self.image is not None and not self.picking_mode:
+            self.fit_to_view()
+            return
+        super().mouseDoubleClickEvent(event)
 
-                    self.color_picked.emit(color, QPoint(img_x, img_y))
+    def draw_image(self, painter):
+        # 只绘制窗口内可见的部分：缩小显示时从尺寸不小于显示大小的最小一级缩略图取像素，
+        # 放大显示时按最近邻绘制原图像素，便于对准单个像素
+        visible = self.image_rect().intersected(QRectF(self.rect()))
+        if visible.isEmpty():
+            return
 
-        super().mousePressEvent(event)
+        level = self.source.levels[0]
+        for candidate in self.source.levels[1:]:
+            if candidate.width() / self.image.width() < self.zoom:
+                break
+            level = candidate
+        scale_x = level.width() / self.image.width()
+        scale_y = level.height() / self.image.height()
+
+        source_rect = QRectF((visible.x() - self.origin.x()) / self.zoom * scale_x,
+                             (visible.y() - self.origin.y()) / self.zoom * scale_y,
+                             visible.width() / self.zoom * scale_x,
+                             visible.height() / self.zoom * scale_y)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform, self.zoom < 1)
+        painter.drawImage(visible, level, source_rect)
 
     def paintEvent(self, event):
         super().paintEvent(event)
 
-        if self.parent_widget and hasattr(self.parent_widget, 'preview_lines'):
+        if self.image is not None:
             painter = QPainter(self)
+            self.draw_image(painter)
+            painter.end()
 
-            pen = QPen()
-            pen.setStyle(Qt.DashLine)
-            pen.setWidth(2)
-
-            if self.parent_widget.is_dark_mode:
-                pen.setColor(QColor(255, 255, 0, 200))
-            else:
-                pen.setColor(QColor(255, 0, 0, 200))
-
-            painter.setPen(pen)
-
-            if self.pixmap() and not self.pixmap().isNull():
-                pixmap = self.pixmap()
-                label_size = self.size()
-
-                pixmap_size = pixmap.size()
-
-                x_offset = (label_size.width() - pixmap_size.width()) // 2
-                y_offset = (label_size.height() - pixmap_size.height()) // 2
-
-                for line_pos in self.parent_widget.preview_lines:
-                    relative_pos = line_pos / 100000.0
-                    x = x_offset + relative_pos * pixmap_size.width()
-
-                    painter.drawLine(x, y_offset - 15, x, y_offset + pixmap_size.height() + 15)
-
-                painter.end()
-
-        if self.mouse_pos and self.pixmap() and not self.pixmap().isNull():
+        if self.parent_widget and hasattr(self.parent_widget, 'preview_lines'):
+            if self.overlay is None:
+                self.overlay = self.build_overlay()
+            # 绘制区域已裁剪到需要重绘的部分，这里只复制对应的像素
             painter = QPainter(self)
-            painter.setRenderHint(QPainter.Antialiasing)
+            painter.drawPixmap(0, 0, self.overlay)
+            painter.end()
 
-            pixmap = self.pixmap()
-            label_size = self.size()
-            pixmap_size = pixmap.size()
-            ps_w = pixmap_size.width()
-            ps_h = pixmap_size.height()
+        if self.mouse_pos and self.image is not None:
+            pixel = self.source_pixel(self.mouse_pos)
+            if pixel is not None:
+                painter = QPainter(self)
+                painter.setRenderHint(QPainter.Antialiasing)
 
-            x_offset = (label_size.width() - ps_w) // 2
-            y_offset = (label_size.height() - ps_h) // 2
+                img_x, img_y = pixel
+                source_x, source_y = self.view_to_source(self.mouse_pos)
+                mouse_x, mouse_y = self.mouse_pos.x(), self.mouse_pos.y()
 
-            mouse_x, mouse_y = self.mouse_pos.x(), self.mouse_pos.y()
-            if (x_offset <= mouse_x <= x_offset + ps_w and
-                    y_offset <= mouse_y <= y_offset + ps_h):
-
-                img_x = mouse_x - x_offset
-                img_y = mouse_y - y_offset
-
-                current_color = self.get_color_at_position(img_x, img_y, pixmap)
+                current_color = self.get_color_at_position(img_x, img_y)
 
                 magnifier_radius = 40
                 magnifier_center = QPoint(mouse_x, mouse_y)
@@ -166,28 +376,24 @@ class ClickableImageLabel(QLabel):
                 path.addEllipse(magnifier_rect)
                 painter.setClipPath(path)
 
-                zoom_factor = 2
-                zoom_size = magnifier_radius // zoom_factor
+                # 放大镜显示原图像素，倍率为当前缩放的 2 倍，且至少为 2 倍
+                zoom_factor = max(2.0, self.zoom * 2)
+                zoom_size = magnifier_radius / zoom_factor
 
+                # 放大区域超出图片的部分显示背景色，图片内的部分一次按最近邻缩放绘制
                 magnifier_pixmap = QPixmap(magnifier_radius * 2, magnifier_radius * 2)
                 magnifier_pixmap.fill(self.background_color)
-                magnifier_painter = QPainter(magnifier_pixmap)
-
-                src_left = img_x - zoom_size
-                src_top = img_y - zoom_size
-                src_right = img_x + zoom_size
-                src_bottom = img_y + zoom_size
-
-                for y in range(magnifier_radius * 2):
-                    for x in range(magnifier_radius * 2):
-                        orig_x = src_left + (x * 2 * zoom_size) // (magnifier_radius * 2)
-                        orig_y = src_top + (y * 2 * zoom_size) // (magnifier_radius * 2)
-
-                        color = self.get_color_at_position(orig_x, orig_y, pixmap)
-                        magnifier_painter.setPen(QPen(color))
-                        magnifier_painter.drawPoint(x, y)
-
-                magnifier_painter.end()
+                source_rect = QRectF(source_x - zoom_size, source_y - zoom_size, zoom_size * 2, zoom_size * 2)
+                visible_rect = source_rect.intersected(QRectF(self.image.rect()))
+                if not visible_rect.isEmpty():
+                    magnifier_painter = QPainter(magnifier_pixmap)
+                    magnifier_painter.drawImage(
+                        QRectF((visible_rect.x() - source_rect.x()) * zoom_factor,
+                               (visible_rect.y() - source_rect.y()) * zoom_factor,
+                               visible_rect.width() * zoom_factor,
+                               visible_rect.height() * zoom_factor),
+                        self.image, visible_rect)
+                    magnifier_painter.end()
 
                 painter.drawPixmap(magnifier_rect, magnifier_pixmap)
 
@@ -201,6 +407,12 @@ class ClickableImageLabel(QLabel):
                 painter.drawLine(center_x - 5, center_y, center_x + 5, center_y)
                 painter.drawLine(center_x, center_y - 5, center_x, center_y + 5)
 
+                if self.sample_radius > 0:
+                    # 标出取色窗口的范围
+                    kernel_size = min(int((self.sample_radius * 2 + 1) * zoom_factor), magnifier_radius * 2)
+                    painter.setPen(QPen(Qt.red, 1, Qt.DashLine))
+                    painter.drawRect(center_x - kernel_size // 2, center_y - kernel_size // 2, kernel_size, kernel_size)
+
                 color_indicator_size = 20
                 color_indicator_rect = QRect(
                     magnifier_center.x() - color_indicator_size // 2,
@@ -215,6 +427,166 @@ class ClickableImageLabel(QLabel):
                 painter.end()
 
 
+class BatchSignals(QObject):
+    extracted = Signal(int, object, str)
+
+
+class BatchExtractDialog(QDialog):
+    # 批量提取：进程池中逐张拟合渐变，字号和字体默认从文件名读取，可在表格中修改后一次合并到 config.json
+    def __init__(self, folder, max_stops, tolerance, max_delta_e=0.0, default_size='', default_font='', parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("批量提取渐变")
+        self.resize(760, 520)
+        self.paths = [os.path.join(folder, name) for name in sorted(os.listdir(folder))
+                      if name.lower().endswith(IMAGE_EXTENSIONS)]
+        self.results = [None] * len(self.paths)
+        self.done_count = 0
+        self.closed = False
+        self.signals = BatchSignals()
+        self.signals.extracted.connect(self.on_extracted)
+
+        layout = QVBoxLayout(self)
+
+        self.progress_label = QLabel(f"正在提取 0/{len(self.paths)}")
+        self.progress_label.setStyleSheet("border: none;")
+        layout.addWidget(self.progress_label)
+
+        self.table = QTableWidget(len(self.paths), 5)
+        self.table.setHorizontalHeaderLabels(["文件", "字号", "字体", "渐变", "状态"])
+        self.table.verticalHeader().setVisible(False)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.Stretch)
+        for column in (1, 2, 4):
+            header.setSectionResizeMode(column, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(3, QHeaderView.Fixed)
+        self.table.setColumnWidth(3, 160)
+        self.table.setIconSize(QSize(148, 16))
+
+        for row, path in enumerate(self.paths):
+            font_size, font_name = parse_image_name(path, default_size, default_font)
+            name_item = QTableWidgetItem(os.path.basename(path))
+            name_item.setToolTip(path)
+            gradient_item = QTableWidgetItem("")
+            status_item = QTableWidgetItem("排队中")
+            for item in (name_item, gradient_item, status_item):
+                item.setFlags(item.flags() & ~Qt.ItemIsEditable)
+            self.table.setItem(row, 0, name_item)
+            self.table.setItem(row, 1, QTableWidgetItem(font_size))
+            self.table.setItem(row, 2, QTableWidgetItem(font_name))
+            self.table.setItem(row, 3, gradient_item)
+            self.table.setItem(row, 4, status_item)
+        layout.addWidget(self.table)
+
+        hint = QLabel("字号、字体可双击修改；文件名写成 \"32_Sora.png\" 时自动读取")
+        hint.setStyleSheet("border: none; color: #888;")
+        layout.addWidget(hint)
+
+        btn_layout = QHBoxLayout()
+        self.merge_btn = QPushButton("合并到 config.json")
+        self.merge_btn.setEnabled(False)
+        self.merge_btn.clicked.connect(self.merge_results)
+        close_btn = QPushButton("关闭")
+        close_btn.clicked.connect(self.reject)
+        btn_layout.addStretch()
+        btn_layout.addWidget(self.merge_btn)
+        btn_layout.addWidget(close_btn)
+        layout.addLayout(btn_layout)
+
+        # 子进程用 spawn 方式启动，不继承界面进程的 Qt 状态
+        self.executor = ProcessPoolExecutor(max_workers=max(1, min(len(self.paths), os.cpu_count() or 1)),
+                                            mp_context=multiprocessing.get_context('spawn'))
+        for row, path in enumerate(self.paths):
+            future = self.executor.submit(extract_image_file, path, max_stops, tolerance, max_delta_e)
+            future.add_done_callback(lambda finished, row=row: self.report(row, finished))
+
+    def report(self, row, future):
+        # 在进程池的回调线程中执行，通过信号转到界面线程更新表格；对话框关闭后仍在运行的任务不再回报
+        if self.closed or future.cancelled():
+            return
+        error = future.exception()
+        self.signals.extracted.emit(row, None if error else future.result(), str(error) if error else "")
+
+    def on_extracted(self, row, gradient_config, error):
+        if self.closed:
+            return
+        self.results[row] = gradient_config
+        gradient_item = self.table.item(row, 3)
+        status_item = self.table.item(row, 4)
+        if error:
+            status_item.setText(f"失败: {error}")
+        elif not gradient_config:
+            status_item.setText("未识别到文字")
+        else:
+            swatch = QPixmap(self.table.iconSize())
+            gradient = QLinearGradient(0, 0, swatch.width(), 0)
+            for stop in gradient_config:
+                gradient.setColorAt(stop['position'] / 100000, QColor(stop['color']))
+            painter = QPainter(swatch)
+            painter.fillRect(swatch.rect(), gradient)
+            painter.end()
+            gradient_item.setIcon(QIcon(swatch))
+            gradient_item.setToolTip(json.dumps(gradient_config, indent=2, ensure_ascii=False))
+            status_item.setText(f"{len(gradient_config)} 个色标")
+
+        self.done_count += 1
+        self.progress_label.setText(f"正在提取 {self.done_count}/{len(self.paths)}")
+        if self.done_count == len(self.paths):
+            self.progress_label.setText(f"已完成 {len(self.paths)} 张图片")
+            self.merge_btn.setEnabled(True)
+
+    def merge_results(self):
+        rows = []
+        for row, gradient_config in enumerate(self.results):
+            font_size = self.table.item(row, 1).text().strip()
+            font_name = self.table.item(row, 2).text().strip()
+            if gradient_config and font_name and parse_size_spec(font_size) is not None:
+                rows.append((font_size, font_name, gradient_config))
+        skipped = len(self.results) - len(rows)
+
+        if not rows:
+            msg_box = QMessageBox(QMessageBox.Warning, "警告", "没有可合并的方案，请检查字号和字体", parent=self)
+            msg_box.setStyleSheet("QMessageBox { border: none; } QMessageBox QLabel { border: none; }")
+            msg_box.exec_()
+            return
+
+        # 同一字号只有一种字体时按字号保存；同字号对应多种字体时按 "字号 字体" 分别保存，
+        # 同一字号和字体的多张图片保留最后一张
+        fonts_by_size = {}
+        for font_size, font_name, _ in rows:
+            fonts_by_size.setdefault(font_size, set()).add(font_name)
+        entries = {}
+        for font_size, font_name, gradient_config in rows:
+            entry = {'gradient_config': gradient_config, 'font_name': font_name}
+            config_key = font_size
+            if len(fonts_by_size[font_size]) > 1:
+                config_key = f"{font_size} {font_name}"
+                entry['font_size'] = font_size
+            entries[config_key] = entry
+
+        try:
+            added, updated = merge_gradient_configs(entries)
+        except Exception as e:
+            msg_box = QMessageBox(QMessageBox.Critical, "错误", f"合并配置失败: {str(e)}", parent=self)
+            msg_box.setStyleSheet("QMessageBox { border: none; } QMessageBox QLabel { border: none; }")
+            msg_box.exec_()
+            return
+
+        message = f"已合并到 config.json：新增 {added} 个方案，更新 {updated} 个方案"
+        if skipped:
+            message += f"，跳过 {skipped} 张（提取失败或缺少字号、字体）"
+        msg_box = QMessageBox(QMessageBox.Information, "成功", message, parent=self)
+        msg_box.setStyleSheet("QMessageBox { border: none; } QMessageBox QLabel { border: none; }")
+        msg_box.exec_()
+
+    def done(self, result):
+        # 关闭前断开信号，已在排队的回报也由 closed 标记拦下
+        if not self.closed:
+            self.closed = True
+            self.signals.extracted.disconnect(self.on_extracted)
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        super().done(result)
+
+
 class GradientExtractor(QWidget):
 
     def __init__(self, parent=None, is_dark_mode=False):
@@ -226,6 +598,12 @@ class GradientExtractor(QWidget):
         self.current_pick_index = 0
         self.picked_colors = []
         self.active_positions = []
+        self.pixels = None
+        self.foreground = None
+        self.load_pool = QThreadPool(self)
+        self.load_pool.setMaxThreadCount(1)
+        self.load_request = 0
+        self.load_job = None
         self.init_ui()
         self.apply_theme(is_dark_mode)
 
@@ -249,9 +627,13 @@ class GradientExtractor(QWidget):
         self.upload_btn.setMinimumHeight(30)
         self.paste_btn.clicked.connect(self.paste_from_clipboard)
         self.upload_btn.clicked.connect(self.upload_image)
+        self.batch_btn = QPushButton("批量提取文件夹")
+        self.batch_btn.setMinimumHeight(30)
+        self.batch_btn.clicked.connect(self.batch_extract)
 
         input_layout.addWidget(self.paste_btn)
         input_layout.addWidget(self.upload_btn)
+        input_layout.addWidget(self.batch_btn)
         input_group.setLayout(input_layout)
 
         preview_group = QGroupBox("预览")
@@ -377,10 +759,67 @@ class GradientExtractor(QWidget):
         text_width = fm.horizontalAdvance(self.extract_btn.text())
         self.extract_btn.setFixedWidth(text_width + 20)
 
+        self.text_pixels_checkbox = QCheckBox("仅取文字像素")
+        self.text_pixels_checkbox.setChecked(True)
+        self.text_pixels_checkbox.setToolTip("取点击位置附近竖条内文字像素的平均颜色，排除背景和抗锯齿边缘")
+
+        # 不取文字像素时按窗口取色：半径 r 表示 (2r+1)×(2r+1) 的窗口，0 为单个像素
+        radius_label = QLabel("取色半径")
+        radius_label.setStyleSheet("border: none;")
+        self.radius_input = QSpinBox()
+        self.radius_input.setRange(0, 15)
+        self.radius_input.setValue(self.image_label.sample_radius)
+        self.radius_input.setFixedWidth(60)
+        self.radius_input.setToolTip("取点击位置周围 (2×半径+1) 见方窗口的颜色，0 为单个像素")
+        self.radius_input.valueChanged.connect(self.update_sampler)
+
+        self.sample_method_combo = QComboBox()
+        self.sample_method_combo.addItem("平均值", "mean")
+        self.sample_method_combo.addItem("中位数", "median")
+        self.sample_method_combo.currentIndexChanged.connect(self.update_sampler)
+
         btn_layout = QHBoxLayout()
-        btn_layout.addWidget(self.extract_btn, alignment=Qt.AlignHCenter)
+        btn_layout.addStretch()
+        btn_layout.addWidget(self.extract_btn)
+        btn_layout.addWidget(self.text_pixels_checkbox)
+        btn_layout.addWidget(radius_label)
+        btn_layout.addWidget(self.radius_input)
+        btn_layout.addWidget(self.sample_method_combo)
+        btn_layout.addStretch()
         coord_layout.addLayout(btn_layout)
 
+        # 自动提取：一次扫描文字像素的水平颜色分布，按最多色标数和容差拟合分段线性渐变
+        auto_layout = QHBoxLayout()
+        auto_layout.setSpacing(8)
+        auto_layout.addStretch()
+
+        max_stops_label = QLabel("最多色标")
+        max_stops_label.setStyleSheet("border: none;")
+        self.max_stops_input = QSpinBox()
+        self.max_stops_input.setRange(2, 10)
+        self.max_stops_input.setValue(4)
+        self.max_stops_input.setFixedWidth(60)
+
+        tolerance_label = QLabel("容差")
+        tolerance_label.setStyleSheet("border: none;")
+        self.tolerance_input = QSpinBox()
+        self.tolerance_input.setRange(1, 64)
+        self.tolerance_input.setValue(8)
+        self.tolerance_input.setFixedWidth(60)
+        self.tolerance_input.setToolTip("拟合结果与截图颜色允许的最大 RGB 距离，越小色标越多")
+
+        self.auto_extract_btn = QPushButton("自动提取")
+        self.auto_extract_btn.clicked.connect(self.auto_extract_gradient)
+        self.auto_extract_btn.setEnabled(False)
+
+        auto_layout.addWidget(max_stops_label)
+        auto_layout.addWidget(self.max_stops_input)
+        auto_layout.addWidget(tolerance_label)
+        auto_layout.addWidget(self.tolerance_input)
+        auto_layout.addWidget(self.auto_extract_btn)
+        auto_layout.addStretch()
+        coord_layout.addLayout(auto_layout)
+
         coord_group.setLayout(coord_layout)
 
         result_group = QGroupBox("JSON结果")
@@ -392,12 +831,52 @@ class GradientExtractor(QWidget):
         result_layout.setContentsMargins(15, 20, 15, 15)
         result_layout.setSpacing(10)
 
+        # 生成的 JSON 以字号为键，默认取主界面当前填写的字号和字体
+        target_layout = QHBoxLayout()
+        font_size_label = QLabel("字号")
+        font_size_label.setStyleSheet("border: none;")
+        self.font_size_edit = QLineEdit()
+        self.font_size_edit.setPlaceholderText("如 24 或 28-44")
+        font_name_label = QLabel("字体")
+        font_name_label.setStyleSheet("border: none;")
+        self.font_name_edit = QLineEdit()
+        self.font_name_edit.setPlaceholderText("试试填：Sora")
+        parent = self.parent()
+        if hasattr(parent, 'font_size_combo'):
+            self.font_size_edit.setText(parent.font_size_combo.currentText().strip())
+        if hasattr(parent, 'font_name_edit'):
+            self.font_name_edit.setText(parent.font_name_edit.text().strip())
+        self.font_size_edit.textChanged.connect(self.refresh_json_result)
+        self.font_name_edit.textChanged.connect(self.refresh_json_result)
+        target_layout.addWidget(font_size_label)
+        target_layout.addWidget(self.font_size_edit)
+        target_layout.addWidget(font_name_label)
+        target_layout.addWidget(self.font_name_edit)
+
+        # 输出前合并插值后与原颜色色差不超过 ΔE 的色标，预览效果不变，生成的 XML 更短
+        self.simplify_checkbox = QCheckBox("合并相近色标")
+        self.simplify_checkbox.setChecked(True)
+        self.simplify_checkbox.setToolTip("去掉与相邻色标插值结果几乎相同的色标（CIELAB 色差不超过 ΔE）")
+        self.delta_e_input = QDoubleSpinBox()
+        self.delta_e_input.setRange(0.1, 10.0)
+        self.delta_e_input.setSingleStep(0.5)
+        self.delta_e_input.setDecimals(1)
+        self.delta_e_input.setValue(1.0)
+        self.delta_e_input.setPrefix("ΔE ")
+        self.delta_e_input.setFixedWidth(80)
+        self.simplify_checkbox.toggled.connect(self.delta_e_input.setEnabled)
+        self.simplify_checkbox.toggled.connect(self.refresh_json_result)
+        self.delta_e_input.valueChanged.connect(self.refresh_json_result)
+        target_layout.addWidget(self.simplify_checkbox)
+        target_layout.addWidget(self.delta_e_input)
+
         self.result_text = QTextEdit()
         self.result_text.setMaximumHeight(150)
 
         self.copy_btn = QPushButton("复制JSON")
         self.copy_btn.clicked.connect(self.copy_json)
 
+        result_layout.addLayout(target_layout)
         result_layout.addWidget(self.result_text)
         result_layout.addWidget(self.copy_btn, alignment=Qt.AlignHCenter)
         result_group.setLayout(result_layout)
@@ -418,6 +897,7 @@ class GradientExtractor(QWidget):
 
     def apply_theme(self, is_dark_mode):
         self.is_dark_mode = is_dark_mode
+        self.image_label.invalidate_overlay()
         if is_dark_mode:
             self.setStyleSheet("""
                 QWidget { background-color: #333; color: #fff; }
@@ -446,12 +926,12 @@ class GradientExtractor(QWidget):
                     background-color: #444; 
                     color: #888;
                 }
-                QTextEdit, QSpinBox { 
+                QTextEdit, QSpinBox, QDoubleSpinBox, QComboBox, QLineEdit, QTableWidget { 
                     background-color: #444; 
                     color: white; 
                     border: 1px solid #666;
                 }
-                QSpinBox:disabled {
+                QSpinBox:disabled, QDoubleSpinBox:disabled {
                     background-color: #333;
                     color: #888;
                 }
@@ -477,7 +957,7 @@ class GradientExtractor(QWidget):
                     border: 2px solid #0078d4;
                 }
             """)
-            if self.image_label.pixmap() is None or self.image_label.pixmap().isNull():
+            if self.image_label.image is None:
                 self.image_label.setStyleSheet(
                     "border: 2px dashed #666; padding: 20px; color: #ccc; background-color: #444;")
         else:
@@ -500,17 +980,15 @@ class GradientExtractor(QWidget):
                     border: 2px solid #0078d4;
                 }
             """)
-            if self.image_label.pixmap() is None or self.image_label.pixmap().isNull():
+            if self.image_label.image is None:
                 self.image_label.setStyleSheet("border: 2px dashed #ccc; padding: 20px;")
 
     def paste_from_clipboard(self):
         clipboard = QApplication.clipboard()
-        pixmap = clipboard.pixmap()
+        image = clipboard.image()
 
-        if not pixmap.isNull():
-            self.current_image = pixmap
-            self.display_image(pixmap)
-            self.extract_btn.setEnabled(True)
+        if not image.isNull():
+            self.load_image(image=image)
         else:
             msg_box = QMessageBox(QMessageBox.Warning, "警告", "剪贴板中没有图片", parent=self)
             msg_box.setStyleSheet("QMessageBox { border: none; } QMessageBox QLabel { border: none; }")
@@ -522,44 +1000,63 @@ class GradientExtractor(QWidget):
         )
 
         if file_path:
-            pixmap = QPixmap(file_path)
-            if not pixmap.isNull():
-                self.current_image = pixmap
-                self.display_image(pixmap)
-                self.extract_btn.setEnabled(True)
-            else:
-                msg_box = QMessageBox(QMessageBox.Critical, "错误", "无法加载图片", parent=self)
-                msg_box.setStyleSheet("QMessageBox { border: none; } QMessageBox QLabel { border: none; }")
-                msg_box.exec_()
-
-    def display_image(self, pixmap):
-
-        self.image_label.background_color = self.image_label.calculate_background_color(pixmap)
+            self.load_image(path=file_path)
+
+    def load_image(self, path=None, image=None):
+        # 连续粘贴或打开多张图片时只显示最后一次请求的结果
+        self.load_request += 1
+        self.load_job = ImageLoadJob(self.load_request, path=path, image=image)
+        self.load_job.signals.loaded.connect(self.on_image_loaded)
+        self.load_job.signals.failed.connect(self.on_image_failed)
+        if self.current_image is None:
+            self.image_label.setText("正在加载图片...")
+        self.setCursor(QCursor(Qt.BusyCursor))
+        self.load_pool.start(self.load_job)
+
+    def on_image_loaded(self, request_id, loaded):
+        if request_id != self.load_request:
+            return
+        self.unsetCursor()
+        self.display_image(loaded)
+        self.extract_btn.setEnabled(True)
+        self.auto_extract_btn.setEnabled(True)
 
-        label_size = self.image_label.size()
-        max_width = max(label_size.width(), 200)
-        max_height = max(label_size.height(), 150)
+    def on_image_failed(self, request_id, message):
+        if request_id != self.load_request:
+            return
+        self.unsetCursor()
+        if self.current_image is None:
+            self.image_label.setText("")
+        msg_box = QMessageBox(QMessageBox.Critical, "错误", message, parent=self)
+        msg_box.setStyleSheet("QMessageBox { border: none; } QMessageBox QLabel { border: none; }")
+        msg_box.exec_()
+
+    def update_sampler(self):
+        self.image_label.sample_radius = self.radius_input.value()
+        self.image_label.sample_method = self.sample_method_combo.currentData()
+        self.image_label.update()
 
-        scale_x = max_width / pixmap.width()
-        scale_y = max_height / pixmap.height()
-        scale = min(scale_x, scale_y, 1.0)
+    def sample_text_color(self, point):
+        # 取点击位置所在列附近竖条内文字像素的平均颜色，避开抗锯齿边缘混入的背景色
+        width = self.pixels.shape[1]
+        rgb = band_color(self.pixels, self.foreground, point.x(), max(2, width // 200))
+        return QColor(*rgb) if rgb is not None else None
 
-        if scale < 1.0:
-            new_width = int(pixmap.width() * scale)
-            new_height = int(pixmap.height() * scale)
-            scaled_pixmap = pixmap.scaled(new_width, new_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        else:
-            scaled_pixmap = pixmap
+    def display_image(self, loaded):
+        self.current_image = loaded.image
+        self.pixels = loaded.pixels
+        self.foreground = loaded.foreground
+        self.image_label.background_color = QColor(*loaded.background)
 
-        self.image_label.setPixmap(scaled_pixmap)
-        self.image_label.setScaledContents(False)
         self.image_label.setText("")
         self.image_label.setStyleSheet("border: none; padding: 5px;")
+        self.image_label.set_source(loaded)
+        self.image_label.setToolTip("滚轮缩放，拖动平移（取色时用右键拖动），双击恢复适应窗口")
 
         self.update_preview_lines()
 
     def update_preview_lines(self):
-        if not self.current_image:
+        if self.current_image is None:
             return
 
         self.preview_lines = []
@@ -572,10 +1069,10 @@ class GradientExtractor(QWidget):
                 if checkbox and checkbox.isChecked():
                     self.preview_lines.append(spinbox.value())
 
-        self.image_label.update()
+        self.image_label.invalidate_overlay()
 
     def start_color_picking(self):
-        if not self.current_image:
+        if self.current_image is None:
             msg_box = QMessageBox(QMessageBox.Warning, "警告", "请先上传图片", parent=self)
             msg_box.setStyleSheet("QMessageBox { border: none; } QMessageBox QLabel { border: none; }")
             msg_box.exec_()
@@ -606,11 +1103,15 @@ class GradientExtractor(QWidget):
         self.extract_btn.setText(
             f"请点击位置 {self.active_positions[0][1]} ({self.current_pick_index + 1}/{len(self.active_positions)})")
         self.extract_btn.setEnabled(False)
+        self.auto_extract_btn.setEnabled(False)
 
-    def on_color_picked(self, color):
+    def on_color_picked(self, color, point=None):
         if not self.color_picking_active:
             return
 
+        if point is not None and self.text_pixels_checkbox.isChecked():
+            color = self.sample_text_color(point) or color
+
         pos_index, pos_value = self.active_positions[self.current_pick_index]
         hex_color = f"#{color.red():02X}{color.green():02X}{color.blue():02X}"
         self.picked_colors.append((pos_index, pos_value, hex_color, color))
@@ -639,6 +1140,27 @@ class GradientExtractor(QWidget):
         self.image_label.set_picking_mode(False)
         self.extract_btn.setText("提取渐变颜色")
         self.extract_btn.setEnabled(True)
+        self.auto_extract_btn.setEnabled(True)
+        self.generate_json_result()
+
+    def auto_extract_gradient(self):
+        if self.current_image is None:
+            msg_box = QMessageBox(QMessageBox.Warning, "警告", "请先上传图片", parent=self)
+            msg_box.setStyleSheet("QMessageBox { border: none; } QMessageBox QLabel { border: none; }")
+            msg_box.exec_()
+            return
+
+        gradient_config = extract_gradient(self.pixels, self.foreground, self.max_stops_input.value(),
+                                           self.tolerance_input.value())
+        if not gradient_config:
+            msg_box = QMessageBox(QMessageBox.Warning, "警告", "未识别到与背景不同的文字像素", parent=self)
+            msg_box.setStyleSheet("QMessageBox { border: none; } QMessageBox QLabel { border: none; }")
+            msg_box.exec_()
+            return
+
+        self.reset_colors()
+        self.picked_colors = [(None, stop["position"], stop["color"], QColor(stop["color"]))
+                              for stop in gradient_config]
         self.generate_json_result()
 
     def generate_json_result(self):
@@ -652,16 +1174,16 @@ class GradientExtractor(QWidget):
                     "position": pos_value,
                     "color": hex_color
                 })
+            gradient_config = simplify_gradient(gradient_config, self.simplify_delta_e())
 
-            font_size = "14px"
-            font_name = "微软雅黑"
+            config_entry = {"gradient_config": gradient_config}
+            font_name = self.font_name_edit.text().strip()
+            if font_name:
+                config_entry["font_name"] = font_name
 
-            result = {
-                font_size: {
-                    "gradient_config": gradient_config,
-                    "font_name": font_name
-                }
-            }
+            # 未填写字号时只输出方案内容，可粘贴到 config.json 的任意字号下
+            font_size = self.font_size_edit.text().strip()
+            result = {font_size: config_entry} if font_size else config_entry
 
             json_str = json.dumps(result, indent=2, ensure_ascii=False)
             self.result_text.setText(json_str)
@@ -672,6 +1194,29 @@ class GradientExtractor(QWidget):
             msg_box.setStyleSheet("QMessageBox { border: none; } QMessageBox QLabel { border: none; }")
             msg_box.exec_()
 
+    def simplify_delta_e(self):
+        return self.delta_e_input.value() if self.simplify_checkbox.isChecked() else 0.0
+
+    def refresh_json_result(self):
+        if self.picked_colors and not self.color_picking_active:
+            self.generate_json_result()
+
+    def batch_extract(self):
+        folder = QFileDialog.getExistingDirectory(self, "选择图片文件夹")
+        if not folder:
+            return
+
+        if not any(name.lower().endswith(IMAGE_EXTENSIONS) for name in os.listdir(folder)):
+            msg_box = QMessageBox(QMessageBox.Warning, "警告", "文件夹中没有图片", parent=self)
+            msg_box.setStyleSheet("QMessageBox { border: none; } QMessageBox QLabel { border: none; }")
+            msg_box.exec_()
+            return
+
+        self.batch_dialog = BatchExtractDialog(folder, self.max_stops_input.value(), self.tolerance_input.value(),
+                                               self.simplify_delta_e(), self.font_size_edit.text().strip(),
+                                               self.font_name_edit.text().strip(), parent=self)
+        self.batch_dialog.show()
+
     def copy_json(self):
         text = self.result_text.toPlainText()
         if text:
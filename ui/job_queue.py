@@ -0,0 +1,380 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Qt
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QSpinBox,
+                               QTableWidget, QTableWidgetItem, QHeaderView, QProgressBar, QFileDialog,
+                               QAbstractItemView)
+
+from modules.ppt_processor import PPTProcessor
+
+JOB_QUEUED = "排队中"
+JOB_RUNNING = "处理中"
+JOB_DONE = "完成"
+JOB_FAILED = "失败"
+
+# 任务结果返回后等待其进度消息转发完毕的最长时间（秒），以及检查转发线程是否存活的间隔
+DRAIN_TIMEOUT = 5.0
+DRAIN_POLL_INTERVAL = 0.2
+
+
+def process_job(job_id, input_path, output_path, gradient_config, font_size, font_name, progress_queue):
+    # 在进程池中执行的任务入口，进度消息经 progress_queue 回传，最后发送结束标记
+    def report(message):
+        progress_queue.put((job_id, message))
+
+    try:
+        processor = PPTProcessor(status_callback=report)
+        return bool(processor.process_ppt(input_path, output_path, gradient_config, font_size, font_name))
+    finally:
+        report(None)
+
+
+class JobSignals(QObject):
+    started = Signal(int)
+    progress = Signal(int, str)
+    finished = Signal(int, bool)
+
+
+class ProcessJob(QRunnable):
+    # 线程池只负责排队和等待结果，实际处理在工作进程中进行，不受界面进程的 GIL 限制
+    def __init__(self, job_queue, job_id, input_path, output_path, gradient_config, font_size, font_name=None):
+        super().__init__()
+        self.job_queue = job_queue
+        self.job_id = job_id
+        self.input_path = input_path
+        self.output_path = output_path
+        self.gradient_config = [dict(item) for item in gradient_config]
+        self.font_size = font_size
+        self.font_name = font_name
+        self.signals = JobSignals()
+        self.drained = threading.Event()
+        self.setAutoDelete(False)
+
+    def run(self):
+        self.signals.started.emit(self.job_id)
+        try:
+            executor, progress_queue = self.job_queue.ensure_executor()
+            future = executor.submit(process_job, self.job_id, self.input_path, self.output_path,
+                                     self.gradient_config, self.font_size, self.font_name, progress_queue)
+            success = future.result()
+            self.wait_drained()
+            self.signals.finished.emit(self.job_id, bool(success))
+        except Exception as e:
+            self.signals.progress.emit(self.job_id, f"处理失败: {str(e)}")
+            self.signals.finished.emit(self.job_id, False)
+
+    def wait_drained(self):
+        # 尽量等该任务的进度消息全部转发后再报告完成；转发线程已退出或超时后不再等待，结果照常报告
+        deadline = time.monotonic() + DRAIN_TIMEOUT
+        while not self.drained.wait(DRAIN_POLL_INTERVAL):
+            if not self.job_queue.pump_alive() or time.monotonic() >= deadline:
+                return
+
+
+class JobQueue(QObject):
+    job_added = Signal(int)
+    job_updated = Signal(int)
+    job_progress = Signal(int, str)
+    job_finished = Signal(int, bool)
+
+    def __init__(self, max_workers=2, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(1, max_workers))
+        self.jobs = {}
+        self.next_job_id = 1
+        self.lock = threading.Lock()
+        self.executor = None
+        self.manager = None
+        self.progress_queue = None
+        self.pump_thread = None
+        self.closed = False
+
+    def ensure_executor(self):
+        # 第一个任务开始时才启动进程池；界面进程不能 fork，子进程用 spawn 方式启动。
+        # 线程池限制同时处理的任务数，进程池按 CPU 数量创建，调整并发数时不需要重建
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("任务队列已关闭")
+            if self.executor is None:
+                context = multiprocessing.get_context('spawn')
+                self.manager = context.Manager()
+                self.progress_queue = self.manager.Queue()
+                self.executor = ProcessPoolExecutor(max_workers=max(1, os.cpu_count() or 1), mp_context=context)
+                self.pump_thread = threading.Thread(target=self.pump_progress, daemon=True)
+                self.pump_thread.start()
+            return self.executor, self.progress_queue
+
+    def pump_alive(self):
+        return self.pump_thread is not None and self.pump_thread.is_alive()
+
+    def pump_progress(self):
+        # 后台线程转发工作进程的进度消息，信号以排队方式送到界面线程
+        while True:
+            try:
+                item = self.progress_queue.get()
+            except (EOFError, OSError):
+                break
+            if item is None:
+                break
+            job_id, message = item
+            job = self.jobs.get(job_id)
+            runnable = job['runnable'] if job else None
+            if runnable is None:
+                continue
+            if message is None:
+                runnable.drained.set()
+            else:
+                runnable.signals.progress.emit(job_id, message)
+
+    def shutdown(self):
+        # 取消排队中的任务，等待正在处理的任务结束后关闭进程池
+        with self.lock:
+            self.closed = True
+            executor = self.executor
+        self.pool.clear()
+        if executor is None:
+            return
+        executor.shutdown(wait=True, cancel_futures=True)
+        self.pool.waitForDone()
+        self.progress_queue.put(None)
+        self.pump_thread.join()
+        self.manager.shutdown()
+
+    def set_max_workers(self, count):
+        self.pool.setMaxThreadCount(max(1, count))
+
+    def max_workers(self):
+        return self.pool.maxThreadCount()
+
+    def submit(self, input_path, output_path, gradient_config, font_size, font_name=None):
+        job_id = self.next_job_id
+        self.next_job_id += 1
+
+        job = ProcessJob(self, job_id, input_path, output_path, gradient_config, font_size, font_name)
+        job.signals.started.connect(self.on_job_started)
+        job.signals.progress.connect(self.on_job_progress)
+        job.signals.finished.connect(self.on_job_finished)
+
+        self.jobs[job_id] = {
+            'runnable': job,
+            'input_path': input_path,
+            'output_path': output_path,
+            'status': JOB_QUEUED,
+            'message': ""
+        }
+        self.job_added.emit(job_id)
+        self.pool.start(job)
+        return job_id
+
+    def on_job_started(self, job_id):
+        self.jobs[job_id]['status'] = JOB_RUNNING
+        self.job_updated.emit(job_id)
+
+    def on_job_progress(self, job_id, message):
+        self.jobs[job_id]['message'] = message
+        self.job_updated.emit(job_id)
+        self.job_progress.emit(job_id, message)
+
+    def on_job_finished(self, job_id, success):
+        job = self.jobs[job_id]
+        job['status'] = JOB_DONE if success else JOB_FAILED
+        job['runnable'] = None
+        self.job_updated.emit(job_id)
+        self.job_finished.emit(job_id, success)
+
+    def clear_finished(self):
+        for job_id in [k for k, v in self.jobs.items() if v['status'] in (JOB_DONE, JOB_FAILED)]:
+            del self.jobs[job_id]
+
+    def pending_count(self):
+        return sum(1 for job in self.jobs.values() if job['status'] in (JOB_QUEUED, JOB_RUNNING))
+
+
+class JobQueueDialog(QDialog):
+    COLUMNS = ["文件", "状态", "进度", "输出路径"]
+
+    def __init__(self, job_queue, config_manager, job_params_provider, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("批量处理队列")
+        self.setMinimumSize(760, 420)
+        self.setAcceptDrops(True)
+
+        self.job_queue = job_queue
+        self.config_manager = config_manager
+        self.job_params_provider = job_params_provider
+        self.job_rows = {}
+
+        self.setup_ui()
+
+        for job_id in self.job_queue.jobs:
+            self.add_job_row(job_id)
+
+        self.job_queue.job_added.connect(self.add_job_row)
+        self.job_queue.job_updated.connect(self.update_job_row)
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        hint_label = QLabel("将多个 .pptx 文件拖入此窗口，或点击“添加文件”加入队列")
+        hint_label.setStyleSheet("border: none;")
+        layout.addWidget(hint_label)
+
+        output_layout = QHBoxLayout()
+        output_label = QLabel("输出目录 :")
+        output_label.setStyleSheet("border: none; font-weight: bold;")
+        output_layout.addWidget(output_label)
+
+        self.output_dir = QLineEdit()
+        self.output_dir.setPlaceholderText("留空则保存到源文件所在目录")
+        output_layout.addWidget(self.output_dir)
+
+        browse_btn = QPushButton("浏览")
+        browse_btn.setFixedWidth(60)
+        browse_btn.clicked.connect(self.browse_output_dir)
+        output_layout.addWidget(browse_btn)
+
+        workers_label = QLabel("并发数 :")
+        workers_label.setStyleSheet("border: none; font-weight: bold;")
+        output_layout.addWidget(workers_label)
+
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, max(1, os.cpu_count() or 1))
+        self.workers_spin.setValue(self.job_queue.max_workers())
+        self.workers_spin.valueChanged.connect(self.on_workers_changed)
+        output_layout.addWidget(self.workers_spin)
+
+        layout.addLayout(output_layout)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table)
+
+        button_layout = QHBoxLayout()
+
+        add_btn = QPushButton("添加文件")
+        add_btn.clicked.connect(self.browse_input_files)
+        button_layout.addWidget(add_btn)
+
+        clear_btn = QPushButton("清除已完成")
+        clear_btn.clicked.connect(self.clear_finished)
+        button_layout.addWidget(clear_btn)
+
+        close_btn = QPushButton("关闭")
+        close_btn.clicked.connect(self.close)
+        button_layout.addWidget(close_btn)
+
+        layout.addLayout(button_layout)
+
+    def dragEnterEvent(self, event):
+        if event.mimeData().hasUrls() and self.pptx_paths_from_urls(event.mimeData().urls()):
+            event.acceptProposedAction()
+        else:
+            event.ignore()
+
+    def dropEvent(self, event):
+        self.enqueue_files(self.pptx_paths_from_urls(event.mimeData().urls()))
+        event.acceptProposedAction()
+
+    def pptx_paths_from_urls(self, urls):
+        paths = []
+        for url in urls:
+            path = url.toLocalFile()
+            if path and path.lower().endswith('.pptx') and os.path.isfile(path):
+                paths.append(path)
+        return paths
+
+    def browse_input_files(self):
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self, "选择Gamma PPT文件", "", "PowerPoint文件 (*.pptx)"
+        )
+        self.enqueue_files(file_paths)
+
+    def browse_output_dir(self):
+        dir_path = QFileDialog.getExistingDirectory(self, "选择输出目录")
+        if dir_path:
+            self.output_dir.setText(dir_path)
+
+    def build_output_path(self, input_path):
+        output_dir = self.output_dir.text().strip() or os.path.dirname(input_path)
+        name, ext = os.path.splitext(os.path.basename(input_path))
+        return os.path.join(output_dir, f"{name}_RescueGamma{ext}")
+
+    def enqueue_files(self, file_paths):
+        if not file_paths:
+            return
+
+        output_dir = self.output_dir.text().strip()
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        gradient_config, font_size, font_name = self.job_params_provider()
+        for input_path in file_paths:
+            self.job_queue.submit(input_path, self.build_output_path(input_path), gradient_config, font_size, font_name)
+
+    def on_workers_changed(self, value):
+        self.job_queue.set_max_workers(value)
+        self.config_manager.set_max_workers(value)
+
+    def add_job_row(self, job_id):
+        job = self.job_queue.jobs.get(job_id)
+        if job is None or job_id in self.job_rows:
+            return
+
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        self.job_rows[job_id] = row
+
+        self.table.setItem(row, 0, QTableWidgetItem(os.path.basename(job['input_path'])))
+        self.table.item(row, 0).setToolTip(job['input_path'])
+        self.table.setItem(row, 1, QTableWidgetItem())
+
+        progress_bar = QProgressBar()
+        progress_bar.setTextVisible(True)
+        self.table.setCellWidget(row, 2, progress_bar)
+
+        self.table.setItem(row, 3, QTableWidgetItem(job['output_path']))
+        self.table.item(row, 3).setToolTip(job['output_path'])
+
+        self.update_job_row(job_id)
+
+    def update_job_row(self, job_id):
+        row = self.job_rows.get(job_id)
+        job = self.job_queue.jobs.get(job_id)
+        if row is None or job is None:
+            return
+
+        status_item = self.table.item(row, 1)
+        status_item.setText(job['status'])
+        if job['status'] == JOB_DONE:
+            status_item.setForeground(Qt.GlobalColor.darkGreen)
+        elif job['status'] == JOB_FAILED:
+            status_item.setForeground(Qt.GlobalColor.red)
+
+        progress_bar = self.table.cellWidget(row, 2)
+        if job['status'] == JOB_RUNNING:
+            progress_bar.setRange(0, 0)
+        else:
+            progress_bar.setRange(0, 1)
+            progress_bar.setValue(0 if job['status'] == JOB_QUEUED else 1)
+        progress_bar.setFormat(job['message'] or job['status'])
+        progress_bar.setToolTip(job['message'])
+
+    def clear_finished(self):
+        self.job_queue.clear_finished()
+        self.table.setRowCount(0)
+        self.job_rows = {}
+        for job_id in self.job_queue.jobs:
+            self.add_job_row(job_id)
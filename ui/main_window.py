@@ -2,20 +2,26 @@ import json
 import logging
 import os
 
-from PySide6.QtCore import QThread
-from PySide6.QtCore import Signal, Qt
+from PySide6.QtCore import Signal, Qt, QTimer
 from PySide6.QtGui import QAction, QFont, QIcon
-from PySide6.QtGui import QPainter, QLinearGradient, QColor, QBrush, QPen
+from PySide6.QtGui import QPainter, QLinearGradient, QColor, QBrush, QPen, QPixmap
 from PySide6.QtWidgets import (QMainWindow, QVBoxLayout, QLineEdit, QComboBox,
                                QTextEdit, QFileDialog, QMessageBox, QMenu, QProgressBar, QFrame, QScrollArea, QDialog,
-                               QSizePolicy, QGroupBox)
+                               QSizePolicy, QGroupBox, QCheckBox, QLayout)
 from PySide6.QtWidgets import QPushButton
 from PySide6.QtWidgets import QWidget, QHBoxLayout, QLabel
 
 from modules.config_manager import ConfigManager
-from modules.ppt_processor import PPTProcessor
+from modules.gradient_fit import simplify_gradient
+from modules.keyword_matcher import parse_keywords
+from modules.run_index import ROLE_LABELS, parse_roles
+from modules.size_index import parse_size_spec
 from ui.color_picker import ColorPicker
 from ui.font_config import FontConfig
+from ui.job_queue import JobQueue, JobQueueDialog
+
+# 渐变编辑区最多的色标数量
+MAX_GRADIENT_STOPS = 10
 
 
 def init_logger():
@@ -73,33 +79,6 @@ class GradientLabel(QLabel):
         painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, self.text())
 
 
-class ProcessThread(QThread):
-    progress = Signal(str)
-    finished = Signal(bool)
-
-    def __init__(self, processor, input_path, output_path, gradient_config, font_size):
-        super().__init__()
-        self.processor = processor
-        self.input_path = input_path
-        self.output_path = output_path
-        self.gradient_config = gradient_config
-        self.font_size = font_size
-
-    def run(self):
-        try:
-            self.progress.emit("开始处理PPT文件...")
-            success = self.processor.process_ppt(
-                self.input_path,
-                self.output_path,
-                self.gradient_config,
-                self.font_size
-            )
-            self.finished.emit(success)
-        except Exception as e:
-            self.progress.emit(f"处理失败: {str(e)}")
-            self.finished.emit(False)
-
-
 class PreviewLabel(QLabel):
     def __init__(self):
         super().__init__()
@@ -109,7 +88,12 @@ class PreviewLabel(QLabel):
         self.setText("\n".join(self.preview_texts))
         self.setAlignment(Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignVCenter)
         self.gradient_config = []
-        self.font_size = "12"
+        self.font_size = None
+        self.stops = None
+        self.preview_font = QFont("Microsoft YaHei", 12)
+        # 渐变画笔依赖控件宽度，渲染结果缓存为位图，配置、字号或尺寸变化时才重新生成
+        self.pen = None
+        self.pixmap = None
         self.setStyleSheet("""
             background-color: #f8f8f8; 
             border: 1px solid #ddd;
@@ -120,52 +104,70 @@ class PreviewLabel(QLabel):
         self.update_preview([], "12")
 
     def update_preview(self, gradient_config, font_size):
-        self.gradient_config = gradient_config
-        self.font_size = font_size
+        stops = tuple((config['position'], config['color']) for config in gradient_config)
+        if stops == self.stops and font_size == self.font_size:
+            return
+        self.gradient_config = [dict(config) for config in gradient_config]
+        self.stops = stops
 
-        try:
-            size = int(float(font_size)) if font_size else 12
-        except:
-            size = 12
+        if font_size != self.font_size:
+            self.font_size = font_size
+            try:
+                size = int(float(font_size)) if font_size else 12
+            except:
+                size = 12
 
-        font = QFont("SimHei", size, QFont.Bold)
-        self.setFont(font)
+            self.setFont(QFont("SimHei", size, QFont.Bold))
+            self.preview_font = QFont("Microsoft YaHei", size)
 
+        self.pen = None
+        self.pixmap = None
         self.update()
 
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-
-        painter.fillRect(self.rect(), QColor("#f8f8f8"))
-
-        try:
-            size = int(float(self.font_size)) if self.font_size else 12
-        except:
-            size = 12
-        font = QFont("Microsoft YaHei", size)
-        painter.setFont(font)
-
-        if self.gradient_config and len(self.gradient_config) >= 2:
-            gradient = QLinearGradient(0, 0, self.width(), 0)
-
-            for config in self.gradient_config:
-                pos = config['position'] / 100000.0
-                color = config['color']
-
-                if color.startswith('#'):
-                    gradient.setColorAt(pos, QColor(color))
-                elif color == 'accent1':
-                    gradient.setColorAt(pos, QColor("#5B9BD5"))
-                else:
-                    gradient.setColorAt(pos, QColor("#333333"))
-
-            painter.setPen(QPen(QBrush(gradient), 0))
-        else:
-            painter.setPen(QColor("#333333"))
+    def build_pen(self):
+        if len(self.gradient_config) < 2:
+            return QPen(QColor("#333333"))
 
+        gradient = QLinearGradient(0, 0, self.width(), 0)
+        for config in self.gradient_config:
+            pos = config['position'] / 100000.0
+            color = config['color']
+
+            if color.startswith('#'):
+                gradient.setColorAt(pos, QColor(color))
+            elif color == 'accent1':
+                gradient.setColorAt(pos, QColor("#5B9BD5"))
+            else:
+                gradient.setColorAt(pos, QColor("#333333"))
+        return QPen(QBrush(gradient), 0)
+
+    def render_pixmap(self):
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(self.size() * ratio)
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(QColor("#f8f8f8"))
+
+        if self.pen is None:
+            self.pen = self.build_pen()
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setFont(self.preview_font)
+        painter.setPen(self.pen)
         text_rect = self.rect().adjusted(10, 10, -10, -10)
         painter.drawText(text_rect, Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignVCenter, self.text())
+        painter.end()
+        return pixmap
+
+    def resizeEvent(self, event):
+        self.pen = None
+        self.pixmap = None
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        if self.pixmap is None or self.pixmap.devicePixelRatio() != self.devicePixelRatioF():
+            self.pixmap = self.render_pixmap()
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self.pixmap)
 
 
 class SortButton(QPushButton):
@@ -313,10 +315,23 @@ class ConfigListDialog(QDialog):
         title_layout.addWidget(delete_btn)
         scheme_layout.addLayout(title_layout)
 
-        font_size_info = QLabel(f"字号：{font_size}")
+        font_size_info = QLabel(f"字号：{config_data.get('font_size') or font_size}")
         font_size_info.setStyleSheet("border: none; margin-left: 10px;")
         scheme_layout.addWidget(font_size_info)
 
+        keywords = parse_keywords(config_data.get('keywords'))
+        if keywords:
+            keywords_info = QLabel(f"关键词：{'、'.join(keywords)}")
+            keywords_info.setWordWrap(True)
+            keywords_info.setStyleSheet("border: none; margin-left: 10px;")
+            scheme_layout.addWidget(keywords_info)
+
+        roles = parse_roles(config_data.get('roles'))
+        if roles:
+            roles_info = QLabel(f"形状：{'、'.join(ROLE_LABELS[role] for role in roles)}")
+            roles_info.setStyleSheet("border: none; margin-left: 10px;")
+            scheme_layout.addWidget(roles_info)
+
         font_name_info = QLabel(f"字体：{config_data.get('font_name', 'N/A')}")
         font_name_info.setStyleSheet("border: none; margin-left: 10px;")
         scheme_layout.addWidget(font_name_info)
@@ -355,8 +370,11 @@ class ConfigListDialog(QDialog):
                     data = json.load(f)
                     # 获取排序状态 (0=升序, 1=降序)
                     sort_order = self.config_manager.get_sort_order()
-                    # 关键修复：使用 float 作为 key 进行数值排序
-                    sorted_keys = sorted(data.keys(), key=lambda x: float(x), reverse=bool(sort_order))
+                    # 关键修复：按字号数值排序，字号区间按起止字号排序
+                    def size_order(key):
+                        return parse_size_spec(data[key].get('font_size') or key) or (float('inf'),) * 2
+
+                    sorted_keys = sorted(data.keys(), key=size_order, reverse=bool(sort_order))
                     self.configs = {k: data[k] for k in sorted_keys}
             else:
                 self.configs = {}
@@ -467,8 +485,12 @@ class AboutDialog(QDialog):
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.processor = PPTProcessor(status_callback=self.add_status_message)
         self.config_manager = ConfigManager()
+        self.job_queue = JobQueue(self.config_manager.get_max_workers(), self)
+        self.job_queue.job_progress.connect(self.on_job_progress)
+        self.job_queue.job_finished.connect(self.on_job_finished)
+        self.foreground_jobs = set()
+        self.job_queue_dialog = None
         self.is_dark_mode = self.config_manager.get_dark_mode()
         self.gradient_config = [
             {'position': 0, 'color': '#9A6FDC'},
@@ -476,6 +498,11 @@ class MainWindow(QMainWindow):
             {'position': 83000, 'color': 'accent1'},
             {'position': 100000, 'color': '#73C6E1'}
         ]
+        # 渐变和字号输入停顿一会儿后再刷新预览，连续输入时不逐字重绘
+        self.preview_timer = QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(150)
+        self.preview_timer.timeout.connect(self.update_preview)
         self.setup_ui()
         self.load_config()
         self.apply_theme()
@@ -564,6 +591,7 @@ class MainWindow(QMainWindow):
         font_label.setStyleSheet("border: none;")
         self.font_name_edit = QLineEdit()
         self.font_name_edit.setPlaceholderText("试试填：Sora")
+        self.font_name_edit.setToolTip("填写通配符 Sora* 或 re: 开头的正则时只用于匹配，不会修改文本字体")
         h_layout.addWidget(font_label)
         h_layout.addWidget(self.font_name_edit)
 
@@ -578,78 +606,76 @@ class MainWindow(QMainWindow):
         font_sizes = ["8", "9", "10", "11", "12", "14", "16", "18", "20", "24", "28", "32", "36", "44", "48", "72"]
         self.font_size_combo.addItems(font_sizes)
         self.font_size_combo.setCurrentText("44.5")
-        self.font_size_combo.currentTextChanged.connect(self.update_preview)
+        self.font_size_combo.setToolTip("保存方案时可填写字号区间，如 28-44；区间重叠时范围越窄的方案越优先")
+        self.font_size_combo.currentTextChanged.connect(self.schedule_preview_update)
 
         h_layout.addWidget(self.font_size_combo)
 
         left_layout.addLayout(h_layout)
+
+        keywords_layout = QHBoxLayout()
+        keywords_label = QLabel("关键词")
+        keywords_label.setStyleSheet("border: none;")
+        self.keywords_edit = QLineEdit()
+        self.keywords_edit.setPlaceholderText("文本包含任一关键词时才应用，逗号分隔（可空）")
+        keywords_layout.addWidget(keywords_label)
+        keywords_layout.addWidget(self.keywords_edit)
+        role_label = QLabel("形状")
+        role_label.setStyleSheet("border: none;")
+        self.role_combo = QComboBox()
+        self.role_combo.addItem("全部", None)
+        for role, label in ROLE_LABELS.items():
+            self.role_combo.addItem(label, role)
+        self.role_combo.setToolTip("只给标题、正文等指定占位符，或表格、组合内的文本应用渐变")
+        keywords_layout.addWidget(role_label)
+        keywords_layout.addWidget(self.role_combo)
+        left_layout.addLayout(keywords_layout)
         left_layout.addSpacing(10)
 
+        gradient_header_layout = QHBoxLayout()
         gradient_label = QLabel("渐变配置")
         gradient_label.setStyleSheet("font-weight: bold; border: none;")
-        left_layout.addWidget(gradient_label)
+        gradient_header_layout.addWidget(gradient_label)
+        gradient_header_layout.addStretch()
+        self.merge_stops_checkbox = QCheckBox("保存时合并相近色标")
+        self.merge_stops_checkbox.setToolTip("保存前去掉与相邻色标插值结果几乎相同的色标，"
+                                             "容差为 setting.ini 中的 simplify_delta_e，编辑区会同步显示合并后的色标")
+        gradient_header_layout.addWidget(self.merge_stops_checkbox)
+        left_layout.addLayout(gradient_header_layout)
 
         gradient_frame = QFrame()
         gradient_frame.setFrameStyle(QFrame.Shape.Box)
         gradient_frame_layout = QVBoxLayout(gradient_frame)
         gradient_frame_layout.setSpacing(8)
 
+        # 窗口大小固定，色标较多时在滚动区域内滚动
+        gradient_rows_widget = QWidget()
+        self.gradient_rows_layout = QVBoxLayout(gradient_rows_widget)
+        self.gradient_rows_layout.setContentsMargins(0, 0, 0, 0)
+        self.gradient_rows_layout.setSizeConstraint(QLayout.SizeConstraint.SetMinimumSize)
+        self.gradient_rows_layout.setSpacing(4)
+        self.gradient_rows_layout.addStretch()
+        gradient_rows_widget.setObjectName("gradientRows")
+        gradient_rows_widget.setStyleSheet("#gradientRows { background: transparent; }")
+        gradient_scroll = QScrollArea()
+        gradient_scroll.setWidget(gradient_rows_widget)
+        gradient_scroll.setWidgetResizable(True)
+        gradient_scroll.setFrameShape(QFrame.Shape.NoFrame)
+        gradient_scroll.setStyleSheet("QScrollArea { border: none; background: transparent; }")
+        gradient_scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        gradient_frame_layout.addWidget(gradient_scroll)
         self.gradient_entries = []
         self.position_inputs = []
         self.color_inputs = []
-
-        for i, config in enumerate(self.gradient_config):
-            entry_widget = QWidget()
-            entry_layout = QHBoxLayout(entry_widget)
-            entry_layout.setContentsMargins(5, 2, 5, 2)
-
-            pos_label = QLabel("位置:")
-            pos_label.setFixedWidth(30)
-            pos_label.setStyleSheet("border: none;")
-            entry_layout.addWidget(pos_label)
-
-            pos_input = QLineEdit(str(config['position']))
-            pos_input.setFixedWidth(60)
-            pos_input.textChanged.connect(self.on_gradient_config_changed)
-
-            pos_input.setStyleSheet("border: 1px solid #ccc; padding: 2px;")
-            entry_layout.addWidget(pos_input)
-            self.position_inputs.append(pos_input)
-
-            color_label = QLabel("颜色:")
-            color_label.setFixedWidth(30)
-            color_label.setStyleSheet("border: none;")
-            entry_layout.addWidget(color_label)
-
-            color_input = QLineEdit(str(config['color']))
-            color_input.setFixedWidth(80)
-            color_input.textChanged.connect(self.on_gradient_config_changed)
-
-            color_input.setStyleSheet("border: 1px solid #ccc; padding: 2px;")
-            entry_layout.addWidget(color_input)
-            self.color_inputs.append(color_input)
-
-            color_preview = QLabel()
-            color_preview.setFixedSize(20, 20)
-            if config['color'].startswith('#'):
-                color_preview.setStyleSheet(f"background-color: {config['color']}; border: 1px solid black;")
-            else:
-                color_preview.setStyleSheet("background-color: lightgray; border: 1px solid black;")
-            entry_layout.addWidget(color_preview)
-
-            entry_layout.addStretch()
-            gradient_frame_layout.addWidget(entry_widget)
-
-            self.gradient_entries.append({
-                'widget': entry_widget,
-                'preview': color_preview,
-                'pos_input': pos_input,
-                'color_input': color_input
-            })
+        self.rebuild_gradient_rows()
 
         left_layout.addWidget(gradient_frame)
 
         config_btn_layout = QHBoxLayout()
+        self.add_stop_btn = QPushButton("添加色标")
+        self.add_stop_btn.clicked.connect(self.add_gradient_stop)
+        config_btn_layout.addWidget(self.add_stop_btn)
+
         save_config_btn = QPushButton("保存配置")
         save_config_btn.clicked.connect(self.save_config)
         config_btn_layout.addWidget(save_config_btn)
@@ -657,6 +683,7 @@ class MainWindow(QMainWindow):
         show_config_btn = QPushButton("配置清单")
         show_config_btn.clicked.connect(self.show_config_list)
         config_btn_layout.addWidget(show_config_btn)
+        self.add_stop_btn.setEnabled(len(self.gradient_config) < MAX_GRADIENT_STOPS)
 
         left_layout.addLayout(config_btn_layout)
         left_layout.addStretch()
@@ -722,6 +749,10 @@ class MainWindow(QMainWindow):
         gradient_action.triggered.connect(self.show_gradient_extractor)
         menu.addAction(gradient_action)
 
+        queue_action = QAction("批量队列", self)
+        queue_action.triggered.connect(self.show_job_queue)
+        menu.addAction(queue_action)
+
         menu.addSeparator()
 
         self.dark_mode_action = QAction("切换深色模式", self)
@@ -966,15 +997,122 @@ class MainWindow(QMainWindow):
                         pass
                     self.gradient_config[i]['color'] = color
 
-                if color.startswith('#') and len(color) == 7:
-                    entry['preview'].setStyleSheet(f"background-color: {color}; border: 1px solid black;")
-                else:
-                    entry['preview'].setStyleSheet("background-color: lightgray; border: 1px solid black;")
+                self.update_swatch(entry, color)
 
-            self.update_preview()
+            self.schedule_preview_update()
         except Exception as e:
             print(f"更新渐变配置时出错: {e}")
 
+    def rebuild_gradient_rows(self):
+        # 编辑行与 gradient_config 一一对应，加载方案、增删色标或合并色标后重新生成
+        for entry in self.gradient_entries:
+            self.gradient_rows_layout.removeWidget(entry['widget'])
+            entry['widget'].deleteLater()
+        self.gradient_entries = []
+        self.position_inputs = []
+        self.color_inputs = []
+
+        for config in self.gradient_config:
+            entry_widget = QWidget()
+            entry_layout = QHBoxLayout(entry_widget)
+            entry_layout.setContentsMargins(5, 2, 5, 2)
+
+            pos_label = QLabel("位置:")
+            pos_label.setFixedWidth(30)
+            pos_label.setStyleSheet("border: none;")
+            entry_layout.addWidget(pos_label)
+
+            pos_input = QLineEdit(str(config['position']))
+            pos_input.setFixedWidth(60)
+            pos_input.textChanged.connect(self.on_gradient_config_changed)
+
+            pos_input.setStyleSheet("border: 1px solid #ccc; padding: 2px;")
+            entry_layout.addWidget(pos_input)
+            self.position_inputs.append(pos_input)
+
+            color_label = QLabel("颜色:")
+            color_label.setFixedWidth(30)
+            color_label.setStyleSheet("border: none;")
+            entry_layout.addWidget(color_label)
+
+            color_input = QLineEdit(str(config['color']))
+            color_input.setFixedWidth(80)
+            color_input.textChanged.connect(self.on_gradient_config_changed)
+
+            color_input.setStyleSheet("border: 1px solid #ccc; padding: 2px;")
+            entry_layout.addWidget(color_input)
+            self.color_inputs.append(color_input)
+
+            color_preview = QLabel()
+            color_preview.setFixedSize(20, 20)
+            entry_layout.addWidget(color_preview)
+
+            remove_btn = QPushButton("删除")
+            remove_btn.setFixedWidth(50)
+            remove_btn.setEnabled(len(self.gradient_config) > 2)
+            remove_btn.clicked.connect(lambda checked=False, widget=entry_widget: self.remove_gradient_stop(widget))
+            entry_layout.addWidget(remove_btn)
+
+            entry_layout.addStretch()
+            entry_widget.setFixedHeight(entry_widget.sizeHint().height())
+            self.gradient_rows_layout.insertWidget(self.gradient_rows_layout.count() - 1, entry_widget)
+
+            self.gradient_entries.append({
+                'widget': entry_widget,
+                'preview': color_preview,
+                'pos_input': pos_input,
+                'color_input': color_input,
+                'swatch': None
+            })
+            self.update_swatch(self.gradient_entries[-1], str(config['color']))
+
+        if hasattr(self, 'add_stop_btn'):
+            self.add_stop_btn.setEnabled(len(self.gradient_config) < MAX_GRADIENT_STOPS)
+
+    def add_gradient_stop(self):
+        # 在最后两个色标中间插入一个新色标，颜色取最后一个色标
+        if len(self.gradient_config) >= MAX_GRADIENT_STOPS:
+            return
+        if len(self.gradient_config) >= 2:
+            before, after = self.gradient_config[-2], self.gradient_config[-1]
+            try:
+                position = (int(float(before['position'])) + int(float(after['position']))) // 2
+            except (TypeError, ValueError):
+                position = 50000
+            self.gradient_config.insert(-1, {'position': position, 'color': after['color']})
+        else:
+            self.gradient_config.append({'position': 100000, 'color': '#333333'})
+        self.rebuild_gradient_rows()
+        self.schedule_preview_update()
+
+    def remove_gradient_stop(self, widget):
+        index = next((i for i, entry in enumerate(self.gradient_entries) if entry['widget'] is widget), None)
+        if index is None or len(self.gradient_config) <= 2:
+            return
+        del self.gradient_config[index]
+        self.rebuild_gradient_rows()
+        self.schedule_preview_update()
+
+    def update_swatch(self, entry, color):
+        # 只在色块颜色真正变化时重设样式表，setStyleSheet 会触发整个控件重新计算样式
+        swatch = color if color.startswith('#') and len(color) == 7 else 'lightgray'
+        if swatch != entry['swatch']:
+            entry['swatch'] = swatch
+            entry['preview'].setStyleSheet(f"background-color: {swatch}; border: 1px solid black;")
+
+    def show_job_queue(self):
+        if self.job_queue_dialog is None:
+            self.job_queue_dialog = JobQueueDialog(
+                self.job_queue, self.config_manager, self.current_job_params, self)
+        self.job_queue_dialog.show()
+        self.job_queue_dialog.raise_()
+        self.job_queue_dialog.activateWindow()
+
+    def current_job_params(self):
+        font_size = self.font_size_combo.currentText().strip()
+        font_name = self.font_name_edit.text().strip() or None
+        return [dict(item) for item in self.gradient_config], font_size, font_name
+
     def show_color_picker(self):
         dialog = ColorPicker(self)
         dialog.exec()
@@ -1018,7 +1156,11 @@ class MainWindow(QMainWindow):
         if file_path:
             self.output_path.setText(file_path)
 
+    def schedule_preview_update(self):
+        self.preview_timer.start()
+
     def update_preview(self):
+        self.preview_timer.stop()
         font_size = self.font_size_combo.currentText()
         self.preview_label.update_preview(self.gradient_config, font_size)
 
@@ -1052,10 +1194,28 @@ class MainWindow(QMainWindow):
         except Exception as e:
             print(f"读取配置失败: {str(e)}")
 
-        configs[font_size] = {
-            'gradient_config': self.gradient_config.copy(),
+        config_key = font_size
+        gradient_config = [dict(config) for config in self.gradient_config]
+        if self.merge_stops_checkbox.isChecked():
+            # 合并插值后几乎看不出差别的色标，写入 PPT 的渐变 XML 更短
+            gradient_config = simplify_gradient(gradient_config, self.config_manager.get_simplify_delta_e())
+        removed = len(self.gradient_config) - len(gradient_config)
+        config_entry = {
+            'gradient_config': gradient_config,
             'font_name': self.font_name_edit.text()
         }
+        keywords = parse_keywords(self.keywords_edit.text())
+        role = self.role_combo.currentData()
+        if role:
+            config_key = f"{config_key} {ROLE_LABELS[role]}"
+            config_entry['roles'] = [role]
+        if keywords:
+            config_key = f"{config_key} 含{'、'.join(keywords)}"
+            config_entry['keywords'] = keywords
+        if config_key != font_size:
+            # 带条件的方案单独保存，不覆盖同字号的普通方案
+            config_entry['font_size'] = font_size
+        configs[config_key] = config_entry
 
         try:
             with open('config.json', 'w', encoding='utf-8') as f:
@@ -1063,10 +1223,16 @@ class MainWindow(QMainWindow):
 
             msg = QMessageBox(self)
             msg.setWindowTitle("成功")
-            if font_size in configs and len([k for k in configs.keys() if k == font_size]) > 0:
-                msg.setText(f"字号 {font_size} 的配置已更新")
+            if config_key in configs and len([k for k in configs.keys() if k == config_key]) > 0:
+                msg.setText(f"字号 {config_key} 的配置已更新")
             else:
-                msg.setText(f"字号 {font_size} 的新方案已保存")
+                msg.setText(f"字号 {config_key} 的新方案已保存")
+            if removed:
+                # 编辑区同步为实际保存的色标
+                self.gradient_config = [dict(config) for config in gradient_config]
+                self.rebuild_gradient_rows()
+                self.update_preview()
+                msg.setText(f"{msg.text()}\n已合并 {removed} 个相近色标，编辑区已同步")
             msg.setStyleSheet("""
                 QMessageBox {
                     background-color: white;
@@ -1106,14 +1272,14 @@ class MainWindow(QMainWindow):
                     if data:
                         first_font_size = list(data.keys())[0]
                         first_config = data[first_font_size]
-                        self.font_size_combo.setCurrentText(first_font_size)
+                        self.font_size_combo.setCurrentText(first_config.get('font_size') or first_font_size)
                         self.gradient_config = first_config.get('gradient_config', self.gradient_config)
                         self.font_name_edit.setText(first_config.get('font_name', 'Sora'))
+                        self.keywords_edit.setText('，'.join(parse_keywords(first_config.get('keywords'))))
+                        roles = parse_roles(first_config.get('roles'))
+                        self.role_combo.setCurrentIndex(max(self.role_combo.findData(roles[0]), 0) if roles else 0)
 
-                    for i, grad_config in enumerate(self.gradient_config):
-                        if i < len(self.gradient_entries):
-                            self.gradient_entries[i]['pos_input'].setText(str(grad_config['position']))
-                            self.gradient_entries[i]['color_input'].setText(str(grad_config['color']))
+                    self.rebuild_gradient_rows()
 
                     self.update_preview()
         except Exception as e:
@@ -1235,15 +1401,24 @@ class MainWindow(QMainWindow):
         self.progress_bar.setVisible(True)
         self.progress_bar.setRange(0, 0)
 
-        self.process_thread = ProcessThread(
-            self.processor, gamma_file, output_file, self.gradient_config, font_size
-        )
-        self.process_thread.progress.connect(self.add_status_message)
-        self.process_thread.finished.connect(self.on_processing_finished)
-        self.process_thread.start()
+        self.add_status_message("开始处理PPT文件...")
+        if self.job_queue.pending_count() > 0:
+            self.add_status_message("已有任务在处理中，本任务已加入批量队列")
+        job_id = self.job_queue.submit(gamma_file, output_file, self.gradient_config, font_size)
+        self.foreground_jobs.add(job_id)
+
+    def on_job_progress(self, job_id, message):
+        if job_id in self.foreground_jobs:
+            self.add_status_message(message)
+
+    def on_job_finished(self, job_id, success):
+        if job_id not in self.foreground_jobs:
+            return
+        self.foreground_jobs.discard(job_id)
+        self.on_processing_finished(success)
 
     def on_processing_finished(self, success):
-        self.progress_bar.setVisible(False)
+        self.progress_bar.setVisible(bool(self.foreground_jobs))
 
         if success:
             self.add_status_message("PPT处理完成！")